@@ -1,9 +1,19 @@
 import os
 import asyncio
 from typing import Dict, Any
-import openai
 from database import employees_collection, vacation_balances_collection, hr_requests_collection, policies_collection, salary_payments_collection
 
+# The OpenAI SDK takes most of a second to import, so it is loaded by the
+# first AIHRAssistant() rather than when this module is imported
+openai = None
+
+def _load_openai():
+    global openai
+    if openai is None:
+        import openai as openai_sdk
+        openai = openai_sdk
+    return openai
+
 class AIHRAssistant:
     def __init__(self):
         self.api_key = os.environ.get('OPENAI_API_KEY')
@@ -11,10 +21,25 @@ class AIHRAssistant:
             raise ValueError("OpenAI API key not found in environment variables")
         
         # Initialize OpenAI client
+        _load_openai()
         openai.api_key = self.api_key
         
         # Using OpenAI Assistant API with custom trained HR assistant
         self.assistant_id = "asst_Dwo2hqfJhI6GfD31YGt6bcrJ"  # Your HR Assistant ID
+        
+        # Policy text for prompts, rebuilt after the policy change feed reports a change
+        self._policy_context = None
+    
+    def invalidate_policy_context(self):
+        self._policy_context = None
+    
+    async def _get_policy_context(self) -> str:
+        if self._policy_context is None:
+            policies = await policies_collection.find({}, {"_id": 0, "title": 1, "category": 1, "content": 1}).to_list(100)
+            self._policy_context = "".join(
+                f"\n**{policy['title']}** ({policy['category']}):\n{policy['content']}\n\n" for policy in policies
+            )
+        return self._policy_context
     
     async def generate_response(self, message: str, employee_id: str, session_id: str) -> Dict[str, Any]:
         """Generate AI response using custom GPT and context from database"""
@@ -199,13 +224,8 @@ Question: {message}
     async def _enhanced_policy_response(self, message: str, employee: Dict, context: str) -> str:
         """Enhanced policy response using database policies with AI formatting"""
         try:
-            # Get all policies from database
-            policies = await policies_collection.find().to_list(100)
-            
-            # Create a comprehensive policy context
-            policy_context = ""
-            for policy in policies:
-                policy_context += f"\n**{policy['title']}** ({policy['category']}):\n{policy['content']}\n\n"
+            # Comprehensive policy context from all policies in the database
+            policy_context = await self._get_policy_context()
             
             # Use OpenAI to format response based on policies
             response = openai.chat.completions.create(
@@ -0,0 +1,195 @@
+"""HR analytics computed with pandas/NumPy.
+
+Each report pulls only the fields it needs from Mongo, in cursor batches,
+straight into columnar lists and builds one DataFrame; all aggregation is
+vectorized. The ``compute_*`` functions take DataFrames and are free of I/O
+so they can be benchmarked on synthetic data. Results are cached for the
+rest of the UTC day.
+"""
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from database import employees_collection, hr_requests_collection, salary_payments_collection, vacation_balances_collection
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.environ.get('ANALYTICS_BATCH_SIZE', '5000'))
+
+PERCENTILES = [50, 75, 90, 95, 99]
+
+# (report, params) -> result, valid for _cache_day only
+_cache: Dict[Tuple[str, Tuple], Dict[str, Any]] = {}
+_cache_day: Optional[date] = None
+
+
+async def load_frame(collection, query: Dict[str, Any], fields: List[str]) -> pd.DataFrame:
+    """Read a projection of ``fields`` in batches into a DataFrame"""
+    columns: Dict[str, list] = {field: [] for field in fields}
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    cursor = collection.find(query, projection).batch_size(BATCH_SIZE)
+    while True:
+        batch = await cursor.to_list(BATCH_SIZE)
+        if not batch:
+            break
+        for field, values in columns.items():
+            values.extend(doc.get(field) for doc in batch)
+    # Empty lists would become float64 columns, which the string accessors reject
+    return pd.DataFrame({field: pd.Series(values, dtype=None if values else object) for field, values in columns.items()})
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    # NaN is not valid JSON
+    return frame.replace({np.nan: None}).to_dict(orient="records")
+
+
+def compute_leave_utilization(requests: pd.DataFrame, employees: pd.DataFrame, balances: pd.DataFrame) -> Dict[str, Any]:
+    """Leave days taken and vacation utilization by department and grade"""
+    staff = employees.rename(columns={"id": "employee_id"}).merge(
+        balances[["employee_id", "total_days"]], on="employee_id", how="left"
+    )
+    # Float even when nothing matched: an all-missing column would stay object dtype
+    staff["total_days"] = pd.to_numeric(staff["total_days"], errors="coerce").fillna(0.0)
+
+    leave = requests[requests["type"].str.endswith(" Leave", na=False)]
+    leave = leave.assign(days=pd.to_numeric(leave["days"], errors="coerce").fillna(0))
+    taken = leave.pivot_table(index="employee_id", columns="type", values="days", aggfunc="sum", fill_value=0)
+    staff = staff.merge(taken, left_on="employee_id", right_index=True, how="left")
+    leave_types = list(taken.columns)
+    staff[leave_types] = staff[leave_types].fillna(0)
+    vacation = staff["Vacation Leave"] if "Vacation Leave" in staff else 0
+
+    staff = staff.assign(vacation_days=pd.to_numeric(vacation, errors="coerce"))
+    by = {}
+    for level in ("department", "grade"):
+        grouped = staff.groupby(level).agg(
+            employees=("employee_id", "size"),
+            entitlement_days=("total_days", "sum"),
+            vacation_days=("vacation_days", "sum"),
+            **{f"days_{t.lower().replace(' ', '_')}": (t, "sum") for t in leave_types},
+        )
+        # No entitlement -> NaN (null), never a division by zero
+        entitlement = grouped["entitlement_days"].where(grouped["entitlement_days"] > 0)
+        grouped["vacation_utilization"] = (grouped["vacation_days"] / entitlement).round(4)
+        by[level] = _records(grouped.reset_index())
+    return {"byDepartment": by["department"], "byGrade": by["grade"]}
+
+
+def compute_turnaround(requests: pd.DataFrame) -> Dict[str, Any]:
+    """Hours from submission to approval, as percentiles overall and per request type"""
+    done = requests.dropna(subset=["submitted_date", "approved_date"])
+    hours = (pd.to_datetime(done["approved_date"]) - pd.to_datetime(done["submitted_date"])).dt.total_seconds() / 3600
+    hours = hours[hours >= 0]
+    done = done.loc[hours.index]
+
+    def summary(values: pd.Series) -> Dict[str, Any]:
+        points = np.percentile(values.to_numpy(), PERCENTILES) if len(values) else [None] * len(PERCENTILES)
+        return {
+            "count": int(len(values)),
+            "meanHours": round(float(values.mean()), 2) if len(values) else None,
+            **{f"p{p}Hours": (round(float(v), 2) if v is not None else None) for p, v in zip(PERCENTILES, points)},
+        }
+
+    by_type = {request_type: summary(group) for request_type, group in hours.groupby(done["type"])}
+    return {"overall": summary(hours), "byType": by_type}
+
+
+def compute_expenses(requests: pd.DataFrame) -> Dict[str, Any]:
+    """Expense reimbursement totals by category, excluding rejected claims"""
+    expenses = requests[(requests["type"] == "Expense Reimbursement") & (requests["status"] != "Rejected")]
+    expenses = expenses.assign(
+        amount=pd.to_numeric(expenses["amount"], errors="coerce").fillna(0.0),
+        category=expenses["category"].fillna("uncategorized"),
+    )
+    grouped = expenses.groupby("category")["amount"].agg(["sum", "count", "mean"]).round(2)
+    grouped = grouped.rename(columns={"sum": "total", "mean": "average"}).sort_values("total", ascending=False)
+    return {
+        "total": round(float(expenses["amount"].sum()), 2),
+        "byCategory": _records(grouped.reset_index()),
+    }
+
+
+def compute_salary_costs(payments: pd.DataFrame, employees: pd.DataFrame) -> Dict[str, Any]:
+    """Monthly payroll cost trend, overall and per department"""
+    payments = payments.merge(
+        employees[["id", "department"]].rename(columns={"id": "employee_id"}), on="employee_id", how="left"
+    )
+    payments = payments.assign(
+        # Group on month periods and format only the handful of labels afterwards
+        month=pd.to_datetime(payments["date"]).dt.to_period("M"),
+        department=payments["department"].fillna("Unknown"),
+    )
+    monthly = payments.groupby("month").agg(total=("amount", "sum"), headcount=("employee_id", "nunique"))
+    monthly["change_pct"] = (monthly["total"].pct_change() * 100).round(2)
+    monthly.index = monthly.index.astype(str)
+    by_department = payments.pivot_table(index="month", columns="department", values="amount", aggfunc="sum", fill_value=0)
+    by_department.index = by_department.index.astype(str)
+    return {
+        "monthly": _records(monthly.round(2).reset_index()),
+        "byDepartment": {
+            department: [{"month": month, "total": round(float(total), 2)} for month, total in series.items()]
+            for department, series in by_department.items()
+        },
+    }
+
+
+async def _cached(report: str, params: Tuple, build):
+    global _cache_day
+    today = datetime.utcnow().date()
+    if _cache_day != today:
+        _cache.clear()
+        _cache_day = today
+    key = (report, params)
+    if key not in _cache:
+        result = await build()
+        _cache[key] = {**result, "generatedAt": datetime.utcnow().isoformat()}
+    return _cache[key]
+
+
+def clear_cache():
+    _cache.clear()
+
+
+async def leave_utilization(year: Optional[int] = None) -> Dict[str, Any]:
+    async def build():
+        query: Dict[str, Any] = {"status": {"$in": ["Approved", "Pending Approval", "Under Review"]}}
+        if year:
+            query["start_date"] = {"$gte": f"{year}-01-01", "$lte": f"{year}-12-31"}
+        requests = await load_frame(hr_requests_collection, query, ["employee_id", "type", "days"])
+        employees = await load_frame(employees_collection, {}, ["id", "department", "grade"])
+        balances = await load_frame(vacation_balances_collection, {"year": year} if year else {}, ["employee_id", "total_days"])
+        return compute_leave_utilization(requests, employees, balances.drop_duplicates("employee_id"))
+    return await _cached("leave_utilization", (year,), build)
+
+
+async def turnaround() -> Dict[str, Any]:
+    async def build():
+        requests = await load_frame(
+            hr_requests_collection, {"approved_date": {"$ne": None}}, ["type", "submitted_date", "approved_date"]
+        )
+        return compute_turnaround(requests)
+    return await _cached("turnaround", (), build)
+
+
+async def expenses() -> Dict[str, Any]:
+    async def build():
+        requests = await load_frame(
+            hr_requests_collection, {"type": "Expense Reimbursement"}, ["type", "status", "amount", "category"]
+        )
+        return compute_expenses(requests)
+    return await _cached("expenses", (), build)
+
+
+async def salary_costs(months: int = 12) -> Dict[str, Any]:
+    async def build():
+        today = datetime.utcnow()
+        start_month = today.year * 12 + today.month - months
+        since = datetime(start_month // 12, start_month % 12 + 1, 1)
+        payments = await load_frame(salary_payments_collection, {"date": {"$gte": since}}, ["employee_id", "amount", "date"])
+        employees = await load_frame(employees_collection, {}, ["id", "department"])
+        return compute_salary_costs(payments, employees)
+    return await _cached("salary_costs", (months,), build)
@@ -0,0 +1,269 @@
+"""Response compression with negotiation, a pre-compressed body cache and metrics.
+
+``CompressionMiddleware`` compresses single-message response bodies of at
+least ``COMPRESSION_MIN_BYTES`` with brotli (when the ``brotli`` package is
+installed) or gzip, following the client's ``Accept-Encoding`` q-values.
+Streamed bodies, ranged responses and responses that already carry a
+``Content-Encoding`` pass through untouched.
+
+Compressed bodies of GET responses are kept in a size-bounded LRU keyed by
+encoding and the response ETag (or a digest of the body), so a payload served
+repeatedly is only compressed once. A compressed response carries the weak
+form of the upstream ETag: its bytes differ from the identity body, so the
+strong validator no longer applies. ``metrics`` records bytes saved and the
+CPU time spent compressing.
+
+The HR and Procurement backends each ship an identical copy of this module,
+so either deploys on its own; change both together.
+"""
+import asyncio
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+CACHE_MAX_BYTES = int(os.environ.get('COMPRESSION_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Bodies at least this large are compressed on a worker thread instead of the event loop
+THREAD_MIN_BYTES = int(os.environ.get('COMPRESSION_THREAD_MIN_BYTES', str(256 * 1024)))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+# Server preference when the client weighs encodings equally
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+class CompressionMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.by_encoding: Dict[str, int] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cached: bool):
+        with self._lock:
+            self.responses += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+            if cached:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def add_cpu(self, seconds: float):
+        with self._lock:
+            self.cpu_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "encodings": list(ENCODINGS),
+                "responses": self.responses,
+                "skipped": self.skipped,
+                "bytesIn": self.bytes_in,
+                "bytesOut": self.bytes_out,
+                "bytesSaved": self.bytes_in - self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+                "cpuMs": round(self.cpu_seconds * 1000, 2),
+                "cacheHits": self.cache_hits,
+                "cacheMisses": self.cache_misses,
+                "cacheBytes": body_cache.size,
+                "byEncoding": dict(self.by_encoding),
+            }
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies bounded by their total size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: Tuple[str, str], data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+metrics = CompressionMetrics()
+body_cache = CompressedBodyCache(CACHE_MAX_BYTES)
+
+
+def negotiate(accept_encoding: str, available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Pick the encoding from ``available`` the client weighs highest, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def weak_etag(etag: str) -> str:
+    """The weak form of ``etag``, for a body in a different content-coding"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress ``body`` and account the CPU time it took"""
+    started = time.thread_time()
+    if encoding == "br":
+        data = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    metrics.add_cpu(time.thread_time() - started)
+    return data
+
+
+async def compress_cached(body: bytes, encoding: str, cache_key: Optional[str]) -> Tuple[bytes, bool]:
+    """Compressed ``body``, from the cache when ``cache_key`` was compressed before"""
+    if cache_key is not None:
+        data = body_cache.get((encoding, cache_key))
+        if data is not None:
+            return data, True
+    if len(body) >= THREAD_MIN_BYTES:
+        data = await asyncio.to_thread(compress, body, encoding)
+    else:
+        data = compress(body, encoding)
+    if cache_key is not None:
+        body_cache.put((encoding, cache_key), data)
+    return data, False
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        encoding = negotiate(headers.get("accept-encoding", ""))
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+        cacheable = scope["method"] == "GET"
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            response_headers = {key.decode("latin-1").lower(): value.decode("latin-1")
+                                for key, value in start_message.get("headers", [])}
+            body = message.get("body", b"")
+            if (message.get("more_body")
+                    or start_message["status"] in (204, 206, 304)
+                    or "content-encoding" in response_headers
+                    or len(body) < self.minimum_size
+                    or not _is_compressible(response_headers.get("content-type", ""))):
+                # Streamed, empty, already encoded or not worth it: send as is
+                passthrough = True
+                metrics.skip()
+                await send(start_message)
+                await send(message)
+                return
+
+            etag = response_headers.get("etag")
+            cache_key = None
+            if cacheable and "no-store" not in response_headers.get("cache-control", ""):
+                cache_key = etag or hashlib.blake2b(body, digest_size=16).hexdigest()
+            data, cached = await compress_cached(body, encoding, cache_key)
+            if len(data) >= len(body):
+                passthrough = True
+                metrics.skip()
+                await send(start_message)
+                await send(message)
+                return
+            metrics.record(encoding, len(body), len(data), cached)
+
+            vary = response_headers.get("vary")
+            raw_headers = [(key, value) for key, value in start_message.get("headers", [])
+                           if key.lower() not in (b"content-length", b"vary", b"etag")]
+            if etag:
+                raw_headers.append((b"etag", weak_etag(etag).encode("latin-1")))
+            raw_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(data)).encode("latin-1")),
+                (b"vary", (f"{vary}, Accept-Encoding" if vary and "accept-encoding" not in vary.lower()
+                           else vary or "Accept-Encoding").encode("latin-1")),
+            ]
+            await send({**start_message, "headers": raw_headers})
+            await send({"type": "http.response.body", "body": data})
+
+        await self.app(scope, receive, send_compressed)
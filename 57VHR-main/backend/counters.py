@@ -0,0 +1,178 @@
+"""Incrementally maintained counts for the admin statistics page.
+
+One document per counted collection lives in ``counters``; write paths bump
+it with a single ``$inc`` so statistics are served from three small reads
+instead of collection scans. A bucket that empties is removed, and a bucket
+is never taken below zero. A background task periodically recomputes the
+counts with ``count_documents``/``$group`` and repairs any drift (e.g. from
+writes that bypass the API or a crash between a write and its increment).
+
+Every increment also bumps the document's ``version``. A reconcile only
+writes its result if the version is still the one it read before scanning,
+so an increment landing mid-scan is never overwritten; that counter is
+retried, or left to the next pass. The periodic pass runs on one worker at a
+time, whichever holds the ``counters_reconcile`` lease in ``meta``.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from database import (counters_collection, employees_collection, hr_requests_collection, meta_collection,
+                      policies_collection)
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL_SECONDS = float(os.environ.get('COUNTERS_RECONCILE_SECONDS', '600'))
+# Attempts per counter when increments keep landing during the scan
+RECONCILE_ATTEMPTS = 3
+# The lease outlives one interval so its holder keeps it; another worker takes over after a missed renewal
+LEASE_TTL = timedelta(seconds=RECONCILE_INTERVAL_SECONDS * 2)
+LEASE_ID = "counters_reconcile"
+
+# counter document id -> (collection, {breakdown name: grouped field})
+COUNTED = {
+    "hr_requests": (hr_requests_collection, {"by_status": "status", "by_type": "type", "by_department": "department"}),
+    "employees": (employees_collection, {"by_department": "department", "by_grade": "grade"}),
+    "policies": (policies_collection, {"by_category": "category"}),
+}
+
+
+def _key(value: Any) -> str:
+    """Make a field value usable as a document key"""
+    return str(value if value not in (None, "") else "Unknown").replace(".", "_").lstrip("$")
+
+
+async def _drop_empty_buckets(counter: str, fields: List[str]):
+    # An emptied bucket is removed rather than listed with a count of zero
+    for field in fields:
+        await counters_collection.update_one({"_id": counter, field: {"$lte": 0}}, {"$unset": {field: ""}})
+
+
+async def increment(counter: str, breakdowns: Dict[str, Any], total: int = 1):
+    """Bump a counter's total and one bucket per breakdown, e.g. {"by_status": "Approved"}"""
+    inc = {"total": total, "version": 1}
+    for breakdown, value in breakdowns.items():
+        inc[f"{breakdown}.{_key(value)}"] = total
+    await counters_collection.update_one({"_id": counter}, {"$inc": inc}, upsert=True)
+    if total < 0:
+        await _drop_empty_buckets(counter, [field for field in inc if "." in field])
+
+
+async def move(counter: str, breakdown: str, old_value: Any, new_value: Any):
+    """Shift one item between buckets of a breakdown (e.g. a status change)"""
+    if old_value == new_value:
+        return
+    old_field, new_field = f"{breakdown}.{_key(old_value)}", f"{breakdown}.{_key(new_value)}"
+    moved = await counters_collection.update_one(
+        {"_id": counter, old_field: {"$gt": 0}},
+        {"$inc": {old_field: -1, new_field: 1, "version": 1}}
+    )
+    if moved.matched_count:
+        await _drop_empty_buckets(counter, [old_field])
+    else:
+        # The old bucket was already empty (drift, repaired by reconcile): never take it below zero
+        await counters_collection.update_one({"_id": counter}, {"$inc": {new_field: 1, "version": 1}}, upsert=True)
+
+
+async def get_counts() -> Dict[str, Dict[str, Any]]:
+    docs = await counters_collection.find({"_id": {"$in": list(COUNTED)}}).to_list(len(COUNTED))
+    return {doc.pop("_id"): doc for doc in docs}
+
+
+async def _department_counts_for_requests() -> Dict[str, int]:
+    # Requests store only employee_id, so departments come from a join
+    pipeline = [
+        {"$lookup": {"from": employees_collection.name, "localField": "employee_id",
+                     "foreignField": "id", "as": "employee"}},
+        {"$group": {"_id": {"$arrayElemAt": ["$employee.department", 0]}, "count": {"$sum": 1}}},
+    ]
+    return {_key(row["_id"]): row["count"] async for row in hr_requests_collection.aggregate(pipeline)}
+
+
+async def _compute(counter: str) -> Dict[str, Any]:
+    collection, breakdowns = COUNTED[counter]
+    computed: Dict[str, Any] = {"total": await collection.count_documents({})}
+    for breakdown, field in breakdowns.items():
+        if counter == "hr_requests" and field == "department":
+            computed[breakdown] = await _department_counts_for_requests()
+            continue
+        pipeline = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        computed[breakdown] = {_key(row["_id"]): row["count"] async for row in collection.aggregate(pipeline)}
+    return computed
+
+
+def _without_zeros(counts: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: {k: v for k, v in value.items() if v} if isinstance(value, dict) else value
+        for name, value in counts.items() if name not in ("reconciled_at", "version")
+    }
+
+
+async def _reconcile_one(counter: str) -> Optional[bool]:
+    """Recompute one counter; whether it had drifted, or None if increments kept racing the scan"""
+    for _ in range(RECONCILE_ATTEMPTS):
+        stored = await counters_collection.find_one({"_id": counter})
+        version = stored.get("version") if stored else None
+        computed = await _compute(counter)
+        drifted = _without_zeros({k: v for k, v in (stored or {}).items() if k != "_id"}) != computed
+        try:
+            # Matches only if nothing was incremented since the read (a missing field matches None)
+            result = await counters_collection.replace_one(
+                {"_id": counter, "version": version},
+                {**computed, "version": (version or 0) + 1, "reconciled_at": datetime.utcnow()},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The document exists with a newer version, so the upsert could not insert
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            if drifted and stored:
+                logger.warning(f"Counter '{counter}' drifted from stored values, repaired")
+            return drifted
+    logger.info(f"Counter '{counter}' kept changing during reconciliation, leaving it for the next pass")
+    return None
+
+
+async def reconcile(counters: Optional[List[str]] = None) -> Dict[str, Optional[bool]]:
+    """Recompute counters from the collections; returns which ones had drifted (None: not rewritten)"""
+    return {counter: await _reconcile_one(counter) for counter in counters or list(COUNTED)}
+
+
+async def ensure_counters():
+    """Build any counter document that does not exist yet"""
+    stored = await get_counts()
+    missing = [counter for counter in COUNTED if counter not in stored]
+    if missing:
+        await reconcile(missing)
+
+
+async def _acquire_lease(owner: str) -> bool:
+    now = datetime.utcnow()
+    try:
+        # Upserting onto a live lease held by someone else raises DuplicateKeyError
+        await meta_collection.update_one(
+            {"_id": LEASE_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + LEASE_TTL}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def reconcile_periodically():
+    """Reconcile every interval on whichever worker holds the lease"""
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    while True:
+        await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
+        try:
+            if await _acquire_lease(owner):
+                await reconcile()
+        except Exception as e:
+            logger.error(f"Counter reconciliation failed: {e}")
@@ -0,0 +1,200 @@
+"""Upcoming events: company calendar, recurring series and approved leave starts.
+
+Events live in the ``events`` collection. One-off events carry a ``date``;
+recurring series also carry a ``recurrence`` rule that is expanded here.
+Shared one-off events and every recurring series are expanded for the
+look-ahead window once per day per worker and cached, so a dashboard request
+only filters the cached list and runs two bounded, index-backed range scans
+for the employee's personal one-off events and approved leave starts.
+"""
+import asyncio
+import calendar
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+
+from database import events_collection, hr_requests_collection
+
+logger = logging.getLogger(__name__)
+
+HORIZON_DAYS = int(os.environ.get('EVENTS_HORIZON_DAYS', '90'))
+CACHE_TTL_SECONDS = float(os.environ.get('EVENTS_CACHE_TTL_SECONDS', '300'))
+
+# Seeded when the events collection is empty
+DEFAULT_EVENTS = [
+    {
+        "id": "EVT-PAYROLL",
+        "type": "Payroll",
+        "title": "Monthly salary payment",
+        "date": datetime(2025, 1, 27),
+        "recurrence": {"freq": "monthly", "interval": 1},
+    },
+    {
+        "id": "EVT-MIDYEAR-REVIEW",
+        "type": "Performance Review",
+        "title": "Mid-year performance review",
+        "date": datetime(2025, 6, 30),
+        "recurrence": {"freq": "yearly", "interval": 1},
+    },
+    {
+        "id": "EVT-YEAREND-REVIEW",
+        "type": "Performance Review",
+        "title": "Year-end performance evaluation",
+        "date": datetime(2025, 12, 15),
+        "recurrence": {"freq": "yearly", "interval": 1},
+    },
+    {
+        "id": "EVT-TECH-WEEKLY",
+        "type": "Team Meeting",
+        "title": "Technology weekly sync",
+        "date": datetime(2025, 1, 5, 10, 0),
+        "department": "Technology",
+        "recurrence": {"freq": "weekly", "interval": 1},
+    },
+]
+
+
+def _add_months(value: datetime, months: int, day: int) -> datetime:
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    # Clamp e.g. the 31st to the last day of shorter months
+    return value.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+def expand_occurrences(event: Dict[str, Any], start: datetime, end: datetime) -> List[datetime]:
+    """Occurrence datetimes of an event within [start, end)"""
+    anchor = event["date"]
+    rule = event.get("recurrence")
+    if not rule:
+        return [anchor] if start <= anchor < end else []
+
+    until = rule.get("until")
+    if until and until < end:
+        end = until + timedelta(microseconds=1)
+    interval = max(int(rule.get("interval", 1)), 1)
+    freq = rule["freq"]
+    occurrences = []
+
+    if freq in ("daily", "weekly"):
+        step = timedelta(days=interval * (7 if freq == "weekly" else 1))
+        # Jump straight to the first occurrence inside the window
+        skipped = max((start - anchor) // step, 0) if start > anchor else 0
+        current = anchor + step * skipped
+        while current < end:
+            if current >= start:
+                occurrences.append(current)
+            current += step
+    elif freq in ("monthly", "yearly"):
+        months = interval * (12 if freq == "yearly" else 1)
+        elapsed = (start.year - anchor.year) * 12 + start.month - anchor.month
+        count = max(elapsed // months - 1, 0)
+        current = _add_months(anchor, count * months, anchor.day)
+        while current < end:
+            if current >= start:
+                occurrences.append(current)
+            count += 1
+            current = _add_months(anchor, count * months, anchor.day)
+    return occurrences
+
+
+def _format(event: Dict[str, Any], when: datetime) -> Dict[str, Any]:
+    return {
+        "id": event["id"],
+        "type": event["type"],
+        "title": event.get("title") or event["type"],
+        "date": when.date().isoformat(),
+        "time": when.strftime("%H:%M") if (when.hour or when.minute) else None,
+        "department": event.get("department"),
+    }
+
+
+class UpcomingEvents:
+    def __init__(self):
+        self._cache_day: Optional[date] = None
+        self._cache_loaded_at = 0.0
+        # (occurrence, employee_id) pairs; employee_id is None for shared events
+        self._shared: List[Tuple[Dict[str, Any], Optional[str]]] = []
+        self._lock = asyncio.Lock()
+
+    async def ensure_setup(self):
+        await events_collection.create_index([("employee_id", ASCENDING), ("date", ASCENDING)])
+        await events_collection.create_index("recurrence.freq", sparse=True)
+        await hr_requests_collection.create_index([
+            ("employee_id", ASCENDING), ("status", ASCENDING), ("start_date", ASCENDING)
+        ])
+        if not await events_collection.find_one({}, {"_id": 1}):
+            now = datetime.utcnow()
+            await events_collection.insert_many([
+                {"employee_id": None, "department": None, **event, "created_at": now} for event in DEFAULT_EVENTS
+            ])
+
+    def invalidate(self):
+        self._cache_day = None
+
+    async def _shared_occurrences(self, today: date) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """Occurrences of shared events and recurring series in today's window, expanded at most once per day"""
+        fresh = time.monotonic() - self._cache_loaded_at < CACHE_TTL_SECONDS
+        if self._cache_day == today and fresh:
+            return self._shared
+        async with self._lock:
+            if self._cache_day == today and time.monotonic() - self._cache_loaded_at < CACHE_TTL_SECONDS:
+                return self._shared
+            start = datetime.combine(today, datetime.min.time())
+            end = start + timedelta(days=HORIZON_DAYS)
+            cursor = events_collection.find({
+                "$or": [
+                    {"recurrence.freq": {"$exists": True}},
+                    {"employee_id": None, "date": {"$gte": start, "$lt": end}},
+                ],
+            }, {"_id": 0})
+            occurrences = []
+            async for event in cursor:
+                occurrences.extend((when, event) for when in expand_occurrences(event, start, end))
+            occurrences.sort(key=lambda item: item[0])
+            self._shared = [(_format(event, when), event.get("employee_id")) for when, event in occurrences]
+            self._cache_day = today
+            self._cache_loaded_at = time.monotonic()
+        return self._shared
+
+    async def next_events(self, employee: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
+        """The employee's next ``limit`` events: shared calendar, personal events and approved leave starts"""
+        today = datetime.utcnow().date()
+        start = datetime.combine(today, datetime.min.time())
+        end = start + timedelta(days=HORIZON_DAYS)
+
+        department = employee.get("department")
+        upcoming = []
+        for event, owner in await self._shared_occurrences(today):
+            if owner in (None, employee["id"]) and (owner or event["department"] in (None, department)):
+                upcoming.append(event)
+                if len(upcoming) == limit:
+                    break
+
+        personal = await events_collection.find(
+            {"employee_id": employee["id"], "date": {"$gte": start, "$lt": end}, "recurrence": None}, {"_id": 0}
+        ).sort("date", 1).limit(limit).to_list(limit)
+        upcoming.extend(_format(event, event["date"]) for event in personal)
+
+        leave_starts = await hr_requests_collection.find(
+            {
+                "employee_id": employee["id"],
+                "status": "Approved",
+                "start_date": {"$gte": today.isoformat(), "$lt": end.date().isoformat()},
+            },
+            {"_id": 0, "id": 1, "type": 1, "start_date": 1}
+        ).sort("start_date", 1).limit(limit).to_list(limit)
+        upcoming.extend({
+            "id": request["id"],
+            "type": f"{request['type']} Starts",
+            "title": request["type"],
+            "date": request["start_date"][:10],
+            "time": None,
+            "department": department,
+        } for request in leave_starts)
+
+        upcoming.sort(key=lambda event: (event["date"], event["time"] or ""))
+        return upcoming[:limit]
@@ -0,0 +1,252 @@
+"""Team leave calendar: who is out when, per department.
+
+Approved and pending leave requests are held in memory in one interval tree
+per department. Writes made by this worker are applied immediately; writes
+made by other workers are picked up by an incremental refresh that only
+reads requests whose ``updated_at`` moved past the last sync point. The
+refresh also re-reads employee names and departments, and moves the
+requests of anyone whose department changed.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import employees_collection, hr_requests_collection
+
+logger = logging.getLogger(__name__)
+
+# Requests in these statuses keep the employee on the calendar
+CALENDAR_STATUSES = {"Pending Approval", "Under Review", "Approved"}
+
+REFRESH_INTERVAL_SECONDS = float(os.environ.get('LEAVE_CALENDAR_REFRESH_SECONDS', '5'))
+
+# Re-read a little before the watermark to tolerate clock skew between workers
+_WATERMARK_OVERLAP = timedelta(seconds=2)
+
+_PROJECTION = {
+    "_id": 0, "id": 1, "employee_id": 1, "type": 1, "status": 1,
+    "start_date": 1, "end_date": 1, "updated_at": 1,
+}
+_EMPLOYEE_PROJECTION = {"_id": 0, "id": 1, "name": 1, "department": 1}
+
+
+class _Node:
+    __slots__ = ("key", "start", "end", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, key: Tuple[int, str], end: int, value: Dict[str, Any]):
+        self.key = key
+        self.start = key[0]
+        self.end = end
+        self.value = value
+        self.priority = random.random()
+        self.max_end = end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+def _update(node: _Node):
+    node.max_end = node.end
+    if node.left and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+
+
+def _split(node: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        _update(node)
+        return node, right
+    left, node.left = _split(node.left, key)
+    _update(node)
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _remove(node: Optional[_Node], key) -> Optional[_Node]:
+    if node is None:
+        return None
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    _update(node)
+    return node
+
+
+class IntervalTree:
+    """Treap of closed day intervals ordered by start, augmented with each subtree's max end.
+
+    Insert and remove are O(log n) expected; an overlap query is
+    O(log n + k) for k matching intervals.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, start: int, end: int, item_id: str, value: Dict[str, Any]):
+        left, right = _split(self._root, (start, item_id))
+        self._root = _merge(_merge(left, _Node((start, item_id), end, value)), right)
+        self._size += 1
+
+    def remove(self, start: int, item_id: str):
+        self._root = _remove(self._root, (start, item_id))
+        self._size -= 1
+
+    def overlapping(self, start: int, end: int) -> List[Dict[str, Any]]:
+        found: List[Dict[str, Any]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            # Nothing in this subtree ends on or after the window start
+            if node is None or node.max_end < start:
+                continue
+            stack.append(node.left)
+            # Right subtree only holds intervals starting after this one
+            if node.start <= end:
+                if node.end >= start:
+                    found.append(node.value)
+                stack.append(node.right)
+        return found
+
+
+def _day(value: str) -> int:
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+class LeaveCalendar:
+    def __init__(self):
+        self._trees: Dict[str, IntervalTree] = {}
+        # request id -> (department, start day, request) for removal or re-placement on change
+        self._placed: Dict[str, Tuple[str, int, Dict[str, Any]]] = {}
+        self._employees: Dict[str, Dict[str, Any]] = {}
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        """Build every department's tree from scratch"""
+        await hr_requests_collection.create_index("updated_at")
+        async with self._lock:
+            self._trees.clear()
+            self._placed.clear()
+            self._employees = {
+                emp["id"]: emp async for emp in employees_collection.find({}, _EMPLOYEE_PROJECTION)
+            }
+            self._watermark = datetime.utcnow()
+            cursor = hr_requests_collection.find({
+                "status": {"$in": list(CALENDAR_STATUSES)},
+                "start_date": {"$ne": None},
+                "end_date": {"$ne": None},
+            }, _PROJECTION)
+            async for request in cursor:
+                self._place(request)
+            self._last_refresh = time.monotonic()
+        logger.info(f"Leave calendar loaded with {len(self._placed)} requests")
+
+    async def refresh(self, force: bool = False):
+        """Apply requests changed by any worker since the last sync"""
+        if self._watermark is None:
+            await self.load()
+            return
+        if not force and time.monotonic() - self._last_refresh < REFRESH_INTERVAL_SECONDS:
+            return
+        async with self._lock:
+            since = self._watermark - _WATERMARK_OVERLAP
+            self._watermark = datetime.utcnow()
+            changed = await hr_requests_collection.find(
+                {"updated_at": {"$gte": since}}, _PROJECTION
+            ).to_list(None)
+            await self._reload_employees()
+            for request in changed:
+                self._place(request)
+            self._last_refresh = time.monotonic()
+
+    async def apply(self, request: Dict[str, Any]):
+        """Reflect a request written by this worker without waiting for the next refresh"""
+        if self._watermark is None:
+            return
+        await self._load_employees({request["employee_id"]})
+        self._place(request)
+
+    async def _load_employees(self, employee_ids):
+        missing = [emp_id for emp_id in employee_ids if emp_id not in self._employees]
+        if missing:
+            async for emp in employees_collection.find({"id": {"$in": missing}}, _EMPLOYEE_PROJECTION):
+                self._employees[emp["id"]] = emp
+
+    async def _reload_employees(self):
+        employees = {emp["id"]: emp async for emp in employees_collection.find({}, _EMPLOYEE_PROJECTION)}
+        # Renamed, moved or removed employees: re-place their requests under the current record
+        changed = {emp_id for emp_id, emp in self._employees.items() if employees.get(emp_id) != emp}
+        self._employees = employees
+        if changed:
+            requests = [request for _, _, request in self._placed.values() if request["employee_id"] in changed]
+            for request in requests:
+                self._place(request)
+
+    def _place(self, request: Dict[str, Any]):
+        request_id = request["id"]
+        placed = self._placed.pop(request_id, None)
+        if placed:
+            self._trees[placed[0]].remove(placed[1], request_id)
+
+        employee = self._employees.get(request["employee_id"])
+        if (request.get("status") not in CALENDAR_STATUSES or not employee
+                or not request.get("start_date") or not request.get("end_date")):
+            return
+
+        department = employee.get("department", "")
+        start, end = _day(request["start_date"]), _day(request["end_date"])
+        value = {
+            "request_id": request_id,
+            "employee_id": request["employee_id"],
+            "employee_name": employee.get("name"),
+            "department": department,
+            "type": request["type"],
+            "status": request["status"],
+            "start_date": request["start_date"],
+            "end_date": request["end_date"],
+        }
+        self._trees.setdefault(department, IntervalTree()).insert(start, end, request_id, value)
+        self._placed[request_id] = (department, start, request)
+
+    async def who_is_out(self, start_date: str, end_date: str, department: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Leave entries overlapping [start_date, end_date], optionally for one department"""
+        await self.refresh()
+        start, end = _day(start_date), _day(end_date)
+        departments = [department] if department else list(self._trees)
+        entries = []
+        for dept in departments:
+            tree = self._trees.get(dept)
+            if tree:
+                entries.extend(tree.overlapping(start, end))
+        return sorted(entries, key=lambda e: (e["start_date"], e["employee_id"]))
+
+    async def teammates_out(self, department: str, start_date: str, end_date: str, employee_id: str) -> List[str]:
+        """Distinct other employees of the department on leave during the range"""
+        entries = await self.who_is_out(start_date, end_date, department)
+        return sorted({e["employee_id"] for e in entries if e["employee_id"] != employee_id})
@@ -0,0 +1,235 @@
+"""Append-only leave ledger and the balances materialized from it.
+
+Every change to the days an employee has taken is recorded as an immutable
+ledger entry, written in the same unit of work as the request state change
+that caused it. ``vacation_balances`` is a materialized view of the ledger:
+each entry is folded into it with a single ``$inc`` so the dashboard keeps
+reading one document, and ``rebuild_balances`` recomputes it from scratch.
+
+There is one balance document per employee, and both paths fold in every
+entry of that employee. The ``year`` on an entry (from the request's start
+date) is for reporting only; it does not select a balance.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from database import (get_client, hr_requests_collection, leave_ledger_collection, meta_collection,
+                      vacation_balances_collection)
+from seed_bundle import bundle_version
+
+logger = logging.getLogger(__name__)
+
+# Statuses in which a leave request no longer holds its days
+RELEASED_STATUSES = {"Rejected", "Cancelled"}
+
+# Set after the first attempt: None = unknown, False = standalone server
+_transactions_supported: Optional[bool] = None
+
+# meta document recording the seed version whose balances have opening entries
+OPENING_ENTRIES_MARKER = "leave_ledger_opening"
+
+
+def leave_bucket(request_type: str) -> Optional[str]:
+    """Map a request type to its balance bucket ("Sick Leave" -> "sick"), or None if it is not leave"""
+    if not request_type or not request_type.endswith(" Leave"):
+        return None
+    return request_type[: -len(" Leave")].strip().lower().replace(" ", "_")
+
+
+def _holds_days(request: Dict[str, Any]) -> bool:
+    return bool(request.get("days")) and request.get("status") not in RELEASED_STATUSES
+
+
+def _entry_year(request: Dict[str, Any]) -> int:
+    start = request.get("start_date") or request.get("date")
+    if start:
+        return datetime.fromisoformat(start).year
+    return request.get("submitted_date", datetime.utcnow()).year
+
+
+def _build_entry(request: Dict[str, Any], event: str, days: int, version: int) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        # One entry per request state version, so retries never double-count
+        "key": f"{request['id']}:v{version}",
+        "employee_id": request["employee_id"],
+        "request_id": request["id"],
+        "leave_type": leave_bucket(request["type"]),
+        "year": _entry_year(request),
+        "event": event,
+        "days": days,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _balance_increment(leave_type: str, days: int) -> Dict[str, int]:
+    if leave_type == "vacation":
+        return {"used_days": -days, "remaining_days": days}
+    return {f"used_by_type.{leave_type}": -days}
+
+
+async def ensure_indexes():
+    await leave_ledger_collection.create_index("key", unique=True)
+    await leave_ledger_collection.create_index([("employee_id", ASCENDING), ("year", ASCENDING)])
+
+
+async def run_atomically(operation: Callable[[Any], Awaitable[Any]]) -> Any:
+    """Run ``operation(session)`` inside a multi-document transaction when the deployment supports one.
+
+    Standalone servers reject transactions; there the writes run in order
+    (ledger entry before balance) and ``rebuild_balances`` repairs any
+    balance left behind by a crash between the two.
+    """
+    global _transactions_supported
+    if _transactions_supported is not False:
+        try:
+            async with await get_client().start_session() as session:
+                async with session.start_transaction():
+                    result = await operation(session)
+            _transactions_supported = True
+            return result
+        except OperationFailure as e:
+            # IllegalOperation: transactions need a replica set or mongos
+            if e.code != 20:
+                raise
+            _transactions_supported = False
+        except NotImplementedError:
+            # Clients without session support (e.g. mongomock)
+            _transactions_supported = False
+        logger.info("MongoDB transactions unavailable, leave ledger writes run sequentially")
+    return await operation(None)
+
+
+async def record_entry(entry: Dict[str, Any], session=None) -> bool:
+    """Append a ledger entry and fold it into the materialized balance; False if it was already recorded"""
+    if session is not None:
+        # A duplicate key error would abort the surrounding transaction, so look first
+        if await leave_ledger_collection.find_one({"key": entry["key"]}, {"_id": 1}, session=session):
+            return False
+        await leave_ledger_collection.insert_one(entry, session=session)
+    else:
+        try:
+            await leave_ledger_collection.insert_one(entry)
+        except DuplicateKeyError:
+            return False
+    await vacation_balances_collection.update_one(
+        {"employee_id": entry["employee_id"]},
+        {"$inc": _balance_increment(entry["leave_type"], entry["days"])},
+        session=session
+    )
+    return True
+
+
+async def submit_request(request: Dict[str, Any]):
+    """Insert a new HR request together with the ledger entry charging its days"""
+    request["status_version"] = 0
+
+    async def _submit(session):
+        await hr_requests_collection.insert_one(request, session=session)
+        if leave_bucket(request["type"]) and _holds_days(request):
+            await record_entry(_build_entry(request, "charge", -request["days"], 0), session)
+
+    await run_atomically(_submit)
+
+
+async def transition_request(request_id: str, update_data: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Apply a status change and charge or refund the request's days; returns the request before and after"""
+
+    async def _transition(session):
+        previous = await hr_requests_collection.find_one_and_update(
+            {"id": request_id},
+            {"$set": update_data, "$inc": {"status_version": 1}},
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if not previous:
+            return None
+
+        current = {**previous, **update_data, "status_version": previous.get("status_version", 0) + 1}
+        if leave_bucket(current["type"]):
+            was_held, is_held = _holds_days(previous), _holds_days(current)
+            if was_held and not is_held:
+                await record_entry(_build_entry(current, "refund", current["days"], current["status_version"]), session)
+            elif is_held and not was_held:
+                await record_entry(_build_entry(current, "charge", -current["days"], current["status_version"]), session)
+        return previous, current
+
+    return await run_atomically(_transition)
+
+
+async def ensure_opening_entries(force: bool = False) -> int:
+    """Record each pre-ledger balance as an opening entry so rebuilds keep historic usage.
+
+    Pre-ledger balances only arrive with the seed bundle, so the scan runs
+    once per bundle version (marked in ``meta``) unless ``force`` is set.
+    """
+    version = bundle_version()
+    if not force:
+        marker = await meta_collection.find_one({"_id": OPENING_ENTRIES_MARKER}, {"seed_version": 1})
+        if marker and marker.get("seed_version") == version:
+            return 0
+
+    employees_with_entries = set(await leave_ledger_collection.distinct("employee_id"))
+    created = 0
+    async for balance in vacation_balances_collection.find({}, {"_id": 0}):
+        if balance["employee_id"] in employees_with_entries or not balance.get("used_days"):
+            continue
+        entry = {
+            "id": str(uuid.uuid4()),
+            "key": f"opening:{balance['employee_id']}:{balance['year']}",
+            "employee_id": balance["employee_id"],
+            "request_id": None,
+            "leave_type": "vacation",
+            "year": balance["year"],
+            "event": "opening",
+            "days": -balance["used_days"],
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            await leave_ledger_collection.insert_one(entry)
+            created += 1
+        except DuplicateKeyError:
+            pass
+    await meta_collection.update_one(
+        {"_id": OPENING_ENTRIES_MARKER},
+        {"$set": {"seed_version": version, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    if created:
+        logger.info(f"Recorded {created} opening leave ledger entr{'y' if created == 1 else 'ies'}")
+    return created
+
+
+async def rebuild_balances(employee_id: Optional[str] = None) -> int:
+    """Recompute materialized balances from the ledger; returns the number of balances rewritten"""
+    await ensure_opening_entries(force=True)
+
+    balance_query = {"employee_id": employee_id} if employee_id else {}
+    rebuilt = 0
+    async for balance in vacation_balances_collection.find(balance_query, {"_id": 0}):
+        used: Dict[str, int] = defaultdict(int)
+        pipeline = [
+            # Every entry of the employee, as record_entry folds them in
+            {"$match": {"employee_id": balance["employee_id"]}},
+            {"$group": {"_id": "$leave_type", "days": {"$sum": "$days"}}},
+        ]
+        async for row in leave_ledger_collection.aggregate(pipeline):
+            used[row["_id"]] = -row["days"]
+
+        used_days = used.pop("vacation", 0)
+        await vacation_balances_collection.update_one(
+            {"employee_id": balance["employee_id"]},
+            {"$set": {
+                "used_days": used_days,
+                "remaining_days": balance["total_days"] - used_days,
+                "used_by_type": dict(used),
+            }}
+        )
+        rebuilt += 1
+    return rebuilt
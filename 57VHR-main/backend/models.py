@@ -54,6 +54,7 @@ class HRRequest(BaseModel):
     submitted_date: datetime = Field(default_factory=datetime.utcnow)
     approved_date: Optional[datetime] = None
     approved_by: Optional[str] = None
+    warnings: Optional[List[str]] = None  # Submission-time notices, never stored
 
 class HRRequestCreate(BaseModel):
     employee_id: str
@@ -83,6 +84,7 @@ class Policy(BaseModel):
     tags: List[str]
     last_updated: datetime = Field(default_factory=datetime.utcnow)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0  # Position in the policy revision log, see policy_revisions
 
 class PolicyCreate(BaseModel):
     title: str
@@ -105,6 +107,30 @@ class ChatMessageCreate(BaseModel):
     session_id: str
     message: str
 
+# Event Models
+class EventRecurrence(BaseModel):
+    freq: str  # daily, weekly, monthly, yearly
+    interval: int = 1
+    until: Optional[datetime] = None
+
+class Event(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    type: str  # Performance Review, Team Meeting, Payroll, ...
+    title: str
+    date: datetime  # First occurrence for recurring events
+    recurrence: Optional[EventRecurrence] = None
+    employee_id: Optional[str] = None  # Personal event; None for shared events
+    department: Optional[str] = None  # None means company-wide
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class EventCreate(BaseModel):
+    type: str
+    title: str
+    date: datetime
+    recurrence: Optional[EventRecurrence] = None
+    employee_id: Optional[str] = None
+    department: Optional[str] = None
+
 # Dashboard Models
 class VacationBalance(BaseModel):
     employee_id: str
@@ -112,6 +138,18 @@ class VacationBalance(BaseModel):
     used_days: int
     remaining_days: int
     year: int
+    used_by_type: Dict[str, int] = {}  # Days taken from non-vacation leave buckets, e.g. "sick"
+
+class LeaveLedgerEntry(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    key: str  # Unique per request state version (or opening balance)
+    employee_id: str
+    request_id: Optional[str] = None
+    leave_type: str  # vacation, sick, ...
+    year: int
+    event: str  # opening, charge, refund
+    days: int  # Negative when days are taken, positive when returned
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class SalaryPayment(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -0,0 +1,191 @@
+"""Typeahead for the policy search box, served from an in-memory prefix trie.
+
+Suggestions are policy titles, tags and key terms (bold headings in the
+policy text plus each policy's most distinctive words), in English and
+Arabic. Every phrase is indexed under its normalized form and under each of
+its later words (and Arabic words without "ال"), so "leave" and "اجازه" both
+reach "Annual Leave Policy - الإجازة السنوية".
+
+Each trie node stores its best ``TOP_K`` suggestions precomputed at build
+time, so a lookup is one walk down the prefix with no sorting and no Mongo
+access. The trie is rebuilt from the policies collection when the policy
+change feed reports a change, and swapped in whole.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database import policies_collection
+from policy_text import STOPWORDS, bold_phrases, is_arabic, normalize, strip_article, tokenize, words
+
+logger = logging.getLogger(__name__)
+
+TOP_K = int(os.environ.get('AUTOCOMPLETE_TOP_K', '10'))
+TERMS_PER_POLICY = int(os.environ.get('AUTOCOMPLETE_TERMS_PER_POLICY', '8'))
+
+# Suggestion kind -> base score
+KIND_WEIGHTS = {"title": 3.0, "tag": 2.0, "heading": 1.5, "term": 1.0}
+# Matches on a later word rank below matches on the start of the phrase
+INNER_WORD_FACTOR = 0.6
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: List[Dict[str, Any]] = []
+        self.top: List[Dict[str, Any]] = []
+
+
+class PrefixTrie:
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+
+    def insert(self, key: str, score: float, suggestion: Dict[str, Any]):
+        node = self.root
+        for ch in key:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+        node.entries.append({**suggestion, "score": round(score, 4), "_key": normalize(suggestion["text"])})
+        self.size += 1
+
+    def finalize(self, k: int = TOP_K):
+        """Precompute every node's best ``k`` suggestions with distinct text (post-order, iterative)"""
+        stack: List[Tuple[_Node, bool]] = [(self.root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            candidates = node.entries + [item for child in node.children.values() for item in child.top]
+            candidates.sort(key=lambda item: -item["score"])
+            seen = set()
+            top = []
+            for suggestion in candidates:
+                if suggestion["_key"] in seen:
+                    continue
+                seen.add(suggestion["_key"])
+                top.append(suggestion)
+                if len(top) == k:
+                    break
+            node.top = top
+            node.entries = []
+        for node in self._nodes():
+            node.top = [{k: v for k, v in item.items() if k != "_key"} for item in node.top]
+
+    def _nodes(self):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children.values())
+
+    def lookup(self, prefix: str, limit: int = TOP_K) -> List[Dict[str, Any]]:
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.top[:limit]
+
+
+def _index_keys(phrase: str) -> List[Tuple[str, float]]:
+    """Normalized keys a phrase is reachable from, with their score factor"""
+    tokens = words(phrase)
+    keys = []
+    for i, token in enumerate(tokens):
+        factor = 1.0 if i == 0 else INNER_WORD_FACTOR
+        keys.append((" ".join(tokens[i:]), factor))
+        if is_arabic(token) and strip_article(token) != token:
+            keys.append((" ".join([strip_article(token)] + tokens[i + 1:]), factor))
+    return keys
+
+
+def _distinctive_terms(policies: List[Dict[str, Any]]) -> Dict[str, List[Tuple[str, float]]]:
+    """Per policy, its top TF-IDF words from the content (English and Arabic), in their usual spelling"""
+    counts = {}
+    spellings: Dict[str, Counter] = defaultdict(Counter)
+    document_frequency: Counter = Counter()
+    for policy in policies:
+        text = f"{policy.get('content', '')} {policy.get('content_ar', '')}"
+        tokens = []
+        for token, start, end in tokenize(text):
+            if len(token) > 3 and token not in STOPWORDS and not token.isdigit():
+                tokens.append(token)
+                spellings[token][text[start:end].lower()] += 1
+        counts[policy["id"]] = Counter(tokens)
+        document_frequency.update(set(tokens))
+    total = len(policies)
+    terms = {}
+    for policy_id, counter in counts.items():
+        scored = [
+            (spellings[term].most_common(1)[0][0], (1 + math.log(count)) * math.log(1 + total / document_frequency[term]))
+            for term, count in counter.items()
+        ]
+        scored.sort(key=lambda item: -item[1])
+        terms[policy_id] = scored[:TERMS_PER_POLICY]
+    return terms
+
+
+def build_trie(policies: List[Dict[str, Any]]) -> PrefixTrie:
+    trie = PrefixTrie()
+    terms = _distinctive_terms(policies)
+
+    def add(text: str, kind: str, policy: Dict[str, Any], boost: float = 0.0):
+        suggestion = {"text": text, "kind": kind, "policyId": policy["id"], "policyTitle": policy["title"]}
+        for key, factor in _index_keys(text):
+            trie.insert(key, (KIND_WEIGHTS[kind] + boost) * factor, suggestion)
+
+    for policy in policies:
+        # Bilingual titles read "English - Arabic"; each half is its own suggestion
+        for part in policy["title"].split(" - "):
+            add(part.strip(), "title", policy)
+        for tag in policy.get("tags", []):
+            add(tag, "tag", policy)
+        for heading in bold_phrases(policy.get("content", "")):
+            add(heading, "heading", policy)
+        top_weight = max((weight for _, weight in terms.get(policy["id"], [])), default=1.0)
+        for term, weight in terms.get(policy["id"], []):
+            add(term, "term", policy, boost=weight / top_weight / 2)
+    trie.finalize()
+    return trie
+
+
+class PolicyAutocomplete:
+    def __init__(self):
+        self.trie = PrefixTrie()
+        self.built_at: Optional[float] = None
+        self.build_ms: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def rebuild(self):
+        async with self._lock:
+            policies = await policies_collection.find(
+                {}, {"_id": 0, "id": 1, "title": 1, "tags": 1, "content": 1, "content_ar": 1}
+            ).to_list(None)
+            started = time.perf_counter()
+            self.trie = await asyncio.to_thread(build_trie, policies)
+            self.build_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.built_at = time.time()
+        logger.info(f"Policy autocomplete rebuilt: {self.trie.size} keys from {len(policies)} policies in {self.build_ms} ms")
+
+    async def on_policy_change(self, changed: Iterable[str], deleted: Iterable[str]):
+        await self.rebuild()
+
+    def suggest(self, query: str, limit: int = TOP_K) -> List[Dict[str, Any]]:
+        prefix = " ".join(words(query))
+        if not prefix:
+            return []
+        # Keep a trailing space so "annual " only completes the next word
+        if query.endswith(" "):
+            prefix += " "
+        return self.trie.lookup(prefix, limit)
@@ -0,0 +1,171 @@
+"""HTTP response cache for the near-static policy endpoints.
+
+Bodies are serialized with orjson and compressed once per encoding (see
+``compression``), then served from memory keyed by route and query string,
+with a strong ETag (hash of the uncompressed body; its weak form on
+compressed responses) and ``Last-Modified`` taken from the policies'
+``last_updated``. Conditional requests (``If-None-Match`` /
+``If-Modified-Since``) are answered with an empty 304.
+
+The whole cache is dropped when the policy collection's state token - the
+newest ``last_updated`` plus the document count, so deletions count too -
+changes. The token is re-read at most every ``POLICY_CACHE_CHECK_SECONDS``.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+import compression
+from database import policies_collection
+
+logger = logging.getLogger(__name__)
+
+CHECK_SECONDS = float(os.environ.get('POLICY_CACHE_CHECK_SECONDS', '5'))
+MAX_ENTRIES = int(os.environ.get('POLICY_CACHE_MAX_ENTRIES', '256'))
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass
+class CachedBody:
+    body: bytes
+    # encoding -> compressed body, only for encodings that made it smaller
+    encoded: Dict[str, bytes]
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def _http_date(value: datetime) -> str:
+    # Stored datetimes are naive UTC; HTTP dates have second precision
+    return format_datetime(value.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if not last_modified or not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+
+class PolicyResponseCache:
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[str, str], CachedBody]" = OrderedDict()
+        self._token: Optional[Tuple[Any, int]] = None
+        self._token_checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def invalidate(self):
+        self._entries.clear()
+        self._token_checked_at = 0.0
+
+    async def _state_token(self) -> Tuple[Any, int]:
+        pipeline = [{"$group": {"_id": None, "last_updated": {"$max": "$last_updated"}, "count": {"$sum": 1}}}]
+        rows = await policies_collection.aggregate(pipeline).to_list(1)
+        return (rows[0]["last_updated"], rows[0]["count"]) if rows else (None, 0)
+
+    async def _revalidate(self):
+        if time.monotonic() - self._token_checked_at < CHECK_SECONDS:
+            return
+        async with self._lock:
+            if time.monotonic() - self._token_checked_at < CHECK_SECONDS:
+                return
+            token = await self._state_token()
+            if token != self._token:
+                if self._token is not None:
+                    logger.info("Policies changed, dropping cached policy responses")
+                self._entries.clear()
+                self._token = token
+            self._token_checked_at = time.monotonic()
+
+    @property
+    def last_updated(self) -> Optional[datetime]:
+        return self._token[0] if self._token else None
+
+    def _store(self, key: Tuple[str, str], content: Any, last_modified: Optional[datetime]) -> CachedBody:
+        body = orjson.dumps(content)
+        encoded = {}
+        if len(body) >= compression.MIN_BYTES:
+            for encoding in compression.ENCODINGS:
+                data = compression.compress(body, encoding)
+                if len(data) < len(body):
+                    encoded[encoding] = data
+        entry = CachedBody(
+            body=body,
+            encoded=encoded,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            last_modified=last_modified,
+        )
+        self._entries[key] = entry
+        while len(self._entries) > MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        return entry
+
+    async def serve(self, request: Request, build: Callable[[], Awaitable[Tuple[Any, Optional[datetime]]]]) -> Response:
+        """Answer from the cache, calling ``build() -> (content, last_modified)`` on a miss"""
+        await self._revalidate()
+        key = (request.url.path, str(request.query_params))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            content, last_modified = await build()
+            entry = self._store(key, content, last_modified)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        encoding = compression.negotiate(request.headers.get("accept-encoding", ""), entry.encoded)
+        etag = compression.weak_etag(entry.etag) if encoding else entry.etag
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if entry.last_modified:
+            headers["Last-Modified"] = _http_date(entry.last_modified)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            unchanged = _etag_matches(if_none_match, entry.etag)
+        else:
+            unchanged = _not_modified_since(request.headers.get("if-modified-since", ""), entry.last_modified)
+        if unchanged:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            data = entry.encoded[encoding]
+            compression.metrics.record(encoding, len(entry.body), len(data), cached=True)
+            headers["Content-Encoding"] = encoding
+            return Response(data, media_type="application/json", headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "notModified": self.not_modified,
+            "lastUpdated": self.last_updated.isoformat() if self.last_updated else None,
+        }
@@ -0,0 +1,189 @@
+"""Policy versions, the revision log and the change feed built on it.
+
+Every policy write takes the next value of a global sequence (``meta``
+document ``policy_version``), stores it on the policy as ``version`` and
+appends ``{version, policy_id, op}`` to ``policy_revisions`` in the same unit
+of work. Clients sync with ``changes_since(version)``; inside the backend,
+``PolicyFeed`` tails the same log and tells its listeners (response cache,
+autocomplete, search index, AI policy context) which policies changed,
+including writes made by other workers.
+
+Versions are handed out before their revision is written, so a reader can
+briefly see version N+1 while N is still in flight. Reads stop at the first
+such gap unless it is older than ``POLICY_FEED_GAP_GRACE_SECONDS`` (a writer
+that died mid-way), so no client ever skips past a change.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pymongo import ASCENDING, ReturnDocument
+
+from database import meta_collection, policies_collection, policy_revisions_collection
+from leave_ledger import run_atomically
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = float(os.environ.get('POLICY_FEED_POLL_SECONDS', '5'))
+GAP_GRACE = timedelta(seconds=float(os.environ.get('POLICY_FEED_GAP_GRACE_SECONDS', '30')))
+
+VERSION_ID = "policy_version"
+
+
+async def _next_version(session=None) -> int:
+    counter = await meta_collection.find_one_and_update(
+        {"_id": VERSION_ID}, {"$inc": {"value": 1}},
+        upsert=True, return_document=ReturnDocument.AFTER, session=session
+    )
+    return counter["value"]
+
+
+async def current_version() -> int:
+    counter = await meta_collection.find_one({"_id": VERSION_ID})
+    return counter["value"] if counter else 0
+
+
+async def _record(policy_id: str, op: str, session=None) -> int:
+    version = await _next_version(session)
+    await policy_revisions_collection.insert_one(
+        {"version": version, "policy_id": policy_id, "op": op, "at": datetime.utcnow()}, session=session
+    )
+    return version
+
+
+async def ensure_setup():
+    """Create indexes and version any policy written without one (e.g. by the seed bundle)"""
+    await policy_revisions_collection.create_index("version", unique=True)
+    await policy_revisions_collection.create_index("policy_id")
+    await policies_collection.create_index("version")
+    async for policy in policies_collection.find({"version": {"$exists": False}}, {"_id": 0, "id": 1}):
+        async def _backfill(session, policy_id=policy["id"]):
+            version = await _next_version(session)
+            await policies_collection.update_one(
+                {"id": policy_id, "version": {"$exists": False}}, {"$set": {"version": version}}, session=session
+            )
+            # Recorded even if another worker won the race, so the sequence has no holes
+            await policy_revisions_collection.insert_one(
+                {"version": version, "policy_id": policy_id, "op": "upsert", "at": datetime.utcnow()}, session=session
+            )
+        await run_atomically(_backfill)
+
+
+async def save_policy(policy: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert or replace a policy under a new version"""
+    async def _save(session):
+        version = await _next_version(session)
+        policy.update(version=version, last_updated=datetime.utcnow())
+        await policies_collection.replace_one({"id": policy["id"]}, policy, upsert=True, session=session)
+        await policy_revisions_collection.insert_one(
+            {"version": version, "policy_id": policy["id"], "op": "upsert", "at": policy["last_updated"]},
+            session=session
+        )
+        return policy
+
+    return await run_atomically(_save)
+
+
+async def delete_policy(policy_id: str) -> Optional[Dict[str, Any]]:
+    """Delete a policy and log the deletion; returns the deleted policy"""
+    async def _delete(session):
+        deleted = await policies_collection.find_one_and_delete({"id": policy_id}, {"_id": 0}, session=session)
+        if deleted:
+            await _record(policy_id, "delete", session)
+        return deleted
+
+    return await run_atomically(_delete)
+
+
+async def _revisions_after(since: int) -> List[Dict[str, Any]]:
+    """Revisions newer than ``since``, cut at the first gap that may still be filled"""
+    revisions = await policy_revisions_collection.find(
+        {"version": {"$gt": since}}, {"_id": 0}
+    ).sort("version", ASCENDING).to_list(None)
+    expected = since + 1
+    cutoff = datetime.utcnow() - GAP_GRACE
+    for index, revision in enumerate(revisions):
+        if revision["version"] != expected and revision["at"] > cutoff:
+            return revisions[:index]
+        expected = revision["version"] + 1
+    return revisions
+
+
+async def changes_since(since: int, projection: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Policies changed or deleted after version ``since``, and the version to ask from next time"""
+    latest = await current_version()
+    reset = since > latest
+    if reset:
+        # The client's version comes from another database; resend everything
+        since = 0
+    revisions = await _revisions_after(since)
+    last_op: Dict[str, str] = {}
+    for revision in revisions:
+        last_op[revision["policy_id"]] = revision["op"]
+
+    changed_ids = [policy_id for policy_id, op in last_op.items() if op == "upsert"]
+    changed = await policies_collection.find(
+        {"id": {"$in": changed_ids}}, projection or {"_id": 0}
+    ).sort("version", ASCENDING).to_list(None) if changed_ids else []
+    found = {policy["id"] for policy in changed}
+    deleted = [policy_id for policy_id, op in last_op.items() if op == "delete" or policy_id not in found]
+    return {
+        "version": revisions[-1]["version"] if revisions else since,
+        "changed": changed,
+        "deleted": deleted,
+        "reset": reset,
+    }
+
+
+class PolicyFeed:
+    """Fans the revision log out to in-process listeners"""
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._listeners: List[Callable[[Set[str], Set[str]], Any]] = []
+        self._lock = asyncio.Lock()
+
+    def subscribe(self, listener: Callable[[Set[str], Set[str]], Any]):
+        """``listener(changed_ids, deleted_ids)``; may be a coroutine function"""
+        self._listeners.append(listener)
+
+    async def start(self):
+        self.version = await current_version()
+
+    async def _notify(self, changed: Set[str], deleted: Set[str]):
+        for listener in self._listeners:
+            try:
+                result = listener(changed, deleted)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Policy feed listener {listener!r} failed: {e}")
+
+    async def poll(self) -> int:
+        """Deliver revisions written since the last poll; returns how many were delivered"""
+        async with self._lock:
+            if self.version is None:
+                self.version = await current_version()
+                return 0
+            revisions = await _revisions_after(self.version)
+            if not revisions:
+                return 0
+            changed: Set[str] = set()
+            deleted: Set[str] = set()
+            for revision in revisions:
+                target, other = (deleted, changed) if revision["op"] == "delete" else (changed, deleted)
+                target.add(revision["policy_id"])
+                other.discard(revision["policy_id"])
+            self.version = revisions[-1]["version"]
+        await self._notify(changed, deleted)
+        return len(revisions)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(POLL_SECONDS)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Policy feed poll failed: {e}")
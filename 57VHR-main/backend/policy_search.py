@@ -0,0 +1,245 @@
+"""Policy full-text search with passage snippets, over an in-memory positional index.
+
+Each policy's title, tags and content (English and Arabic) are tokenized once
+with ``policy_text.tokenize``; the index keeps, per normalized term, the token
+positions where it occurs in each field, and per field the character span of
+every token. Results are ranked with BM25 across weighted fields. A quoted
+phrase (``"annual leave"``) also requires its words at consecutive positions
+of one field, checked from the same postings.
+
+Snippets are chosen from the query terms' positions alone: a window of
+``SEARCH_SNIPPET_TOKENS`` tokens covering the most distinct query terms is
+mapped back to characters through the stored spans and sliced out of the
+original text, with highlight offsets relative to the snippet. Nothing is
+rescanned at query time, and responses carry short passages instead of whole
+policies.
+
+The index is updated per policy from the policy change feed.
+"""
+import asyncio
+import logging
+import math
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from database import policies_collection
+from policy_text import STOPWORDS, is_arabic, strip_article, tokenize, words
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_TOKENS = int(os.environ.get('SEARCH_SNIPPET_TOKENS', '28'))
+SNIPPETS_PER_RESULT = int(os.environ.get('SEARCH_SNIPPETS_PER_RESULT', '2'))
+
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "content": 1.0, "content_ar": 1.0}
+SNIPPET_FIELDS = ("content", "content_ar")
+
+PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+@dataclass
+class _Document:
+    id: str
+    title: str
+    category: str
+    text: Dict[str, str]
+    # field -> character span of each token position
+    spans: Dict[str, List[Tuple[int, int]]]
+    terms: Set[str] = field(default_factory=set)
+
+
+def _field_text(policy: Dict[str, Any], name: str) -> str:
+    if name == "tags":
+        return " ".join(policy.get("tags") or [])
+    return policy.get(name) or ""
+
+
+def _index_forms(token: str) -> List[str]:
+    if is_arabic(token):
+        stripped = strip_article(token)
+        if stripped != token:
+            return [token, stripped]
+    return [token]
+
+
+class PolicySearchIndex:
+    def __init__(self):
+        self.documents: Dict[str, _Document] = {}
+        # term -> policy id -> field -> positions
+        self.postings: Dict[str, Dict[str, Dict[str, List[int]]]] = defaultdict(dict)
+        self._field_length_totals: Dict[str, int] = defaultdict(int)
+        self._lock = asyncio.Lock()
+
+    def add(self, policy: Dict[str, Any]):
+        self.remove(policy["id"])
+        document = _Document(
+            id=policy["id"], title=policy.get("title", ""), category=policy.get("category", ""), text={}, spans={}
+        )
+        for name in FIELD_WEIGHTS:
+            text = _field_text(policy, name)
+            spans = []
+            for position, (token, start, end) in enumerate(tokenize(text)):
+                spans.append((start, end))
+                for form in _index_forms(token):
+                    self.postings[form].setdefault(document.id, {}).setdefault(name, []).append(position)
+                    document.terms.add(form)
+            document.text[name] = text
+            document.spans[name] = spans
+            self._field_length_totals[name] += len(spans)
+        self.documents[document.id] = document
+
+    def remove(self, policy_id: str):
+        document = self.documents.pop(policy_id, None)
+        if not document:
+            return
+        for term in document.terms:
+            by_policy = self.postings.get(term)
+            if by_policy is not None:
+                by_policy.pop(policy_id, None)
+                if not by_policy:
+                    del self.postings[term]
+        for name, spans in document.spans.items():
+            self._field_length_totals[name] -= len(spans)
+
+    async def rebuild(self):
+        async with self._lock:
+            policies = await policies_collection.find({}, {"_id": 0}).to_list(None)
+            # Built aside and swapped in, so searches never see a half-built index
+            fresh = await asyncio.to_thread(_build_index, policies)
+            self.documents, self.postings, self._field_length_totals = (
+                fresh.documents, fresh.postings, fresh._field_length_totals
+            )
+        logger.info(f"Policy search index built: {len(self.postings)} terms from {len(policies)} policies")
+
+    async def on_policy_change(self, changed: Iterable[str], deleted: Iterable[str]):
+        async with self._lock:
+            for policy_id in deleted:
+                self.remove(policy_id)
+            changed = list(changed)
+            if changed:
+                async for policy in policies_collection.find({"id": {"$in": changed}}, {"_id": 0}):
+                    self.add(policy)
+
+    def _query_terms(self, query: str) -> List[str]:
+        tokens = words(query)
+        terms = [token for token in tokens if token not in STOPWORDS] or tokens
+        return list(dict.fromkeys(strip_article(term) if is_arabic(term) else term for term in terms))
+
+    def _phrases(self, query: str) -> List[List[str]]:
+        phrases = []
+        for match in PHRASE_RE.finditer(query):
+            tokens = [strip_article(token) if is_arabic(token) else token for token in words(match.group(1))]
+            if len(tokens) > 1:
+                phrases.append(tokens)
+        return phrases
+
+    def _has_phrase(self, policy_id: str, phrase: List[str]) -> bool:
+        fields = [self.postings.get(term, {}).get(policy_id, {}) for term in phrase]
+        for name in FIELD_WEIGHTS:
+            # Positions where the phrase could start, narrowed by each following word
+            starts = set(fields[0].get(name, []))
+            for offset, term_fields in enumerate(fields[1:], start=1):
+                starts &= {position - offset for position in term_fields.get(name, [])}
+            if starts:
+                return True
+        return False
+
+    def _score(self, terms: List[str], policy_id: str) -> float:
+        total_documents = len(self.documents)
+        document = self.documents[policy_id]
+        score = 0.0
+        for term in terms:
+            by_policy = self.postings.get(term, {})
+            fields = by_policy.get(policy_id)
+            if not fields:
+                continue
+            idf = math.log(1 + (total_documents - len(by_policy) + 0.5) / (len(by_policy) + 0.5))
+            for name, positions in fields.items():
+                average = self._field_length_totals[name] / total_documents or 1
+                length = len(document.spans[name])
+                tf = len(positions)
+                score += FIELD_WEIGHTS[name] * idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average))
+        return score
+
+    def _snippet(self, document: _Document, name: str, first: int, last: int, hits: List[int]) -> Dict[str, Any]:
+        spans = document.spans[name]
+        # Center the matched positions in a window of SNIPPET_TOKENS tokens
+        begin = max(0, first - max(SNIPPET_TOKENS - (last - first + 1), 0) // 2)
+        end = min(len(spans) - 1, max(begin + SNIPPET_TOKENS - 1, last))
+        offset = spans[begin][0]
+        return {
+            "field": name,
+            "text": document.text[name][offset:spans[end][1]],
+            "highlights": [[spans[p][0] - offset, spans[p][1] - offset] for p in hits],
+            "truncatedStart": begin > 0,
+            "truncatedEnd": end < len(spans) - 1,
+        }
+
+    def _snippets(self, terms: List[str], document: _Document) -> List[Dict[str, Any]]:
+        windows = []
+        for name in SNIPPET_FIELDS:
+            hits = sorted(
+                (position, term) for term in terms
+                for position in self.postings.get(term, {}).get(document.id, {}).get(name, [])
+            )
+            j = 0
+            for i in range(len(hits)):
+                # Hits inside the window that starts at hit i
+                j = max(j, i)
+                while j + 1 < len(hits) and hits[j + 1][0] - hits[i][0] < SNIPPET_TOKENS:
+                    j += 1
+                window = hits[i:j + 1]
+                distinct = len({term for _, term in window})
+                windows.append((distinct, len(window), name, window[0][0], window[-1][0], [p for p, _ in window]))
+
+        windows.sort(key=lambda window: (-window[0], -window[1], window[3]))
+        chosen = []
+        for _, _, name, first, last, positions in windows:
+            if any(name == other[0] and abs(first - other[1]) < SNIPPET_TOKENS for other in chosen):
+                continue
+            chosen.append((name, first, last, positions))
+            if len(chosen) == SNIPPETS_PER_RESULT:
+                break
+        if not chosen and document.spans.get("content"):
+            # Matched on title or tags only: lead with the opening of the policy
+            return [self._snippet(document, "content", 0, 0, [])]
+        return [self._snippet(document, *window) for window in chosen]
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+        terms = self._query_terms(query)
+        candidates: Set[str] = set()
+        for term in terms:
+            candidates.update(self.postings.get(term, {}))
+        if category and category != "all":
+            candidates = {pid for pid in candidates if self.documents[pid].category == category}
+        phrases = self._phrases(query)
+        if phrases:
+            candidates = {pid for pid in candidates if all(self._has_phrase(pid, phrase) for phrase in phrases)}
+
+        ranked = sorted(((self._score(terms, pid), pid) for pid in candidates), key=lambda item: -item[0])
+        results = []
+        for score, policy_id in ranked[:limit]:
+            document = self.documents[policy_id]
+            title_hits = sorted(p for term in terms for p in self.postings.get(term, {}).get(policy_id, {}).get("title", []))
+            results.append({
+                "id": policy_id,
+                "title": document.title,
+                "category": document.category,
+                "score": round(score, 4),
+                "titleHighlights": [list(document.spans["title"][p]) for p in title_hits],
+                "snippets": self._snippets(terms, document),
+            })
+        return {"query": query, "terms": terms, "phrases": phrases, "total": len(ranked), "results": results}
+
+
+def _build_index(policies: List[Dict[str, Any]]) -> PolicySearchIndex:
+    index = PolicySearchIndex()
+    for policy in policies:
+        index.add(policy)
+    return index
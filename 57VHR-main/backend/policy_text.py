@@ -0,0 +1,70 @@
+"""Text normalization shared by policy autocomplete and search.
+
+Policies mix English and Arabic. ``normalize`` case-folds, strips accents and
+Arabic diacritics/tatweel and folds the letter variants people type
+interchangeably (أ/إ/آ -> ا, ى -> ي, ة -> ه), so queries match regardless of
+spelling. ``tokenize`` keeps each token's offsets in the original text.
+"""
+import re
+import unicodedata
+from typing import Iterator, List, Tuple
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+_FOLD = str.maketrans({"ى": "ي", "ة": "ه", "ـ": None})
+
+ARABIC_ARTICLE = "ال"
+
+STOPWORDS = {
+    # English
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "its",
+    "of", "on", "or", "that", "the", "their", "this", "to", "was", "will", "with", "per", "all", "any",
+    "may", "must", "shall", "should", "can", "not", "been", "each", "other", "such", "than", "they",
+    "who", "which", "when", "where", "our", "your", "his", "her", "within", "after", "before", "up",
+    # Arabic (normalized)
+    "في", "من", "علي", "الي", "عن", "مع", "او", "و", "ان", "هذه", "هذا", "التي", "الذي", "كل", "قد", "ما",
+    "لا", "ثم", "بعد", "قبل", "حتي", "عند", "لكل", "به", "بها", "له", "لها",
+}
+
+
+def normalize(text: str) -> str:
+    """Search form of ``text``: case-folded, accents and diacritics removed, Arabic letter variants folded"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    # Dropping combining marks also turns hamza/madda alef forms into a bare alef
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return unicodedata.normalize("NFC", stripped).translate(_FOLD)
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, int, int]]:
+    """(normalized token, start, end) for each word, with offsets into ``text``"""
+    for match in WORD_RE.finditer(text):
+        token = normalize(match.group())
+        if token:
+            yield token, match.start(), match.end()
+
+
+def words(text: str) -> List[str]:
+    return [token for token, _, _ in tokenize(text)]
+
+
+def is_arabic(token: str) -> bool:
+    return any("؀" <= ch <= "ۿ" for ch in token)
+
+
+def strip_article(token: str) -> str:
+    """Arabic token without the definite article, so "اجازه" finds "الاجازه\""""
+    if token.startswith(ARABIC_ARTICLE) and len(token) > len(ARABIC_ARTICLE) + 2:
+        return token[len(ARABIC_ARTICLE):]
+    return token
+
+
+def bold_phrases(content: str) -> List[str]:
+    """Markdown **headings** in policy content, split into their English and Arabic halves"""
+    phrases = []
+    for match in BOLD_RE.finditer(content):
+        for part in match.group(1).split("/"):
+            part = part.strip().rstrip(":").strip()
+            if 2 < len(part) <= 60:
+                phrases.append(part)
+    return phrases
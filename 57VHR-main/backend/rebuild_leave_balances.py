@@ -0,0 +1,24 @@
+"""Recompute every materialized leave balance from the leave ledger.
+
+Usage: python rebuild_leave_balances.py [EMPLOYEE_ID]
+"""
+from pathlib import Path
+from dotenv import load_dotenv
+import asyncio
+import sys
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+import leave_ledger
+
+
+async def main():
+    employee_id = sys.argv[1] if len(sys.argv) > 1 else None
+    await leave_ledger.ensure_indexes()
+    rebuilt = await leave_ledger.rebuild_balances(employee_id)
+    print(f"✅ Rebuilt {rebuilt} leave balance(s) from the ledger")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
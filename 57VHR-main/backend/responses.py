@@ -0,0 +1,29 @@
+"""Fast JSON rendering for list and detail endpoints.
+
+All routes render with orjson (datetimes are encoded natively). Handlers read
+documents with a projection of exactly the response model's fields and return
+them as plain dicts, so FastAPI validates each row once through
+``response_model`` instead of once in the handler and again on the way out.
+With ``TRUSTED_DB_RESPONSES=1`` documents written by this service skip that
+pass too and go straight to orjson; fields missing from a stored document
+are then omitted instead of rendered as defaults.
+"""
+import os
+from typing import Any, Dict, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+TRUSTED_DB_RESPONSES = os.environ.get('TRUSTED_DB_RESPONSES', '0') == '1'
+
+
+def model_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection selecting a model's fields and dropping ``_id``"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+def db_response(content: Any):
+    """Return projected documents, skipping response_model validation when they are trusted"""
+    if TRUSTED_DB_RESPONSES:
+        return ORJSONResponse(content)
+    return content
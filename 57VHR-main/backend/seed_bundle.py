@@ -0,0 +1,60 @@
+"""Versioned, gzip-compressed seed data for the HR Hub database.
+
+The bundle is JSON with datetimes written as ``{"$date": "<iso>"}``. It is
+only read when the seed version stored in MongoDB differs from
+``bundle_version()``, so normal worker boots never parse it.
+
+Edit the seed data with:
+    python seed_bundle.py export seed.json   # bundle -> editable JSON
+    python seed_bundle.py build seed.json    # JSON -> bundle (bump "version" first)
+"""
+import gzip
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+BUNDLE_PATH = Path(__file__).parent / 'seed' / 'hr_seed.json.gz'
+VERSION_PATH = Path(__file__).parent / 'seed' / 'VERSION'
+
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} in seed bundle")
+
+
+def _decode(obj: Dict[str, Any]):
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def bundle_version() -> str:
+    """The bundle's version, read from a tiny sidecar file so the bundle itself stays unopened"""
+    return VERSION_PATH.read_text().strip()
+
+
+def load_bundle() -> Dict[str, Any]:
+    with gzip.open(BUNDLE_PATH, 'rt', encoding='utf-8') as f:
+        return json.load(f, object_hook=_decode)
+
+
+def write_bundle(data: Dict[str, Any]):
+    BUNDLE_PATH.parent.mkdir(exist_ok=True)
+    payload = json.dumps(data, default=_encode, ensure_ascii=False, separators=(',', ':'))
+    # mtime=0 keeps the compressed bytes reproducible
+    with open(BUNDLE_PATH, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as f:
+        f.write(payload.encode('utf-8'))
+    VERSION_PATH.write_text(f"{data['version']}\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("export", "build"):
+        sys.exit(__doc__)
+    command, path = sys.argv[1], Path(sys.argv[2])
+    if command == "export":
+        path.write_text(json.dumps(load_bundle(), default=_encode, ensure_ascii=False, indent=2), encoding='utf-8')
+    else:
+        write_bundle(json.loads(path.read_text(encoding='utf-8'), object_hook=_decode))
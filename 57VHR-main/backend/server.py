@@ -6,9 +6,10 @@ import os
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
@@ -21,18 +22,111 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from models import *
 from database import *
-from ai_service import AIHRAssistant
+import leave_ledger
+import counters
+import policy_revisions
+from responses import TRUSTED_DB_RESPONSES, db_response, model_projection
+from policy_cache import PolicyResponseCache
+from policy_autocomplete import PolicyAutocomplete
+from policy_search import PolicySearchIndex
+import compression
+from leave_calendar import LeaveCalendar
+from events_service import UpcomingEvents
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# AI service, created on first chat request or by the startup warmup task
+ai_assistant = None
+_ai_assistant_lock = asyncio.Lock()
 
-# Initialize AI service
-ai_assistant = AIHRAssistant()
+# Set AI_WARMUP=0 to skip loading the AI and analytics stacks in the background after startup
+AI_WARMUP = os.environ.get('AI_WARMUP', '1') != '0'
+
+def _analytics():
+    # pandas/NumPy are imported by the warmup task or the first analytics request
+    import analytics
+    return analytics
+
+def _create_ai_assistant():
+    from ai_service import AIHRAssistant
+    return AIHRAssistant()
+
+async def get_ai_assistant():
+    global ai_assistant
+    if ai_assistant is None:
+        async with _ai_assistant_lock:
+            if ai_assistant is None:
+                # Importing the OpenAI SDK is slow; keep it off the event loop
+                ai_assistant = await asyncio.to_thread(_create_ai_assistant)
+    return ai_assistant
+
+async def warm_up():
+    await asyncio.to_thread(_analytics)
+    try:
+        await get_ai_assistant()
+        logger.info("AI assistant warmed up")
+    except ValueError as e:
+        logger.warning(f"AI assistant unavailable: {e}")
+
+# In-memory team leave calendar
+leave_calendar = LeaveCalendar()
+
+# Upcoming events with a per-day cache of expanded recurrences
+upcoming_events_service = UpcomingEvents()
+
+# Serialized, pre-compressed policy responses with ETag revalidation
+policy_cache = PolicyResponseCache()
+
+# Revision log tail that tells in-process caches which policies changed
+policy_feed = policy_revisions.PolicyFeed()
+
+def _on_policy_change(changed, deleted):
+    policy_cache.invalidate()
+    if ai_assistant is not None:
+        ai_assistant.invalidate_policy_context()
+
+policy_feed.subscribe(_on_policy_change)
+
+# Typeahead trie over policy titles, tags and key terms
+policy_autocomplete = PolicyAutocomplete()
+policy_feed.subscribe(policy_autocomplete.on_policy_change)
+
+# Positional full-text index that answers searches with highlighted snippets
+policy_search_index = PolicySearchIndex()
+policy_feed.subscribe(policy_search_index.on_policy_change)
+
+# Warn when a vacation overlaps at least this many teammates in the department
+LEAVE_OVERLAP_WARNING_THRESHOLD = int(os.environ.get('LEAVE_OVERLAP_WARNING_THRESHOLD', '2'))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The shared MongoDB client (see database.get_client) is created here, on first use
+    await init_database()
+    await leave_ledger.ensure_indexes()
+    await leave_ledger.ensure_opening_entries()
+    await leave_calendar.load()
+    await upcoming_events_service.ensure_setup()
+    await policy_revisions.ensure_setup()
+    await policy_feed.start()
+    await policy_autocomplete.rebuild()
+    await policy_search_index.rebuild()
+    await counters.ensure_counters()
+    counters_task = asyncio.create_task(counters.reconcile_periodically())
+    policy_feed_task = asyncio.create_task(policy_feed.run())
+    # Endpoints serve immediately; the heavy AI and analytics imports load behind them
+    warmup_task = asyncio.create_task(warm_up()) if AI_WARMUP else None
+    yield
+    counters_task.cancel()
+    policy_feed_task.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    close_client()
 
 # Create the main app
-app = FastAPI(title="1957 Ventures HR Hub API", version="1.0.0")
+app = FastAPI(
+    title="1957 Ventures HR Hub API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -46,10 +140,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_db():
-    await init_database()
+# Compress large JSON bodies (policy content, request lists) for clients that accept it
+app.add_middleware(compression.CompressionMiddleware)
 
 # Basic health check
 @api_router.get("/")
@@ -59,15 +151,15 @@ async def root():
 # Employee endpoints
 @api_router.get("/employees/{employee_id}", response_model=Employee)
 async def get_employee(employee_id: str):
-    employee = await employees_collection.find_one({"id": employee_id})
+    employee = await employees_collection.find_one({"id": employee_id}, model_projection(Employee))
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return Employee(**employee)
+    return db_response(employee)
 
 @api_router.get("/employees", response_model=List[Employee])
 async def get_employees():
-    employees = await employees_collection.find().to_list(100)
-    return [Employee(**emp) for emp in employees]
+    employees = await employees_collection.find({}, model_projection(Employee)).to_list(100)
+    return db_response(employees)
 
 # Dashboard endpoints
 @api_router.get("/dashboard/{employee_id}")
@@ -132,11 +224,7 @@ async def get_dashboard_data(employee_id: str):
         "endDate": ""
     }
     
-    # Mock upcoming events (could be enhanced with actual event system)
-    upcoming_events = [
-        {"type": "Performance Review", "date": "2025-01-30"},
-        {"type": "Team Meeting", "date": "2025-01-15"}
-    ]
+    upcoming_events = await upcoming_events_service.next_events(employee)
     
     return {
         "vacationDaysLeft": vacation_days_left,
@@ -158,6 +246,7 @@ async def create_hr_request(request: HRRequestCreate):
     request_dict = request.dict()
     request_dict["id"] = str(uuid.uuid4())
     request_dict["submitted_date"] = datetime.utcnow()
+    request_dict["updated_at"] = request_dict["submitted_date"]
     request_dict["status"] = "Pending Approval"
     
     # Calculate days for vacation/sick leave
@@ -166,78 +255,150 @@ async def create_hr_request(request: HRRequestCreate):
         end = datetime.fromisoformat(request.end_date)
         request_dict["days"] = (end - start).days + 1
     
-    await hr_requests_collection.insert_one(request_dict)
-    
-    # Update vacation balance if it's a vacation request
-    if request.type == "Vacation Leave" and request_dict.get("days"):
-        await vacation_balances_collection.update_one(
-            {"employee_id": request.employee_id},
-            {"$inc": {"used_days": request_dict["days"], "remaining_days": -request_dict["days"]}}
+    # Warn when too many teammates are already out over the same dates
+    warnings = []
+    if request.type == "Vacation Leave" and request.start_date and request.end_date:
+        teammates = await leave_calendar.teammates_out(
+            employee["department"], request.start_date, request.end_date, request.employee_id
         )
+        if len(teammates) >= LEAVE_OVERLAP_WARNING_THRESHOLD:
+            warnings.append(
+                f"{len(teammates)} teammates in {employee['department']} are already on leave during these dates"
+            )
     
-    return HRRequest(**request_dict)
+    # Insert the request and charge leave days through the ledger in one unit of work
+    await leave_ledger.submit_request(request_dict)
+    await leave_calendar.apply(request_dict)
+    await counters.increment("hr_requests", {
+        "by_status": request_dict["status"],
+        "by_type": request.type,
+        "by_department": employee.get("department")
+    })
+    
+    return HRRequest(**request_dict, warnings=warnings or None)
 
 @api_router.get("/hr-requests/{employee_id}", response_model=List[HRRequest])
 async def get_hr_requests(employee_id: str):
     requests = await hr_requests_collection.find(
-        {"employee_id": employee_id}
+        {"employee_id": employee_id}, model_projection(HRRequest)
     ).sort("submitted_date", -1).to_list(50)
-    return [HRRequest(**req) for req in requests]
+    return db_response(requests)
 
 @api_router.put("/hr-requests/{request_id}/status")
 async def update_request_status(request_id: str, status: str, approved_by: Optional[str] = None):
-    update_data = {"status": status}
+    update_data = {"status": status, "updated_at": datetime.utcnow()}
     if status == "Approved":
         update_data["approved_date"] = datetime.utcnow()
         if approved_by:
             update_data["approved_by"] = approved_by
     
-    result = await hr_requests_collection.update_one(
-        {"id": request_id},
-        {"$set": update_data}
-    )
+    # Rejections refund held leave days via the ledger
+    transition = await leave_ledger.transition_request(request_id, update_data)
     
-    if result.matched_count == 0:
+    if not transition:
         raise HTTPException(status_code=404, detail="Request not found")
+    previous, updated = transition
+    await leave_calendar.apply(updated)
+    await counters.move("hr_requests", "by_status", previous.get("status"), status)
     
     return {"message": "Request status updated successfully"}
 
 # Policy endpoints
+def _policy_content(policy: Dict[str, Any]) -> Dict[str, Any]:
+    # Cached bodies bypass response_model, so validate once when the entry is built
+    return policy if TRUSTED_DB_RESPONSES else Policy(**policy).model_dump()
+
 @api_router.get("/policies", response_model=List[Policy])
-async def get_policies(category: Optional[str] = None, search: Optional[str] = None):
+async def get_policies(request: Request, category: Optional[str] = None, search: Optional[str] = None):
     query = {}
     
     if category and category != "all":
         query["category"] = category
     
+    rank = None
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}},
-            {"tags": {"$regex": search, "$options": "i"}}
-        ]
+        # Matched and ranked by the search index instead of a $regex scan of every policy
+        results = policy_search_index.search(search, category, 100)["results"]
+        rank = {result["id"]: position for position, result in enumerate(results)}
+        query["id"] = {"$in": list(rank)}
     
-    policies = await policies_collection.find(query).to_list(100)
-    return [Policy(**policy) for policy in policies]
+    async def build():
+        policies = await policies_collection.find(query, model_projection(Policy)).to_list(100)
+        if rank is not None:
+            policies.sort(key=lambda policy: rank[policy["id"]])
+        return [_policy_content(policy) for policy in policies], policy_cache.last_updated
+    return await policy_cache.serve(request, build)
 
 @api_router.get("/policies/categories")
-async def get_policy_categories():
-    categories = await policies_collection.distinct("category")
-    return {"categories": categories}
+async def get_policy_categories(request: Request):
+    async def build():
+        categories = await policies_collection.distinct("category")
+        return {"categories": categories}, policy_cache.last_updated
+    return await policy_cache.serve(request, build)
 
-@api_router.get("/policies/{policy_id}", response_model=Policy)
-async def get_policy(policy_id: str):
-    policy = await policies_collection.find_one({"id": policy_id})
-    if not policy:
+@api_router.get("/policies/autocomplete")
+async def autocomplete_policies(q: str = "", limit: int = 8):
+    # Served from the in-memory trie; never queries MongoDB
+    return {"query": q, "suggestions": policy_autocomplete.suggest(q, max(limit, 1))}
+
+@api_router.get("/policies/search")
+async def search_policies(q: str, category: Optional[str] = None, limit: int = 10):
+    """Ranked policies with their best matching passages and highlight offsets, instead of full content"""
+    return policy_search_index.search(q, category, min(max(limit, 1), 50))
+
+@api_router.get("/policies/changes")
+async def get_policy_changes(since: int = 0):
+    """Policies changed or deleted after ``since``; clients pass back the returned version next time"""
+    changes = await policy_revisions.changes_since(max(since, 0), model_projection(Policy))
+    changes["changed"] = [_policy_content(policy) for policy in changes["changed"]]
+    return changes
+
+@api_router.post("/policies", response_model=Policy)
+async def create_policy(policy_data: PolicyCreate):
+    policy = await policy_revisions.save_policy(Policy(**policy_data.dict()).dict())
+    await counters.increment("policies", {"by_category": policy["category"]})
+    await policy_feed.poll()
+    return policy
+
+@api_router.put("/policies/{policy_id}", response_model=Policy)
+async def update_policy(policy_id: str, policy_data: PolicyCreate):
+    existing = await policies_collection.find_one({"id": policy_id}, model_projection(Policy))
+    if not existing:
+        raise HTTPException(status_code=404, detail="Policy not found")
+    policy = await policy_revisions.save_policy({**existing, **policy_data.dict()})
+    await counters.move("policies", "by_category", existing["category"], policy["category"])
+    await policy_feed.poll()
+    return policy
+
+@api_router.delete("/policies/{policy_id}")
+async def delete_policy(policy_id: str):
+    deleted = await policy_revisions.delete_policy(policy_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Policy not found")
-    return Policy(**policy)
+    await counters.increment("policies", {"by_category": deleted["category"]}, total=-1)
+    await policy_feed.poll()
+    return {"message": "Policy deleted successfully"}
+
+@api_router.get("/policies/{policy_id}", response_model=Policy)
+async def get_policy(request: Request, policy_id: str):
+    async def build():
+        policy = await policies_collection.find_one({"id": policy_id}, model_projection(Policy))
+        if not policy:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        return _policy_content(policy), policy.get("last_updated")
+    return await policy_cache.serve(request, build)
 
 # Chat endpoints
 @api_router.post("/chat/message")
 async def send_chat_message(message_data: ChatMessageCreate):
+    try:
+        assistant = await get_ai_assistant()
+    except ValueError:
+        raise HTTPException(status_code=503, detail="AI assistant is not configured")
+    
     try:
         # Generate AI response
-        ai_response = await ai_assistant.generate_response(
+        ai_response = await assistant.generate_response(
             message_data.message,
             message_data.employee_id,
             message_data.session_id
@@ -288,10 +449,31 @@ async def get_chat_history(employee_id: str, session_id: Optional[str] = None):
     
     return {"messages": list(reversed(formatted_messages))}
 
+# Event endpoints
+@api_router.get("/events/upcoming/{employee_id}")
+async def get_upcoming_events(employee_id: str, limit: int = 5):
+    employee = await employees_collection.find_one({"id": employee_id}, {"_id": 0, "id": 1, "department": 1})
+    if not employee:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    events = await upcoming_events_service.next_events(employee, min(max(limit, 1), 50))
+    return {"events": events}
+
+@api_router.post("/events", response_model=Event)
+async def create_event(event_data: EventCreate):
+    event = Event(**event_data.dict())
+    await events_collection.insert_one(event.dict())
+    
+    # Shared events and recurring series live in the cached expansion; personal one-offs are read per request
+    if not event.employee_id or event.recurrence:
+        upcoming_events_service.invalidate()
+    
+    return event
+
 # Additional utility endpoints
 @api_router.get("/vacation-balance/{employee_id}")
 async def get_vacation_balance(employee_id: str):
-    balance = await vacation_balances_collection.find_one({"employee_id": employee_id})
+    balance = await vacation_balances_collection.find_one({"employee_id": employee_id}, {"_id": 0})
     if not balance:
         raise HTTPException(status_code=404, detail="Vacation balance not found")
     return balance
@@ -314,21 +496,95 @@ async def get_salary_payments(employee_id: str):
     
     return {"payments": formatted_payments}
 
+@api_router.get("/leave-calendar")
+async def get_leave_calendar(start_date: str, end_date: str, department: Optional[str] = None):
+    try:
+        entries = await leave_calendar.who_is_out(start_date, end_date, department)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    
+    return {
+        "startDate": start_date,
+        "endDate": end_date,
+        "department": department,
+        "employeesOut": len({e["employee_id"] for e in entries}),
+        "entries": entries
+    }
+
+@api_router.get("/leave-ledger/{employee_id}")
+async def get_leave_ledger(employee_id: str, year: Optional[int] = None):
+    query = {"employee_id": employee_id}
+    if year:
+        query["year"] = year
+    
+    entries = await leave_ledger_collection.find(
+        query, {"_id": 0}
+    ).sort("created_at", -1).limit(100).to_list(100)
+    
+    return {"entries": entries}
+
+@api_router.post("/admin/leave-ledger/rebuild")
+async def rebuild_leave_balances(employee_id: Optional[str] = None):
+    rebuilt = await leave_ledger.rebuild_balances(employee_id)
+    return {"message": "Leave balances rebuilt from ledger", "balancesRebuilt": rebuilt}
+
 # Statistics endpoint for admin
 @api_router.get("/admin/statistics")
 async def get_admin_statistics():
-    total_employees = await employees_collection.count_documents({})
-    total_requests = await hr_requests_collection.count_documents({})
-    pending_requests = await hr_requests_collection.count_documents({"status": "Pending Approval"})
-    total_policies = await policies_collection.count_documents({})
+    # Served from incrementally maintained counters rather than collection scans
+    counts = await counters.get_counts()
+    requests = counts.get("hr_requests", {})
+    employees = counts.get("employees", {})
+    policies = counts.get("policies", {})
     
     return {
-        "totalEmployees": total_employees,
-        "totalRequests": total_requests,
-        "pendingRequests": pending_requests,
-        "totalPolicies": total_policies
+        "totalEmployees": employees.get("total", 0),
+        "totalRequests": requests.get("total", 0),
+        "pendingRequests": requests.get("by_status", {}).get("Pending Approval", 0),
+        "totalPolicies": policies.get("total", 0),
+        "requestsByStatus": requests.get("by_status", {}),
+        "requestsByType": requests.get("by_type", {}),
+        "requestsByDepartment": requests.get("by_department", {}),
+        "employeesByDepartment": employees.get("by_department", {}),
+        "employeesByGrade": employees.get("by_grade", {}),
+        "policiesByCategory": policies.get("by_category", {})
     }
 
+# Analytics endpoints (computed with pandas, cached for the day)
+@api_router.get("/analytics/leave-utilization")
+async def get_leave_utilization(year: Optional[int] = None):
+    return await _analytics().leave_utilization(year)
+
+@api_router.get("/analytics/request-turnaround")
+async def get_request_turnaround():
+    return await _analytics().turnaround()
+
+@api_router.get("/analytics/expenses")
+async def get_expense_totals():
+    return await _analytics().expenses()
+
+@api_router.get("/analytics/salary-costs")
+async def get_salary_costs(months: int = 12):
+    return await _analytics().salary_costs(min(max(months, 1), 60))
+
+@api_router.get("/admin/db-pool")
+async def get_db_pool_metrics():
+    options = {key: value for key, value in MONGO_CLIENT_OPTIONS.items() if value is not None}
+    return {"options": options, "metrics": pool_metrics.snapshot()}
+
+@api_router.get("/admin/policy-cache")
+async def get_policy_cache_stats():
+    return policy_cache.stats()
+
+@api_router.get("/admin/compression")
+async def get_compression_metrics():
+    return compression.metrics.snapshot()
+
+@api_router.post("/admin/statistics/reconcile")
+async def reconcile_admin_statistics():
+    drifted = await counters.reconcile()
+    return {"message": "Counters reconciled", "drifted": drifted}
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -339,10 +595,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""Benchmark the pandas analytics reports on synthetic data.
+
+Builds 100k HR requests, 10k employees and a year of salary payments in the
+same columnar shape ``analytics.load_frame`` produces, then times each
+``compute_*`` report. No MongoDB is needed.
+
+Usage: python benchmarks/analytics_benchmark.py [--requests 100000] [--employees 10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# analytics imports database, which only needs these to build a lazy client
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'hr_benchmark')
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import analytics
+
+DEPARTMENTS = ["Technology", "Finance", "Operations", "Legal", "Investments", "HR", "Marketing"]
+GRADES = ["A", "B", "C", "D", "E", "F"]
+REQUEST_TYPES = ["Vacation Leave", "Sick Leave", "Work from Home", "Salary Certificate", "Expense Reimbursement", "Business Trip"]
+STATUSES = ["Approved", "Pending Approval", "Under Review", "Rejected"]
+EXPENSE_CATEGORIES = ["meals", "travel", "accommodation", "training", "equipment", "other"]
+
+
+def synthetic_frames(n_requests: int, n_employees: int, seed: int = 1957):
+    rng = np.random.default_rng(seed)
+    employee_ids = np.array([f"EMP{i:06d}" for i in range(n_employees)])
+    employees = pd.DataFrame({
+        "id": employee_ids,
+        "department": rng.choice(DEPARTMENTS, n_employees),
+        "grade": rng.choice(GRADES, n_employees),
+    })
+    balances = pd.DataFrame({"employee_id": employee_ids, "total_days": rng.choice([21, 25, 30], n_employees)})
+
+    submitted = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, n_requests), unit="h")
+    statuses = rng.choice(STATUSES, n_requests, p=[0.6, 0.2, 0.1, 0.1])
+    approved = submitted + pd.to_timedelta(rng.exponential(36, n_requests), unit="h")
+    types = rng.choice(REQUEST_TYPES, n_requests)
+    requests = pd.DataFrame({
+        "employee_id": rng.choice(employee_ids, n_requests),
+        "type": types,
+        "status": statuses,
+        "days": np.where(np.char.endswith(types.astype(str), " Leave"), rng.integers(1, 10, n_requests), None),
+        "amount": np.where(types == "Expense Reimbursement", rng.gamma(2.0, 400.0, n_requests).round(2), None),
+        "category": np.where(types == "Expense Reimbursement", rng.choice(EXPENSE_CATEGORIES, n_requests), None),
+        "submitted_date": submitted,
+        "approved_date": pd.Series(approved).where(statuses == "Approved"),
+    })
+
+    months = [datetime(2025, m, 27) for m in range(1, 13)]
+    payments = pd.DataFrame({
+        "employee_id": np.tile(employee_ids, len(months)),
+        "amount": np.tile(rng.normal(20000, 6000, n_employees).clip(6000).round(2), len(months)),
+        "date": np.repeat(months, n_employees),
+    })
+    return requests, employees, balances, payments
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"minMs": round(min(samples), 2), "medianMs": round(float(np.median(samples)), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--employees", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    requests, employees, balances, payments = synthetic_frames(args.requests, args.employees)
+    records = requests.to_dict(orient="records")
+
+    def columnar_load():
+        # Mirrors load_frame: column lists filled per batch, one DataFrame at the end
+        columns = {field: [] for field in requests.columns}
+        for i in range(0, len(records), analytics.BATCH_SIZE):
+            batch = records[i:i + analytics.BATCH_SIZE]
+            for field, values in columns.items():
+                values.extend(doc.get(field) for doc in batch)
+        return pd.DataFrame(columns)
+
+    results = {
+        "rows": {"requests": len(requests), "employees": len(employees), "payments": len(payments)},
+        "columnar_load": timed(columnar_load, args.repeat),
+        "leave_utilization": timed(lambda: analytics.compute_leave_utilization(requests, employees, balances), args.repeat),
+        "turnaround": timed(lambda: analytics.compute_turnaround(requests), args.repeat),
+        "expenses": timed(lambda: analytics.compute_expenses(requests), args.repeat),
+        "salary_costs": timed(lambda: analytics.compute_salary_costs(payments, employees), args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""A local stand-in for the OpenAI SDK surface ``ai_service`` uses.
+
+Install it with ``install(latency_ms)`` before the first ``AIHRAssistant`` is
+created; ``ai_service._load_openai`` then keeps it instead of importing the
+real SDK. Every call sleeps for the configured latency (blocking, as the real
+synchronous client does) and returns canned, deterministic replies, so chat
+benchmarks measure this service rather than a remote model.
+"""
+import itertools
+import time
+from types import SimpleNamespace
+
+REPLY = ("According to the company HR manual, this is handled by your department head and HR. "
+         "Please check the Policy Center for the full details.")
+
+
+class _Calls:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.count = 0
+        self._ids = itertools.count(1)
+
+    def wait(self):
+        self.count += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def next_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids)}"
+
+
+class FakeOpenAI:
+    def __init__(self, latency_ms: float = 200.0):
+        calls = self.calls = _Calls(latency_ms / 1000)
+
+        def completion(**kwargs):
+            calls.wait()
+            message = SimpleNamespace(role="assistant", content=REPLY)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=64))
+
+        def create_thread(**kwargs):
+            return SimpleNamespace(id=calls.next_id("thread"))
+
+        def create_message(thread_id, **kwargs):
+            return SimpleNamespace(id=calls.next_id("msg"))
+
+        def create_run(thread_id, **kwargs):
+            return SimpleNamespace(id=calls.next_id("run"), status="queued")
+
+        def retrieve_run(thread_id, run_id):
+            # The model time is spent here; the run is complete on the first poll
+            calls.wait()
+            return SimpleNamespace(id=run_id, status="completed")
+
+        def list_messages(thread_id, **kwargs):
+            text = SimpleNamespace(type="text", text=SimpleNamespace(value=REPLY))
+            return SimpleNamespace(data=[SimpleNamespace(role="assistant", content=[text])])
+
+        self.api_key = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=completion))
+        self.beta = SimpleNamespace(threads=SimpleNamespace(
+            create=create_thread,
+            messages=SimpleNamespace(create=create_message, list=list_messages),
+            runs=SimpleNamespace(create=create_run, retrieve=retrieve_run),
+        ))
+
+
+def install(latency_ms: float = 200.0) -> FakeOpenAI:
+    """Make ``ai_service`` use a fake client; call before the assistant is created"""
+    import ai_service
+    fake = FakeOpenAI(latency_ms)
+    ai_service.openai = fake
+    return fake
@@ -0,0 +1,91 @@
+"""Import-time profile of a backend module, built on ``python -X importtime``.
+
+Prints the total import time, the slowest imports by cumulative and self time,
+and whether known heavy dependencies are pulled in at import (they should be
+deferred until first use).
+
+Usage:
+    python benchmarks/import_profile.py                       # HR Hub server
+    python benchmarks/import_profile.py --backend-dir ../57VProcurement-main/57VProcurement-main/backend
+    python benchmarks/import_profile.py --module database --top 20 --json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+
+# Dependencies that must not be imported before they are needed
+DEFERRED = ["openai", "emergentintegrations", "pandas", "numpy"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(backend_dir: Path, module: str):
+    env = dict(os.environ)
+    env.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    env.setdefault('DB_NAME', 'import_profile')
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        sys.exit(completed.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "depth": len(indent) // 2,
+                "selfMs": int(self_us) / 1000,
+                "cumulativeMs": int(cumulative_us) / 1000,
+            })
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend-dir", type=Path, default=DEFAULT_BACKEND_DIR)
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    entries = profile(args.backend_dir.resolve(), args.module)
+    target = next(e for e in reversed(entries) if e["module"] == args.module)
+    loaded = {e["module"].split(".")[0] for e in entries}
+    report = {
+        "module": args.module,
+        "totalMs": target["cumulativeMs"],
+        "byCumulative": sorted(
+            (e for e in entries if e["module"] != args.module and e["depth"] <= 1),
+            key=lambda e: e["cumulativeMs"], reverse=True
+        )[:args.top],
+        "bySelf": sorted(entries, key=lambda e: e["selfMs"], reverse=True)[:args.top],
+        "deferredDependenciesLoaded": sorted(loaded.intersection(DEFERRED)),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {args.module}: {report['totalMs']:.1f} ms")
+        print("\nSlowest direct imports (cumulative):")
+        for e in report["byCumulative"]:
+            print(f"  {e['cumulativeMs']:9.1f} ms  {e['module']}")
+        print("\nSlowest modules (self):")
+        for e in report["bySelf"]:
+            print(f"  {e['selfMs']:9.1f} ms  {e['module']}")
+        print(f"\nDeferred dependencies imported eagerly: {', '.join(report['deferredDependenciesLoaded']) or 'none'}")
+    if report["deferredDependenciesLoaded"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Load and latency benchmark for the HR Hub API, run in-process.
+
+Boots the FastAPI app (with its lifespan) against mongomock-motor, or a real
+MongoDB with --mongo-url, and the local fake LLM from fake_llm.py. Concurrent
+workers then issue a weighted mix of dashboard, policy, HR request and chat
+calls through an in-memory ASGI transport for --duration seconds. The report
+is JSON, with throughput, error count and p50/p95/p99 latency per endpoint
+plus the git commit, so runs can be diffed between commits. --compare
+baseline.json exits non-zero when an endpoint's p95 regressed beyond
+--tolerance.
+
+Usage: python benchmarks/load_benchmark.py [--concurrency 16] [--duration 10]
+           [--workload dashboard=3,policies=2,...] [--llm-latency-ms 200]
+           [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / 'backend'
+
+SEARCH_TERMS = ["leave", "travel", "salary", "الإجازة", "maternity", "end of service"]
+CHAT_MESSAGES = ["What is the annual leave policy?", "How many vacation days do I have left?", "ما هي سياسة الانتداب؟"]
+
+# endpoint name -> default weight in the mix
+DEFAULT_WORKLOAD = {
+    "dashboard": 4,
+    "policies": 3,
+    "policies_revalidate": 2,
+    "policy_detail": 2,
+    "policy_search": 2,
+    "policy_autocomplete": 3,
+    "hr_requests_list": 3,
+    "hr_requests_create": 1,
+    "chat": 1,
+}
+
+
+def build_requests(employee_ids: List[str], policy_ids: List[str],
+                   etags: Dict[str, str]) -> Dict[str, Callable[[random.Random], Tuple[str, str, dict]]]:
+    """endpoint name -> rng -> (method, path, request kwargs)"""
+    def employee(rng):
+        return rng.choice(employee_ids)
+
+    return {
+        "dashboard": lambda rng: ("GET", f"/api/dashboard/{employee(rng)}", {}),
+        "policies": lambda rng: ("GET", "/api/policies", {}),
+        "policies_revalidate": lambda rng: ("GET", "/api/policies", {"headers": {"If-None-Match": etags.get("policies", "")}}),
+        "policy_detail": lambda rng: ("GET", f"/api/policies/{rng.choice(policy_ids)}", {}),
+        "policy_search": lambda rng: ("GET", "/api/policies/search", {"params": {"q": rng.choice(SEARCH_TERMS)}}),
+        "policy_autocomplete": lambda rng: (
+            "GET", "/api/policies/autocomplete", {"params": {"q": rng.choice(SEARCH_TERMS)[:rng.randint(1, 4)]}}
+        ),
+        "hr_requests_list": lambda rng: ("GET", f"/api/hr-requests/{employee(rng)}", {}),
+        "hr_requests_create": lambda rng: ("POST", "/api/hr-requests", {"json": {
+            "employee_id": employee(rng),
+            "type": "Salary Certificate",
+            "purpose": "Bank loan",
+        }}),
+        "chat": lambda rng: ("POST", "/api/chat/message", {"json": {
+            "employee_id": employee(rng),
+            "session_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "message": rng.choice(CHAT_MESSAGES),
+        }}),
+    }
+
+
+def parse_workload(spec: str) -> Dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_WORKLOAD)
+    workload = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_WORKLOAD:
+            raise SystemExit(f"Unknown endpoint '{name}'; choose from {', '.join(DEFAULT_WORKLOAD)}")
+        workload[name] = float(weight or 1)
+    return workload
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0, "errors": errors}
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "throughputRps": round(len(ordered) / elapsed, 2),
+        "meanMs": round(sum(ordered) / len(ordered), 3),
+        "p50Ms": round(percentile(ordered, 50), 3),
+        "p95Ms": round(percentile(ordered, 95), 3),
+        "p99Ms": round(percentile(ordered, 99), 3),
+        "maxMs": round(ordered[-1], 3),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> Dict:
+    os.environ['MONGO_URL'] = args.mongo_url or 'mongodb://localhost:27017'
+    os.environ['DB_NAME'] = args.db_name or f"load_bench_{uuid.uuid4().hex[:8]}"
+    os.environ['OPENAI_API_KEY'] = 'sk-benchmark'
+    # The warmup task would compete with the measured requests
+    os.environ['AI_WARMUP'] = '0'
+    if not args.mongo_url:
+        import motor.motor_asyncio
+        import mongomock_motor
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+    sys.path.insert(0, str(BENCHMARKS_DIR))
+
+    import httpx
+    import fake_llm
+    import server
+    import database
+
+    llm = fake_llm.install(args.llm_latency_ms)
+    workload = parse_workload(args.workload)
+    names, weights = list(workload), list(workload.values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            employees = (await client.get("/api/employees")).json()
+            policies = (await client.get("/api/policies")).json()
+            etags = {"policies": (await client.get("/api/policies")).headers.get("etag", "")}
+            requests = build_requests(
+                [employee["id"] for employee in employees], [policy["id"] for policy in policies], etags
+            )
+
+            async def worker(seed: int, deadline: float):
+                rng = random.Random(seed)
+                while time.perf_counter() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    method, path, kwargs = requests[name](rng)
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, **kwargs)
+                        failed = response.status_code >= 400
+                    except Exception:
+                        failed = True
+                    latencies[name].append((time.perf_counter() - started) * 1000)
+                    if failed:
+                        errors[name] += 1
+
+            # Warm caches and lazy imports before measuring
+            await asyncio.gather(*(worker(args.seed + i, time.perf_counter() + args.warmup)
+                                   for i in range(args.concurrency)))
+            for name in names:
+                latencies[name].clear()
+                errors[name] = 0
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(args.seed + 1000 + i, started + args.duration)
+                                   for i in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+        if not args.db_name:
+            await database.get_client().drop_database(os.environ['DB_NAME'])
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "mongo": "mongodb" if args.mongo_url else "mongomock",
+            "concurrency": args.concurrency,
+            "durationSeconds": round(elapsed, 3),
+            "llmLatencyMs": args.llm_latency_ms,
+            "llmCalls": llm.calls.count,
+            "workload": workload,
+        },
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Endpoints whose p95 grew by more than ``tolerance`` (a fraction) over the baseline"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name, {})
+        if before.get("p95Ms") and current.get("p95Ms") and current["p95Ms"] > before["p95Ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95Ms']} ms -> {current['p95Ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before the run")
+    parser.add_argument("--workload", default="", help="Comma-separated name=weight, e.g. dashboard=3,chat=1")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--mongo-url", help="Use a real MongoDB instead of mongomock-motor")
+    parser.add_argument("--db-name", help="Existing database to use (kept after the run)")
+    parser.add_argument("--seed", type=int, default=1957)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to check for p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report)
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
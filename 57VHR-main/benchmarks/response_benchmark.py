@@ -0,0 +1,134 @@
+"""Benchmark list-endpoint serialization: the old double-validation path vs orjson.
+
+Serves 1k policies and 10k HR requests from memory (no MongoDB) through
+three in-process apps and times a full GET with TestClient:
+
+  legacy   Model(**doc) in the handler, response_model, default JSONResponse
+  orjson   projected dicts validated once by response_model, ORJSONResponse
+  trusted  projected dicts rendered directly with ORJSONResponse
+
+Usage: python benchmarks/response_benchmark.py [--policies 1000] [--requests 10000] [--repeat 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'hr_benchmark')
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from models import HRRequest, Policy
+
+TYPES = ["Vacation Leave", "Sick Leave", "Work from Home", "Expense Reimbursement", "Business Trip"]
+
+
+def synthetic_policies(n: int) -> List[dict]:
+    now = datetime(2025, 1, 1)
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Policy {i}",
+        "category": f"Category {i % 12}",
+        "content": "Employees are entitled to the benefits described in this policy. " * 20,
+        "tags": ["leave", "benefits", f"tag{i % 30}"],
+        "last_updated": now + timedelta(hours=i),
+        "created_at": now,
+    } for i in range(n)]
+
+
+def synthetic_requests(n: int) -> List[dict]:
+    now = datetime(2025, 1, 1)
+    return [{
+        "id": str(uuid.uuid4()),
+        "employee_id": f"EMP{i % 500:04d}",
+        "type": TYPES[i % len(TYPES)],
+        "status": "Approved" if i % 3 else "Pending Approval",
+        "start_date": "2025-03-01",
+        "end_date": "2025-03-05",
+        "days": 5,
+        "reason": "Family trip",
+        "submitted_date": now + timedelta(minutes=i),
+        "approved_date": now + timedelta(minutes=i, hours=6) if i % 3 else None,
+        "approved_by": "EMP0001" if i % 3 else None,
+    } for i in range(n)]
+
+
+def build_app(mode: str, policies: List[dict], requests: List[dict]) -> FastAPI:
+    if mode == "legacy":
+        app = FastAPI(default_response_class=JSONResponse)
+
+        @app.get("/policies", response_model=List[Policy])
+        async def legacy_policies():
+            return [Policy(**policy) for policy in policies]
+
+        @app.get("/requests", response_model=List[HRRequest])
+        async def legacy_requests():
+            return [HRRequest(**request) for request in requests]
+    elif mode == "orjson":
+        app = FastAPI(default_response_class=ORJSONResponse)
+
+        @app.get("/policies", response_model=List[Policy])
+        async def orjson_policies():
+            return policies
+
+        @app.get("/requests", response_model=List[HRRequest])
+        async def orjson_requests():
+            return requests
+    else:
+        app = FastAPI(default_response_class=ORJSONResponse)
+
+        @app.get("/policies", response_model=List[Policy])
+        async def trusted_policies():
+            return ORJSONResponse(policies)
+
+        @app.get("/requests", response_model=List[HRRequest])
+        async def trusted_requests():
+            return ORJSONResponse(requests)
+    return app
+
+
+def time_endpoint(client: TestClient, path: str, repeat: int) -> dict:
+    client.get(path)  # warm up
+    timings, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(response.content)
+    return {"medianMs": round(statistics.median(timings), 2), "minMs": round(min(timings), 2), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--policies', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    policies, requests = synthetic_policies(args.policies), synthetic_requests(args.requests)
+    results = {}
+    for mode in ("legacy", "orjson", "trusted"):
+        client = TestClient(build_app(mode, policies, requests))
+        results[mode] = {
+            f"policies[{args.policies}]": time_endpoint(client, "/policies", args.repeat),
+            f"requests[{args.requests}]": time_endpoint(client, "/requests", args.repeat),
+        }
+    for endpoint in results["legacy"]:
+        baseline = results["legacy"][endpoint]["medianMs"]
+        for mode in ("orjson", "trusted"):
+            results[mode][endpoint]["speedup"] = round(baseline / results[mode][endpoint]["medianMs"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
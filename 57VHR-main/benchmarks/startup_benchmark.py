@@ -0,0 +1,135 @@
+"""Measure HR Hub backend startup cost.
+
+Reports, as JSON:
+- module import time for ``database`` and ``server`` (fresh interpreter each run)
+- ``init_database`` on an empty database (seeding) and on an already seeded one
+- time from spawning a uvicorn worker until ``GET /api/`` answers 200, checked
+  against --target-ms (the script exits non-zero when the median misses it)
+
+Runs against mongomock-motor by default; pass --mongo-url to use a real server
+(a throwaway database is created and dropped).
+
+Usage: python benchmarks/startup_benchmark.py [--repeat 5] [--target-ms 3000] [--mongo-url mongodb://localhost:27017]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import socket
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+
+
+def import_time_ms(module: str, env) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+SERVE_BOOTSTRAP = """
+if {use_mock}:
+    import motor.motor_asyncio, mongomock_motor
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+import uvicorn
+uvicorn.run("server:app", host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_serve_ms(env, use_mock: bool, timeout: float = 60.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVE_BOOTSTRAP.format(use_mock=use_mock, port=port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Server did not start serving before the timeout")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summarize(samples):
+    return {"minMs": round(min(samples), 2), "medianMs": round(statistics.median(samples), 2)}
+
+
+async def init_timings(repeat: int, use_mock: bool):
+    if use_mock:
+        import motor.motor_asyncio
+        import mongomock_motor
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+    import database
+
+    cold, warm = [], []
+    for _ in range(repeat):
+        # A fresh client rebinds the module-level collections to the new database
+        database.close_client()
+        database.db_name = f"startup_bench_{uuid.uuid4().hex[:8]}"
+        start = time.perf_counter()
+        await database.init_database()
+        cold.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await database.init_database()
+        warm.append((time.perf_counter() - start) * 1000)
+        await database.get_client().drop_database(database.db_name)
+    database.close_client()
+    return {"seedEmptyDatabase": summarize(cold), "alreadySeeded": summarize(warm)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mongo-url", help="Use a real MongoDB instead of mongomock-motor")
+    parser.add_argument("--target-ms", type=float, default=3000, help="Budget for spawn-to-first-response")
+    args = parser.parse_args()
+
+    os.environ['MONGO_URL'] = args.mongo_url or 'mongodb://localhost:27017'
+    os.environ.setdefault('DB_NAME', 'startup_bench')
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-benchmark')
+    env = dict(os.environ)
+
+    results = {
+        "imports": {
+            module: summarize([import_time_ms(module, env) for _ in range(args.repeat)])
+            for module in ("database", "server")
+        },
+        "initDatabase": asyncio.run(init_timings(args.repeat, use_mock=not args.mongo_url)),
+        "timeToServe": summarize([time_to_serve_ms(env, not args.mongo_url) for _ in range(args.repeat)]),
+    }
+    results["timeToServe"]["targetMs"] = args.target_ms
+    results["timeToServe"]["withinTarget"] = results["timeToServe"]["medianMs"] <= args.target_ms
+    print(json.dumps(results, indent=2))
+    if not results["timeToServe"]["withinTarget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
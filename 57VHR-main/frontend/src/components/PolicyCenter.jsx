@@ -22,6 +22,8 @@ import { policiesApi } from '../services/api';
 
 const PolicyCenter = () => {
   const [searchTerm, setSearchTerm] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [selectedPolicy, setSelectedPolicy] = useState(null);
   const [policies, setPolicies] = useState([]);
@@ -53,6 +55,19 @@ const PolicyCenter = () => {
     fetchPolicies();
   }, [selectedCategory, searchTerm]);
 
+  useEffect(() => {
+    if (!searchTerm.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    // Ignore answers to queries the user has already typed past
+    let current = true;
+    policiesApi.autocomplete(searchTerm)
+      .then((items) => { if (current) setSuggestions(items); })
+      .catch((err) => console.error('Error fetching suggestions:', err));
+    return () => { current = false; };
+  }, [searchTerm]);
+
   const fetchInitialData = async () => {
     try {
       setLoading(true);
@@ -94,6 +109,12 @@ const PolicyCenter = () => {
     }
   };
 
+  const handleSuggestionSelect = (suggestion) => {
+    setSearchTerm(suggestion.text);
+    setShowSuggestions(false);
+    handlePolicySelect(suggestion.policyId);
+  };
+
   const getCategoryIcon = (category) => {
     return categoryIcons[category] || FileText;
   };
@@ -229,9 +250,32 @@ const PolicyCenter = () => {
                 <Input
                   placeholder="Search policies, keywords, or content..."
                   value={searchTerm}
-                  onChange={(e) => setSearchTerm(e.target.value)}
+                  onChange={(e) => {
+                    setSearchTerm(e.target.value);
+                    setShowSuggestions(true);
+                  }}
+                  onFocus={() => setShowSuggestions(true)}
+                  onBlur={() => setShowSuggestions(false)}
                   className="pl-10"
                 />
+                {showSuggestions && suggestions.length > 0 && (
+                  <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-200 rounded-md shadow-lg max-h-64 overflow-auto">
+                    {suggestions.map((suggestion) => (
+                      <li key={`${suggestion.kind}-${suggestion.policyId}-${suggestion.text}`}>
+                        {/* preventDefault on mousedown keeps focus in the input, so onBlur does not close the list before the click lands */}
+                        <button
+                          type="button"
+                          className="w-full flex items-center justify-between px-4 py-2 text-left text-sm hover:bg-gray-50"
+                          onMouseDown={(e) => e.preventDefault()}
+                          onClick={() => handleSuggestionSelect(suggestion)}
+                        >
+                          <span className="text-gray-900">{suggestion.text}</span>
+                          <span className="ml-4 text-xs text-gray-400 truncate">{suggestion.policyTitle}</span>
+                        </button>
+                      </li>
+                    ))}
+                  </ul>
+                )}
               </div>
               <Select value={selectedCategory} onValueChange={setSelectedCategory}>
                 <SelectTrigger className="w-full md:w-[200px]">
@@ -91,6 +91,11 @@ export const policiesApi = {
     return response.data;
   },
   
+  autocomplete: async (query, limit = 8) => {
+    const response = await apiClient.get('/policies/autocomplete', { params: { q: query, limit } });
+    return response.data.suggestions;
+  },
+  
   getPolicy: async (policyId) => {
     const response = await apiClient.get(`/policies/${policyId}`);
     return response.data;
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'hr_tests')
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """A fresh in-memory database behind database.get_client, for one test.
+
+    Tests reach collections through the returned ``database`` module: a
+    collection imported into a test module would be bound to a real client
+    as soon as pytest inspects the module.
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import database
+    monkeypatch.setattr(database, "AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient)
+    monkeypatch.setattr(database, "db_name", f"hr_test_{uuid.uuid4().hex[:8]}")
+    database.close_client()
+    yield database
+    database.close_client()
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
@@ -0,0 +1,116 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pandas")
+
+import analytics
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    analytics.clear_cache()
+    yield
+    analytics.clear_cache()
+
+
+def test_leave_utilization_for_a_year_without_requests(mock_db, run):
+    async def scenario():
+        await mock_db.employees_collection.insert_many([
+            {"id": "EMP001", "department": "Technology", "grade": "G5"},
+            {"id": "EMP002", "department": "Finance", "grade": "G4"},
+        ])
+        await mock_db.vacation_balances_collection.insert_one({"employee_id": "EMP001", "year": 2031, "total_days": 30})
+        await mock_db.hr_requests_collection.insert_one({
+            "id": "REQ1", "employee_id": "EMP001", "type": "Vacation Leave", "status": "Approved",
+            "days": 5, "start_date": "2026-03-01",
+        })
+        return await analytics.leave_utilization(2031)
+
+    report = run(scenario())
+    technology = next(row for row in report["byDepartment"] if row["department"] == "Technology")
+    assert technology["employees"] == 1
+    assert technology["entitlement_days"] == 30
+    assert technology["vacation_days"] == 0
+    assert technology["vacation_utilization"] == 0
+
+
+def test_leave_utilization_for_a_year_without_balances(mock_db, run):
+    async def scenario():
+        await mock_db.employees_collection.insert_many([
+            {"id": "EMP001", "department": "Technology", "grade": "G5"},
+            {"id": "EMP002", "department": "Finance", "grade": "G4"},
+        ])
+        await mock_db.vacation_balances_collection.insert_one({"employee_id": "EMP001", "year": 2026, "total_days": 30})
+        await mock_db.hr_requests_collection.insert_one({
+            "id": "REQ1", "employee_id": "EMP001", "type": "Vacation Leave", "status": "Approved",
+            "days": 5, "start_date": "2031-03-01",
+        })
+        return await analytics.leave_utilization(2031)
+
+    report = run(scenario())
+    rows = {row["department"]: row for row in report["byDepartment"]}
+    assert rows["Technology"]["entitlement_days"] == 0
+    assert rows["Technology"]["vacation_days"] == 5
+    assert rows["Technology"]["vacation_utilization"] is None
+    assert rows["Finance"]["vacation_utilization"] is None
+
+
+def test_compute_leave_utilization_without_balances_or_requests():
+    import pandas as pd
+    employees = pd.DataFrame({"id": ["EMP001"], "department": ["Technology"], "grade": ["G5"]})
+    empty = lambda *columns: pd.DataFrame({column: pd.Series(dtype=object) for column in columns})
+    report = analytics.compute_leave_utilization(
+        empty("employee_id", "type", "days"), employees, empty("employee_id", "total_days")
+    )
+    assert report["byGrade"] == [{"grade": "G5", "employees": 1, "entitlement_days": 0.0,
+                                  "vacation_days": 0, "vacation_utilization": None}]
+
+
+def test_leave_utilization_counts_days_by_type(mock_db, run):
+    async def scenario():
+        await mock_db.employees_collection.insert_one({"id": "EMP001", "department": "Technology", "grade": "G5"})
+        await mock_db.vacation_balances_collection.insert_one({"employee_id": "EMP001", "year": 2026, "total_days": 20})
+        await mock_db.hr_requests_collection.insert_many([
+            {"id": "REQ1", "employee_id": "EMP001", "type": "Vacation Leave", "status": "Approved",
+             "days": 5, "start_date": "2026-03-01"},
+            {"id": "REQ2", "employee_id": "EMP001", "type": "Sick Leave", "status": "Approved",
+             "days": 2, "start_date": "2026-04-01"},
+            {"id": "REQ3", "employee_id": "EMP001", "type": "Vacation Leave", "status": "Rejected",
+             "days": 9, "start_date": "2026-05-01"},
+        ])
+        return await analytics.leave_utilization(2026)
+
+    [row] = run(scenario())["byDepartment"]
+    assert (row["vacation_days"], row["days_sick_leave"], row["vacation_utilization"]) == (5, 2, 0.25)
+
+
+def test_every_report_handles_an_empty_database(mock_db, run):
+    async def scenario():
+        return (
+            await analytics.leave_utilization(2031),
+            await analytics.leave_utilization(),
+            await analytics.turnaround(),
+            await analytics.expenses(),
+            await analytics.salary_costs(),
+        )
+
+    utilization, all_years, turnaround, expenses, salary = run(scenario())
+    assert utilization["byDepartment"] == [] and all_years["byGrade"] == []
+    assert turnaround["overall"]["count"] == 0
+    assert expenses == {**expenses, "total": 0.0, "byCategory": []}
+    assert salary["monthly"] == [] and salary["byDepartment"] == {}
+
+
+def test_turnaround_percentiles():
+    import pandas as pd
+    submitted = datetime(2026, 1, 1)
+    requests = pd.DataFrame({
+        "type": ["Salary Certificate"] * 4,
+        "submitted_date": [submitted] * 4,
+        "approved_date": [submitted.replace(hour=h) for h in (1, 2, 3, 4)],
+    })
+    report = analytics.compute_turnaround(requests)
+    assert report["overall"]["count"] == 4
+    assert report["overall"]["meanHours"] == 2.5
+    assert report["byType"]["Salary Certificate"]["p50Hours"] == 2.5
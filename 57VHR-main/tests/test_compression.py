@@ -0,0 +1,72 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+import compression
+
+BODY = b'{"policies": "' + b"annual leave carries over " * 200 + b'"}'
+
+
+@pytest.fixture
+def client():
+    compression.body_cache.clear()
+    app = FastAPI()
+
+    @app.get("/tagged")
+    async def tagged():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/untagged")
+    async def untagged():
+        return Response(BODY, media_type="application/json")
+
+    app.add_middleware(compression.CompressionMiddleware)
+    with TestClient(app) as test_client:
+        yield test_client
+    compression.body_cache.clear()
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("*", compression.ENCODINGS[0]),
+    ("deflate, gzip;q=0.5", "gzip"),
+])
+def test_negotiate(header, expected):
+    assert compression.negotiate(header) == expected
+
+
+def test_compressed_response_carries_a_weak_etag(client):
+    response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == BODY
+
+
+def test_identity_response_keeps_the_strong_etag(client):
+    response = client.get("/tagged", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+
+
+def test_repeated_body_is_compressed_once(client):
+    before = compression.metrics.snapshot()
+    for _ in range(3):
+        raw = client.get("/untagged", headers={"Accept-Encoding": "gzip"}).content
+    after = compression.metrics.snapshot()
+    assert raw == BODY
+    assert "etag" not in client.get("/untagged", headers={"Accept-Encoding": "gzip"}).headers
+    assert after["cacheMisses"] - before["cacheMisses"] == 1
+    assert after["cacheHits"] - before["cacheHits"] == 2
+
+
+def test_weak_etag_is_idempotent():
+    assert compression.weak_etag('"v1"') == 'W/"v1"'
+    assert compression.weak_etag('W/"v1"') == 'W/"v1"'
+    assert gzip.decompress(compression.compress(BODY, "gzip")) == BODY
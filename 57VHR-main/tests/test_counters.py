@@ -0,0 +1,92 @@
+import counters
+
+
+def seed_requests(mock_db, run, statuses):
+    async def insert():
+        await mock_db.hr_requests_collection.insert_many([
+            {"id": f"REQ{i}", "employee_id": "EMP001", "type": "Vacation Leave", "status": status}
+            for i, status in enumerate(statuses)
+        ])
+    run(insert())
+
+
+def stored(mock_db, run):
+    return run(mock_db.counters_collection.find_one({"_id": "hr_requests"}))
+
+
+def test_reconcile_builds_missing_counter(mock_db, run):
+    seed_requests(mock_db, run, ["Approved", "Approved", "Rejected"])
+    assert run(counters.reconcile(["hr_requests"])) == {"hr_requests": True}
+    counter = stored(mock_db, run)
+    assert counter["total"] == 3
+    assert counter["by_status"] == {"Approved": 2, "Rejected": 1}
+
+
+def test_move_never_leaves_empty_or_negative_buckets(mock_db, run):
+    seed_requests(mock_db, run, ["Pending Approval"])
+    run(counters.reconcile(["hr_requests"]))
+
+    async def scenario():
+        await counters.move("hr_requests", "by_status", "Pending Approval", "Approved")
+        moved = (await mock_db.counters_collection.find_one({"_id": "hr_requests"}))["by_status"]
+        # The bucket it comes from is already empty, e.g. after a write that bypassed the counters
+        await counters.move("hr_requests", "by_status", "Pending Approval", "Rejected")
+        drifted = (await mock_db.counters_collection.find_one({"_id": "hr_requests"}))["by_status"]
+        await counters.increment("hr_requests", {"by_status": "Rejected"}, total=-1)
+        return moved, drifted, await counters.get_counts()
+
+    moved, drifted, counts = run(scenario())
+    assert moved == {"Approved": 1}
+    assert drifted == {"Approved": 1, "Rejected": 1}
+    assert counts["hr_requests"]["by_status"] == {"Approved": 1}
+
+
+def test_increment_during_scan_is_not_lost(mock_db, run, monkeypatch):
+    seed_requests(mock_db, run, ["Approved", "Approved"])
+    run(counters.reconcile(["hr_requests"]))
+    compute = counters._compute
+    calls = []
+
+    async def racing_compute(counter):
+        result = await compute(counter)
+        if not calls:
+            # A request is created (and counted) after the scan, before the write
+            await mock_db.hr_requests_collection.insert_one(
+                {"id": "REQ9", "employee_id": "EMP001", "type": "Vacation Leave", "status": "Pending Approval"}
+            )
+            await counters.increment("hr_requests", {"by_status": "Pending Approval"})
+        calls.append(counter)
+        return result
+
+    monkeypatch.setattr(counters, "_compute", racing_compute)
+    run(counters.reconcile(["hr_requests"]))
+    counter = stored(mock_db, run)
+    assert len(calls) == 2
+    assert counter["total"] == 3
+    assert counter["by_status"]["Pending Approval"] == 1
+
+
+def test_counter_left_alone_when_increments_keep_racing(mock_db, run, monkeypatch):
+    seed_requests(mock_db, run, ["Approved"])
+    run(counters.reconcile(["hr_requests"]))
+    compute = counters._compute
+
+    async def always_racing(counter):
+        result = await compute(counter)
+        await counters.increment("hr_requests", {"by_status": "Approved"})
+        return result
+
+    monkeypatch.setattr(counters, "_compute", always_racing)
+    assert run(counters.reconcile(["hr_requests"])) == {"hr_requests": None}
+    assert stored(mock_db, run)["total"] == 1 + counters.RECONCILE_ATTEMPTS
+
+
+def test_only_one_worker_holds_the_lease(mock_db, run):
+    async def scenario():
+        return [
+            await counters._acquire_lease("worker-a"),
+            await counters._acquire_lease("worker-b"),
+            await counters._acquire_lease("worker-a"),
+        ]
+
+    assert run(scenario()) == [True, False, True]
@@ -0,0 +1,19 @@
+def test_seed_bundle_keeps_edited_policies(mock_db, run):
+    import policy_revisions
+
+    bundle = {"policies": [
+        {"id": "POL001", "title": "Annual Leave", "content": "Seed text v2", "tags": []},
+        {"id": "POL002", "title": "Remote Work", "content": "New in this bundle", "tags": []},
+    ]}
+
+    async def scenario():
+        await policy_revisions.save_policy({"id": "POL001", "title": "Annual Leave", "content": "Edited by HR", "tags": []})
+        await mock_db._apply_seed_bundle(bundle)
+        await policy_revisions.ensure_setup()
+        policies = await mock_db.policies_collection.find({}, {"_id": 0}).sort("id").to_list(None)
+        return policies, await policy_revisions.changes_since(0)
+
+    (edited, added), feed = run(scenario())
+    assert edited["content"] == "Edited by HR" and edited["version"] == 1
+    assert added["content"] == "New in this bundle" and added["version"] == 2
+    assert [policy["version"] for policy in feed["changed"]] == [1, 2]
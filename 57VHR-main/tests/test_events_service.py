@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from events_service import _add_months, expand_occurrences
+
+
+def naive_occurrences(event, start, end):
+    """Every occurrence from the anchor onwards, one step at a time"""
+    rule = event.get("recurrence")
+    anchor = event["date"]
+    if not rule:
+        return [anchor] if start <= anchor < end else []
+    interval = rule.get("interval", 1)
+    until = rule.get("until")
+    found, n = [], 0
+    while True:
+        if rule["freq"] in ("daily", "weekly"):
+            when = anchor + timedelta(days=n * interval * (7 if rule["freq"] == "weekly" else 1))
+        else:
+            when = _add_months(anchor, n * interval * (12 if rule["freq"] == "yearly" else 1), anchor.day)
+        if when >= end or (until and when > until):
+            return found
+        if when >= start:
+            found.append(when)
+        n += 1
+
+
+WINDOWS = [
+    (datetime(2025, 1, 1), datetime(2025, 4, 1)),
+    (datetime(2026, 2, 10), datetime(2026, 5, 11)),
+    (datetime(2024, 1, 1), datetime(2024, 12, 31)),   # before the anchor
+    (datetime(2031, 12, 30), datetime(2032, 3, 30)),
+]
+
+EVENTS = [
+    {"date": datetime(2025, 3, 3, 9, 30)},
+    {"date": datetime(2025, 1, 5, 10, 0), "recurrence": {"freq": "daily", "interval": 3}},
+    {"date": datetime(2025, 1, 5, 10, 0), "recurrence": {"freq": "weekly", "interval": 2}},
+    {"date": datetime(2025, 1, 31), "recurrence": {"freq": "monthly", "interval": 1}},
+    {"date": datetime(2025, 1, 27), "recurrence": {"freq": "monthly", "interval": 2}},
+    {"date": datetime(2024, 2, 29), "recurrence": {"freq": "yearly", "interval": 1}},
+    {"date": datetime(2025, 1, 6), "recurrence": {"freq": "weekly", "interval": 1, "until": datetime(2025, 2, 24)}},
+]
+
+
+@pytest.mark.parametrize("event", EVENTS)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_matches_naive_expansion(event, window):
+    assert expand_occurrences(event, *window) == naive_occurrences(event, *window)
+
+
+def test_month_end_anchor_clamps_without_drifting():
+    event = {"date": datetime(2025, 1, 31), "recurrence": {"freq": "monthly", "interval": 1}}
+    days = [when.day for when in expand_occurrences(event, datetime(2025, 1, 1), datetime(2025, 6, 1))]
+    assert days == [31, 28, 31, 30, 31]
+
+
+def test_until_is_inclusive():
+    event = {"date": datetime(2025, 1, 6), "recurrence": {"freq": "weekly", "interval": 1, "until": datetime(2025, 1, 20)}}
+    assert expand_occurrences(event, datetime(2025, 1, 1), datetime(2025, 3, 1)) == [
+        datetime(2025, 1, 6), datetime(2025, 1, 13), datetime(2025, 1, 20)
+    ]
+
+
+def test_window_end_is_exclusive():
+    event = {"date": datetime(2025, 1, 5), "recurrence": {"freq": "daily", "interval": 1}}
+    assert expand_occurrences(event, datetime(2025, 1, 5), datetime(2025, 1, 7)) == [
+        datetime(2025, 1, 5), datetime(2025, 1, 6)
+    ]
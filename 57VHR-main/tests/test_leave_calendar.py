@@ -0,0 +1,108 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from leave_calendar import IntervalTree, LeaveCalendar
+
+
+def brute_force(intervals, start, end):
+    return sorted(item_id for item_id, (s, e) in intervals.items() if s <= end and e >= start)
+
+
+def found_ids(tree, start, end):
+    return sorted(value["id"] for value in tree.overlapping(start, end))
+
+
+def test_empty_tree_has_no_overlaps():
+    tree = IntervalTree()
+    assert len(tree) == 0
+    assert tree.overlapping(0, 100) == []
+
+
+@pytest.mark.parametrize("window,expected", [
+    ((1, 4), []),           # ends the day before
+    ((1, 5), ["a"]),        # touches the start day
+    ((10, 12), ["a"]),      # touches the end day
+    ((11, 20), []),         # starts the day after
+    ((6, 7), ["a"]),        # inside
+    ((0, 30), ["a"]),       # covers
+])
+def test_closed_interval_boundaries(window, expected):
+    tree = IntervalTree()
+    tree.insert(5, 10, "a", {"id": "a"})
+    assert found_ids(tree, *window) == expected
+
+
+def test_matches_brute_force_through_inserts_and_removes():
+    rng = random.Random(7)
+    tree = IntervalTree()
+    intervals = {}
+    for i in range(400):
+        start = rng.randint(0, 1000)
+        item_id = f"r{i}"
+        intervals[item_id] = (start, start + rng.randint(0, 30))
+        tree.insert(*intervals[item_id], item_id, {"id": item_id})
+    for item_id in rng.sample(sorted(intervals), 150):
+        tree.remove(intervals.pop(item_id)[0], item_id)
+
+    assert len(tree) == len(intervals)
+    for _ in range(200):
+        start = rng.randint(-10, 1010)
+        end = start + rng.randint(0, 60)
+        assert found_ids(tree, start, end) == brute_force(intervals, start, end)
+
+
+def test_same_start_day_is_kept_per_item():
+    tree = IntervalTree()
+    tree.insert(3, 4, "a", {"id": "a"})
+    tree.insert(3, 9, "b", {"id": "b"})
+    tree.remove(3, "a")
+    assert found_ids(tree, 0, 10) == ["b"]
+
+
+def test_calendar_follows_status_and_department_changes(mock_db, run):
+    async def scenario():
+        await mock_db.employees_collection.insert_many([
+            {"id": "EMP001", "name": "Sara", "department": "Technology"},
+            {"id": "EMP002", "name": "Omar", "department": "Technology"},
+        ])
+        await mock_db.hr_requests_collection.insert_many([
+            {"id": "REQ1", "employee_id": "EMP001", "type": "Vacation Leave", "status": "Approved",
+             "start_date": "2026-05-04", "end_date": "2026-05-08"},
+            {"id": "REQ2", "employee_id": "EMP002", "type": "Vacation Leave", "status": "Rejected",
+             "start_date": "2026-05-05", "end_date": "2026-05-06"},
+        ])
+        calendar = LeaveCalendar()
+        await calendar.load()
+        loaded = await calendar.who_is_out("2026-05-06", "2026-05-06", "Technology")
+        overlapping = await calendar.teammates_out("Technology", "2026-05-01", "2026-05-31", "EMP002")
+
+        await calendar.apply({"id": "REQ1", "employee_id": "EMP001", "type": "Vacation Leave",
+                              "status": "Cancelled", "start_date": "2026-05-04", "end_date": "2026-05-08"})
+        cancelled = await calendar.who_is_out("2026-05-01", "2026-05-31")
+
+        # Another worker moves Omar to Finance and approves new leave for him
+        await mock_db.employees_collection.update_one({"id": "EMP002"}, {"$set": {"department": "Finance"}})
+        await mock_db.hr_requests_collection.insert_one(
+            {"id": "REQ3", "employee_id": "EMP002", "type": "Vacation Leave", "status": "Approved",
+             "start_date": "2026-06-01", "end_date": "2026-06-03", "updated_at": datetime.utcnow()})
+        await calendar.refresh(force=True)
+        moved_new = await calendar.who_is_out("2026-06-01", "2026-06-30")
+
+        # Sara moves to Finance with leave already on the calendar
+        await calendar.apply({"id": "REQ1", "employee_id": "EMP001", "type": "Vacation Leave",
+                              "status": "Approved", "start_date": "2026-05-04", "end_date": "2026-05-08"})
+        await mock_db.employees_collection.update_one({"id": "EMP001"}, {"$set": {"department": "Finance"}})
+        await calendar.refresh(force=True)
+        technology = await calendar.who_is_out("2026-05-01", "2026-06-30", "Technology")
+        finance = await calendar.who_is_out("2026-05-01", "2026-06-30", "Finance")
+        return loaded, overlapping, cancelled, moved_new, technology, finance
+
+    loaded, overlapping, cancelled, moved_new, technology, finance = run(scenario())
+    assert [entry["request_id"] for entry in loaded] == ["REQ1"]
+    assert overlapping == ["EMP001"]
+    assert cancelled == []
+    assert [(entry["request_id"], entry["department"]) for entry in moved_new] == [("REQ3", "Finance")]
+    assert technology == []
+    assert [(entry["request_id"], entry["department"]) for entry in finance] == [("REQ1", "Finance"), ("REQ3", "Finance")]
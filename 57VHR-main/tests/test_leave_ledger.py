@@ -0,0 +1,140 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import leave_ledger
+
+
+def leave_request(employee_id, leave_type, days, start_date, status="Pending"):
+    return {
+        "id": str(uuid.uuid4()),
+        "employee_id": employee_id,
+        "type": leave_type,
+        "days": days,
+        "status": status,
+        "start_date": start_date,
+    }
+
+
+@pytest.mark.parametrize("request_type,bucket", [
+    ("Vacation Leave", "vacation"),
+    ("Sick Leave", "sick"),
+    ("Unpaid Parental Leave", "unpaid_parental"),
+    ("Salary Certificate", None),
+    ("", None),
+])
+def test_leave_bucket(request_type, bucket):
+    assert leave_ledger.leave_bucket(request_type) == bucket
+
+
+def test_rebuild_matches_live_balance_across_years(mock_db, run):
+    async def scenario():
+        await leave_ledger.ensure_indexes()
+        await mock_db.vacation_balances_collection.insert_one(
+            {"employee_id": "EMP001", "year": 2025, "total_days": 30, "used_days": 0, "remaining_days": 30}
+        )
+        await leave_ledger.submit_request(leave_request("EMP001", "Vacation Leave", 7, "2026-03-02"))
+        await leave_ledger.submit_request(leave_request("EMP001", "Sick Leave", 2, "2026-04-06"))
+        live = await mock_db.vacation_balances_collection.find_one({"employee_id": "EMP001"}, {"_id": 0})
+
+        assert await leave_ledger.rebuild_balances() == 1
+        rebuilt = await mock_db.vacation_balances_collection.find_one({"employee_id": "EMP001"}, {"_id": 0})
+        return live, rebuilt
+
+    live, rebuilt = run(scenario())
+    assert (live["used_days"], live["remaining_days"], live["used_by_type"]) == (7, 23, {"sick": 2})
+    assert (rebuilt["used_days"], rebuilt["remaining_days"], rebuilt["used_by_type"]) == (7, 23, {"sick": 2})
+
+
+def test_rejection_refunds_and_rebuild_agrees(mock_db, run):
+    async def scenario():
+        await leave_ledger.ensure_indexes()
+        await mock_db.vacation_balances_collection.insert_one(
+            {"employee_id": "EMP002", "year": 2026, "total_days": 21, "used_days": 0, "remaining_days": 21}
+        )
+        request = leave_request("EMP002", "Vacation Leave", 5, "2026-07-01")
+        await leave_ledger.submit_request(request)
+        await leave_ledger.transition_request(request["id"], {"status": "Rejected"})
+        # Replaying the same transition version must not refund twice
+        await leave_ledger.record_entry(leave_ledger._build_entry({**request, "status": "Rejected"}, "refund", 5, 1))
+        live = await mock_db.vacation_balances_collection.find_one({"employee_id": "EMP002"}, {"_id": 0})
+        await leave_ledger.rebuild_balances("EMP002")
+        rebuilt = await mock_db.vacation_balances_collection.find_one({"employee_id": "EMP002"}, {"_id": 0})
+        return live, rebuilt
+
+    live, rebuilt = run(scenario())
+    assert (live["used_days"], live["remaining_days"]) == (0, 21)
+    assert (rebuilt["used_days"], rebuilt["remaining_days"]) == (0, 21)
+
+
+class TransactionCollection:
+    """Collection writes inside one transaction: a failed write aborts it, as on a replica set"""
+
+    def __init__(self, session):
+        self.session = session
+        self.documents = []
+        self.updates = []
+
+    async def find_one(self, query, projection=None, session=None):
+        assert session is self.session
+        return next((doc for doc in self.documents if all(doc.get(k) == v for k, v in query.items())), None)
+
+    async def insert_one(self, document, session=None):
+        if await self.find_one({"key": document["key"]}, session=session):
+            self.session.aborted = True
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.documents.append(document)
+
+    async def update_one(self, query, update, session=None):
+        assert not self.session.aborted
+        self.updates.append(update)
+
+
+def test_replayed_entry_inside_a_transaction_does_not_abort_it(run, monkeypatch):
+    session = SimpleNamespace(aborted=False)
+    ledger, balances = TransactionCollection(session), TransactionCollection(session)
+    monkeypatch.setattr(leave_ledger, "leave_ledger_collection", ledger)
+    monkeypatch.setattr(leave_ledger, "vacation_balances_collection", balances)
+    entry = leave_ledger._build_entry(leave_request("EMP004", "Vacation Leave", 3, "2026-08-03"), "charge", -3, 0)
+
+    async def scenario():
+        return [await leave_ledger.record_entry(dict(entry), session) for _ in range(2)]
+
+    assert run(scenario()) == [True, False]
+    assert not session.aborted
+    assert len(ledger.documents) == 1 and balances.updates == [{"$inc": {"used_days": 3, "remaining_days": -3}}]
+
+
+def test_rebuild_keeps_pre_ledger_usage(mock_db, run):
+    async def scenario():
+        await leave_ledger.ensure_indexes()
+        await mock_db.vacation_balances_collection.insert_one(
+            {"employee_id": "EMP003", "year": 2025, "total_days": 30, "used_days": 4, "remaining_days": 26}
+        )
+        await leave_ledger.rebuild_balances()
+        return await mock_db.vacation_balances_collection.find_one({"employee_id": "EMP003"}, {"_id": 0})
+
+    rebuilt = run(scenario())
+    assert (rebuilt["used_days"], rebuilt["remaining_days"]) == (4, 26)
+
+
+def test_opening_entries_scan_once_per_seed_version(mock_db, run):
+    async def scenario():
+        await leave_ledger.ensure_indexes()
+        await mock_db.vacation_balances_collection.insert_one(
+            {"employee_id": "EMP004", "year": 2025, "total_days": 30, "used_days": 3, "remaining_days": 27}
+        )
+        first = await leave_ledger.ensure_opening_entries()
+        await mock_db.vacation_balances_collection.insert_one(
+            {"employee_id": "EMP005", "year": 2025, "total_days": 30, "used_days": 6, "remaining_days": 24}
+        )
+        second = await leave_ledger.ensure_opening_entries()
+        forced = await leave_ledger.ensure_opening_entries(force=True)
+        marker = await mock_db.meta_collection.find_one({"_id": leave_ledger.OPENING_ENTRIES_MARKER})
+        return first, second, forced, marker, await mock_db.leave_ledger_collection.count_documents({"event": "opening"})
+
+    first, second, forced, marker, openings = run(scenario())
+    assert (first, second, forced, openings) == (1, 0, 1, 2)
+    assert marker["seed_version"]
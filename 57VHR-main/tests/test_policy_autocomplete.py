@@ -0,0 +1,105 @@
+import pytest
+
+from policy_autocomplete import PolicyAutocomplete, PrefixTrie, build_trie
+
+POLICIES = [
+    {
+        "id": "POL001",
+        "title": "Annual Leave Policy - الإجازة السنوية",
+        "tags": ["vacation", "annual"],
+        "content": "**Entitlement:** Employees accrue annual leave monthly. Carry over requires approval.",
+        "content_ar": "يستحق الموظف الإجازة السنوية",
+    },
+    {
+        "id": "POL002",
+        "title": "Travel Policy",
+        "tags": ["business trip", "per diem"],
+        "content": "**Per Diem Rates:** Travel allowance covers hotels and flights. Annual review of rates.",
+    },
+    {
+        "id": "POL003",
+        "title": "Sick Leave Policy",
+        "tags": ["medical"],
+        "content": "Sick leave requires a medical certificate after two days.",
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def trie():
+    return build_trie(POLICIES)
+
+
+def texts(suggestions):
+    return [suggestion["text"] for suggestion in suggestions]
+
+
+def test_prefix_trie_keeps_the_best_distinct_suggestions():
+    trie = PrefixTrie()
+    for key, score, text in [("abc", 1.0, "abc"), ("abd", 3.0, "abd"), ("abd", 2.0, "ABD"), ("b", 9.0, "b")]:
+        trie.insert(key, score, {"text": text})
+    trie.finalize(k=5)
+    assert trie.lookup("ab") == [{"text": "abd", "score": 3.0}, {"text": "abc", "score": 1.0}]
+    assert trie.lookup("ab", limit=1) == [{"text": "abd", "score": 3.0}]
+    assert trie.lookup("x") == []
+
+
+def test_prefix_reaches_titles_tags_and_headings(trie):
+    assert texts(trie.lookup("trav"))[0] == "Travel Policy"
+    assert "vacation" in texts(trie.lookup("vac"))
+    assert "Per Diem Rates" in texts(trie.lookup("per d"))
+
+
+def test_titles_rank_above_tags_and_phrase_starts_above_inner_words(trie):
+    annual = trie.lookup("annual")
+    assert annual[0]["text"] == "Annual Leave Policy" and annual[0]["kind"] == "title"
+    assert texts(annual).index("annual") > 0
+    # "leave" starts no title, so titles containing it rank by the inner-word factor
+    leave = trie.lookup("leave")
+    assert {"Annual Leave Policy", "Sick Leave Policy"} <= set(texts(leave))
+    assert all(suggestion["score"] <= annual[0]["score"] for suggestion in leave)
+    scores = [suggestion["score"] for suggestion in leave]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_arabic_without_article_and_letter_variants():
+    autocomplete = PolicyAutocomplete()
+    autocomplete.trie = build_trie(POLICIES)
+    for query in ("اجازه", "الاجازة", "الإجازة", "السنويه"):
+        assert "الإجازة السنوية" in texts(autocomplete.suggest(query)), query
+
+
+def test_suggest_normalizes_the_query():
+    autocomplete = PolicyAutocomplete()
+    autocomplete.trie = build_trie(POLICIES)
+    assert texts(autocomplete.suggest("  TRAVEL"))[0] == "Travel Policy"
+    assert autocomplete.suggest("   ") == []
+    # A trailing space completes the next word only
+    assert all(text.lower().startswith("annual leave") for text in texts(autocomplete.suggest("annual l")))
+    assert "annual" not in texts(autocomplete.suggest("annual "))
+    assert len(autocomplete.suggest("a", limit=2)) == 2
+
+
+def test_rebuilds_after_policy_save_and_delete(mock_db, run):
+    import policy_revisions
+
+    async def scenario():
+        autocomplete = PolicyAutocomplete()
+        feed = policy_revisions.PolicyFeed()
+        feed.subscribe(autocomplete.on_policy_change)
+        await feed.start()
+        await autocomplete.rebuild()
+        before = autocomplete.suggest("remote")
+
+        await policy_revisions.save_policy({"id": "POL004", "title": "Remote Work Policy", "tags": [], "content": ""})
+        await feed.poll()
+        added = autocomplete.suggest("remote")
+
+        await policy_revisions.delete_policy("POL004")
+        await feed.poll()
+        return before, added, autocomplete.suggest("remote")
+
+    before, added, after = run(scenario())
+    assert before == []
+    assert texts(added) == ["Remote Work Policy"] and added[0]["policyId"] == "POL004"
+    assert after == []
@@ -0,0 +1,118 @@
+from policy_search import PolicySearchIndex, _build_index
+
+POLICIES = [
+    {
+        "id": "POL001",
+        "title": "Annual Leave Policy",
+        "category": "leave",
+        "tags": ["vacation"],
+        "content": "Employees accrue annual leave monthly. Unused leave carries over with manager approval.",
+        "content_ar": "يستحق الموظف الإجازة السنوية",
+    },
+    {
+        "id": "POL002",
+        "title": "Travel Policy",
+        "category": "finance",
+        "tags": ["per diem"],
+        "content": "Travel allowance covers hotels. Leave annual travel plans with the finance team.",
+    },
+    {
+        "id": "POL003",
+        "title": "Sick Leave Policy",
+        "category": "leave",
+        "tags": ["medical"],
+        "content": "Sick leave requires a medical certificate after two days of leave.",
+    },
+]
+
+
+def ids(response):
+    return [result["id"] for result in response["results"]]
+
+
+def test_title_matches_outrank_content_and_rare_terms_outrank_common_ones():
+    index = _build_index(POLICIES)
+    # "travel" is in POL002's title and only in its content elsewhere
+    assert ids(index.search("travel")) == ["POL002"]
+    annual = index.search("annual")
+    assert ids(annual) == ["POL001", "POL002"]
+    assert annual["results"][0]["score"] > annual["results"][1]["score"]
+    # "medical" appears in one policy, "leave" in all three
+    mixed = index.search("leave medical")
+    assert ids(mixed)[0] == "POL003"
+    # Stopwords are dropped unless the query is nothing but stopwords
+    assert index.search("of leave")["terms"] == ["leave"]
+    assert ids(index.search("of")) == ["POL003"]
+
+
+def test_phrase_requires_consecutive_positions_in_one_field():
+    index = _build_index(POLICIES)
+    assert sorted(ids(index.search("annual leave"))) == ["POL001", "POL002", "POL003"]
+    # POL002 has "leave annual" but never "annual leave"
+    phrase = index.search('"annual leave"')
+    assert ids(phrase) == ["POL001"]
+    assert phrase["phrases"] == [["annual", "leave"]]
+    assert ids(index.search('"two days of leave"')) == ["POL003"]
+    assert ids(index.search('"leave policy" sick')) == ["POL003", "POL001"]
+    assert index.search('"policy annual"')["results"] == []
+
+
+def test_snippets_highlight_the_matched_words():
+    index = _build_index(POLICIES)
+    result = index.search("certificate")["results"][0]
+    snippet = result["snippets"][0]
+    assert snippet["field"] == "content"
+    assert [snippet["text"][start:end] for start, end in snippet["highlights"]] == ["certificate"]
+    title = index.search("sick")["results"][0]
+    assert [title["title"][start:end] for start, end in title["titleHighlights"]] == ["Sick"]
+    # Tag-only matches lead with the opening of the policy
+    tagged = index.search("vacation")["results"][0]["snippets"][0]
+    assert tagged["highlights"] == [] and tagged["text"].startswith("Employees accrue")
+
+
+def test_category_filter_and_arabic_article():
+    index = _build_index(POLICIES)
+    assert sorted(ids(index.search("leave", category="leave"))) == ["POL001", "POL003"]
+    assert ids(index.search("leave", category="all")) == ids(index.search("leave"))
+    assert ids(index.search("اجازة")) == ["POL001"]
+    assert ids(index.search("الإجازة")) == ["POL001"]
+
+
+def test_remove_and_re_add_update_postings_and_lengths():
+    index = _build_index(POLICIES)
+    index.remove("POL003")
+    assert "medical" not in index.postings
+    assert index.search("sick")["results"] == []
+    index.add({**POLICIES[0], "title": "Vacation Policy"})
+    assert index.search('"annual leave"')["results"][0]["title"] == "Vacation Policy"
+    assert index._field_length_totals == _build_index([POLICIES[1], {**POLICIES[0], "title": "Vacation Policy"}])._field_length_totals
+
+
+def test_follows_policy_saves_and_deletes(mock_db, run):
+    import policy_revisions
+
+    async def scenario():
+        index = PolicySearchIndex()
+        feed = policy_revisions.PolicyFeed()
+        feed.subscribe(index.on_policy_change)
+        await feed.start()
+        await index.rebuild()
+        before = index.search("telework")
+
+        await policy_revisions.save_policy({"id": "POL004", "title": "Remote Work", "tags": [], "content": "Telework needs approval."})
+        await feed.poll()
+        added = index.search("telework")
+
+        await policy_revisions.save_policy({"id": "POL004", "title": "Remote Work", "tags": [], "content": "Hybrid schedules."})
+        await feed.poll()
+        edited = index.search("telework"), index.search("hybrid")
+
+        await policy_revisions.delete_policy("POL004")
+        await feed.poll()
+        return before, added, edited, index.search("remote")
+
+    before, added, (old_term, new_term), after = run(scenario())
+    assert before["results"] == []
+    assert ids(added) == ["POL004"]
+    assert old_term["results"] == [] and ids(new_term) == ["POL004"]
+    assert after["results"] == []
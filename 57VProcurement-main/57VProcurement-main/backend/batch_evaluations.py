@@ -0,0 +1,159 @@
+"""Background jobs that AI-evaluate every unevaluated proposal of an RFP.
+
+Evaluating the bids on a tender one ``/evaluate`` call at a time means one
+multi-second model call after another. ``start_job`` records a job in
+``db.evaluation_jobs`` and runs it as a background task. The task loads
+the RFP's proposals that have no ``ai_evaluation`` yet and evaluates up to
+``EVALUATION_CONCURRENCY`` of them at once.
+
+Each evaluation is written to its proposal as soon as it returns, and the
+progress counters (``completed``/``failed`` of ``total``) on the job document
+move with it, so any worker can report them and a job that stops part way
+keeps what it finished. The evaluator must raise on failure rather than
+return placeholder scores: a proposal whose evaluation raised is left
+unevaluated for the next job, and its error is recorded on the job.
+
+Only one job runs per RFP at a time, enforced by a unique partial index on
+``rfp_id`` over running jobs: starting another returns the running one. Jobs
+left ``running`` by a process that stopped are marked ``interrupted`` at
+startup, and their proposals are picked up by the next job.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY = int(os.environ.get('EVALUATION_CONCURRENCY', '8'))
+# Errors kept on the job document
+MAX_ERRORS = 50
+
+JOB_PROJECTION = {"_id": 0}
+
+# Evaluates one proposal document against its RFP document, returning the evaluation as a dict; raises on failure
+Evaluator = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Running tasks, referenced so they are not garbage collected mid-run
+_tasks = set()
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    total = job["total"]
+    done = job["completed"] + job["failed"]
+    return {
+        "job_id": job["id"],
+        "rfp_id": job["rfp_id"],
+        "status": job["status"],
+        "total": total,
+        "completed": job["completed"],
+        "failed": job["failed"],
+        "progress": round(done / total, 4) if total else 1.0,
+        "concurrency": job["concurrency"],
+        "errors": job.get("errors", []),
+        "created_at": job["created_at"],
+        "finished_at": job.get("finished_at"),
+    }
+
+
+async def ensure_indexes(db):
+    await db.evaluation_jobs.create_index("id", unique=True)
+    await db.evaluation_jobs.create_index([("rfp_id", 1), ("status", 1)])
+    await db.evaluation_jobs.create_index(
+        "rfp_id", unique=True, partialFilterExpression={"status": "running"}, name="one_running_job_per_rfp"
+    )
+
+
+async def get_job(db, job_id: str) -> Dict[str, Any]:
+    job = await db.evaluation_jobs.find_one({"id": job_id}, JOB_PROJECTION)
+    if not job:
+        raise HTTPException(status_code=404, detail="Evaluation job not found")
+    return job
+
+
+async def start_job(db, rfp: Dict[str, Any], created_by: str, evaluate: Evaluator) -> Dict[str, Any]:
+    running = await db.evaluation_jobs.find_one({"rfp_id": rfp["id"], "status": "running"}, JOB_PROJECTION)
+    if running:
+        return running
+
+    proposals = await db.proposals.find(
+        {"rfp_id": rfp["id"], "ai_evaluation": None}, {"_id": 0}
+    ).to_list(None)
+    now = datetime.utcnow()
+    job = {
+        "id": str(uuid.uuid4()),
+        "rfp_id": rfp["id"],
+        "created_by": created_by,
+        "status": "running" if proposals else "completed",
+        "proposal_ids": [p["id"] for p in proposals],
+        "total": len(proposals),
+        "completed": 0,
+        "failed": 0,
+        "concurrency": CONCURRENCY,
+        "errors": [],
+        "created_at": now,
+        "finished_at": None if proposals else now,
+    }
+    try:
+        await db.evaluation_jobs.insert_one(dict(job))
+    except DuplicateKeyError:
+        # Another request started a job for this RFP after the check above; return that one
+        return await start_job(db, rfp, created_by, evaluate)
+    if proposals:
+        task = asyncio.create_task(run_job(db, job, rfp, proposals, evaluate))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def run_job(db, job: Dict[str, Any], rfp: Dict[str, Any], proposals: List[Dict[str, Any]],
+                  evaluate: Evaluator):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    evaluated = 0
+
+    async def evaluate_one(proposal: Dict[str, Any]):
+        nonlocal evaluated
+        async with semaphore:
+            try:
+                evaluation = await evaluate(proposal, rfp)
+                await db.proposals.update_one({"id": proposal["id"]}, {"$set": {
+                    "status": "evaluated",
+                    "ai_score": evaluation["overall_score"],
+                    "ai_evaluation": evaluation,
+                }})
+            except Exception as e:
+                logger.error(f"Evaluation job {job['id']}: proposal {proposal['id']} failed: {e}")
+                await db.evaluation_jobs.update_one(
+                    {"id": job["id"]},
+                    {"$inc": {"failed": 1},
+                     "$push": {"errors": {"$each": [{"proposal_id": proposal["id"], "error": str(e)}],
+                                          "$slice": MAX_ERRORS}}},
+                )
+                return
+        evaluated += 1
+        await db.evaluation_jobs.update_one({"id": job["id"]}, {"$inc": {"completed": 1}})
+
+    status = "completed"
+    try:
+        await asyncio.gather(*[evaluate_one(p) for p in proposals])
+    except Exception as e:
+        logger.error(f"Evaluation job {job['id']} failed: {e}")
+        status = "failed"
+    await db.evaluation_jobs.update_one(
+        {"id": job["id"]}, {"$set": {"status": status, "finished_at": datetime.utcnow()}}
+    )
+    logger.info(f"Evaluation job {job['id']} {status}: {evaluated}/{job['total']} proposal(s) evaluated")
+
+
+async def mark_interrupted(db) -> int:
+    result = await db.evaluation_jobs.update_many(
+        {"status": "running"}, {"$set": {"status": "interrupted", "finished_at": datetime.utcnow()}}
+    )
+    if result.modified_count:
+        logger.info(f"Marked {result.modified_count} unfinished evaluation job(s) interrupted")
+    return result.modified_count
@@ -0,0 +1,327 @@
+"""Out-of-document storage for uploaded files (proposal and contract documents).
+
+Documents used to be embedded in their Mongo documents as base64 strings,
+which made every proposal read carry megabytes and capped files at the 16 MB
+BSON limit. Files now live in a blob store, and the owning document keeps only
+a small reference::
+
+    {"blob_id", "store", "filename", "content_type", "size", "sha256", "uploaded_at"}
+
+Two stores are available, chosen with ``BLOB_STORE``:
+
+- ``gridfs`` (default): a GridFS bucket in the application database, so
+  deployments need nothing beyond MongoDB.
+- ``local``: a content-addressed directory tree under ``BLOB_LOCAL_ROOT``,
+  where a blob's id is its SHA-256 and identical uploads are stored once.
+
+Both write and read in ``BLOB_CHUNK_SIZE`` pieces, so an upload or a download
+never holds more than one chunk of the file in memory; the size and SHA-256
+are computed on the way through.
+
+Staged blobs (``writer(..., staged=True)``, used for the parts of chunked
+uploads) get a unique id even in the local store, so they can be deleted
+without affecting a file another reference shares.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+logger = logging.getLogger(__name__)
+
+BLOB_STORE = os.environ.get('BLOB_STORE', 'gridfs')
+BLOB_LOCAL_ROOT = os.environ.get('BLOB_LOCAL_ROOT', str(Path(__file__).parent / 'blobs'))
+BLOB_BUCKET = os.environ.get('BLOB_BUCKET', 'documents')
+CHUNK_SIZE = int(os.environ.get('BLOB_CHUNK_SIZE', str(1024 * 1024)))
+
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+STAGED_PREFIX = "staged-"
+
+# Leading bytes -> content type, for files stored without one or a telling extension (migrated base64)
+_MAGIC = [
+    (b"%PDF", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\xd0\xcf\x11\xe0", "application/msword"),
+    (b"\x89PNG", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+]
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+def guess_content_type(head: bytes) -> str:
+    for magic, content_type in _MAGIC:
+        if head.startswith(magic):
+            return content_type
+    return DEFAULT_CONTENT_TYPE
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and "blob_id" in value
+
+
+class BlobWriter(ABC):
+    """Accepts a file chunk by chunk; ``close`` returns the blob reference"""
+    store = ""
+
+    def __init__(self, filename: str, content_type: Optional[str]):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._head = b""
+
+    async def write(self, chunk: bytes):
+        if not chunk:
+            return
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+        if len(self._head) < 8:
+            self._head += chunk[:8]
+        await self._write(chunk)
+
+    @property
+    def sha256(self) -> str:
+        """Hash of everything written so far"""
+        return self._sha256.hexdigest()
+
+    async def close(self) -> Dict[str, Any]:
+        blob_id = await self._close()
+        return {
+            "blob_id": blob_id,
+            "store": self.store,
+            "filename": self.filename,
+            "content_type": self.content_type or mimetypes.guess_type(self.filename)[0] or guess_content_type(self._head),
+            "size": self.size,
+            "sha256": self._sha256.hexdigest(),
+            "uploaded_at": datetime.utcnow(),
+        }
+
+    @abstractmethod
+    async def _write(self, chunk: bytes):
+        ...
+
+    @abstractmethod
+    async def _close(self) -> str:
+        ...
+
+    @abstractmethod
+    async def abort(self):
+        ...
+
+
+class BlobStore(ABC):
+    name = ""
+    # Identical content shares one blob, so deleting by id can affect other references
+    content_addressed = False
+
+    @abstractmethod
+    def writer(self, filename: str, content_type: Optional[str] = None, staged: bool = False) -> BlobWriter:
+        ...
+
+    @abstractmethod
+    def stream(self, blob_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Bytes ``start``..``end`` (inclusive, default to the end) in chunks; raises BlobNotFound"""
+
+    @abstractmethod
+    async def delete(self, blob_id: str):
+        ...
+
+    async def save_upload(self, upload, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Store a FastAPI ``UploadFile``, reading it ``CHUNK_SIZE`` bytes at a time"""
+        writer = self.writer(upload.filename or "upload", content_type or upload.content_type)
+        try:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                await writer.write(chunk)
+        except BaseException:
+            await writer.abort()
+            raise
+        return await writer.close()
+
+    async def save_base64(self, encoded: str, filename: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Store a base64 string, decoding it a slice at a time (used when migrating embedded documents)"""
+        if encoded.startswith("data:") and "," in encoded:
+            header, encoded = encoded.split(",", 1)
+            content_type = content_type or header[5:].split(";")[0] or None
+        # Line-wrapped base64 (MIME) would shift the slices off their 4-character boundaries
+        encoded = "".join(encoded.split())
+        writer = self.writer(filename, content_type)
+        # Slices of a multiple of 4 characters decode independently
+        step = CHUNK_SIZE // 3 * 4
+        try:
+            for offset in range(0, len(encoded), step):
+                await writer.write(base64.b64decode(encoded[offset:offset + step]))
+        except BaseException:
+            await writer.abort()
+            raise
+        return await writer.close()
+
+    async def read_all(self, blob_id: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(blob_id)])
+
+
+class _GridFSWriter(BlobWriter):
+    store = "gridfs"
+
+    def __init__(self, bucket: AsyncIOMotorGridFSBucket, filename: str, content_type: Optional[str]):
+        super().__init__(filename, content_type)
+        self._grid_in = bucket.open_upload_stream(filename, chunk_size_bytes=CHUNK_SIZE)
+
+    async def _write(self, chunk: bytes):
+        await self._grid_in.write(chunk)
+
+    async def _close(self) -> str:
+        await self._grid_in.close()
+        return str(self._grid_in._id)
+
+    async def close(self) -> Dict[str, Any]:
+        ref = await super().close()
+        # Keep the hash beside the file so GridFS contents can be audited on their own
+        await self._grid_in.set("metadata", {"sha256": ref["sha256"], "content_type": ref["content_type"]})
+        return ref
+
+    async def abort(self):
+        await self._grid_in.abort()
+
+
+class GridFSBlobStore(BlobStore):
+    name = "gridfs"
+
+    def __init__(self, db, bucket_name: str = BLOB_BUCKET):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name, chunk_size_bytes=CHUNK_SIZE)
+
+    def writer(self, filename: str, content_type: Optional[str] = None, staged: bool = False) -> BlobWriter:
+        # GridFS ids are unique per file already, staged or not
+        return _GridFSWriter(self.bucket, filename, content_type)
+
+    async def stream(self, blob_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            grid_out = await self.bucket.open_download_stream(ObjectId(blob_id))
+        except (NoFile, InvalidId):
+            raise BlobNotFound(blob_id)
+        end = grid_out.length - 1 if end is None else min(end, grid_out.length - 1)
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, blob_id: str):
+        try:
+            await self.bucket.delete(ObjectId(blob_id))
+        except (NoFile, InvalidId):
+            raise BlobNotFound(blob_id)
+
+
+class _LocalWriter(BlobWriter):
+    store = "local"
+
+    def __init__(self, blob_store: "LocalBlobStore", filename: str, content_type: Optional[str], staged: bool):
+        super().__init__(filename, content_type)
+        self._blob_store = blob_store
+        self._temp_path = blob_store.root / "tmp" / uuid.uuid4().hex
+        self._staged = staged
+        self._file = None
+
+    async def _write(self, chunk: bytes):
+        if self._file is None:
+            self._temp_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = await asyncio.to_thread(open, self._temp_path, "wb")
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def _close(self) -> str:
+        blob_id = f"{STAGED_PREFIX}{self._temp_path.name}" if self._staged else self._sha256.hexdigest()
+        path = self._blob_store.path(blob_id)
+        if self._file is None:
+            # Empty file
+            self._temp_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = await asyncio.to_thread(open, self._temp_path, "wb")
+        await asyncio.to_thread(self._file.close)
+        if path.exists():
+            # Same content already stored
+            self._temp_path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._temp_path, path)
+        return blob_id
+
+    async def abort(self):
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._temp_path.unlink(missing_ok=True)
+
+
+class LocalBlobStore(BlobStore):
+    """Content-addressed files: ``<root>/ab/cd/abcd...`` named by their SHA-256"""
+    name = "local"
+    content_addressed = True
+
+    def __init__(self, root: str = BLOB_LOCAL_ROOT):
+        self.root = Path(root)
+
+    def path(self, blob_id: str) -> Path:
+        if blob_id.startswith(STAGED_PREFIX):
+            name = blob_id[len(STAGED_PREFIX):]
+            if len(name) != 32 or any(ch not in "0123456789abcdef" for ch in name):
+                raise BlobNotFound(blob_id)
+            return self.root / "staged" / blob_id
+        if len(blob_id) != 64 or any(ch not in "0123456789abcdef" for ch in blob_id):
+            raise BlobNotFound(blob_id)
+        return self.root / blob_id[:2] / blob_id[2:4] / blob_id
+
+    def writer(self, filename: str, content_type: Optional[str] = None, staged: bool = False) -> BlobWriter:
+        return _LocalWriter(self, filename, content_type, staged)
+
+    async def stream(self, blob_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            handle = await asyncio.to_thread(open, self.path(blob_id), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(blob_id)
+        try:
+            size = os.fstat(handle.fileno()).st_size
+            end = size - 1 if end is None else min(end, size - 1)
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(handle.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            handle.close()
+
+    async def delete(self, blob_id: str):
+        try:
+            self.path(blob_id).unlink()
+        except FileNotFoundError:
+            raise BlobNotFound(blob_id)
+
+
+def create_blob_store(db) -> BlobStore:
+    if BLOB_STORE == "local":
+        logger.info(f"Blob store: local files under {BLOB_LOCAL_ROOT}")
+        return LocalBlobStore(BLOB_LOCAL_ROOT)
+    if BLOB_STORE != "gridfs":
+        raise ValueError(f"Unknown BLOB_STORE '{BLOB_STORE}'; use 'gridfs' or 'local'")
+    return GridFSBlobStore(db)
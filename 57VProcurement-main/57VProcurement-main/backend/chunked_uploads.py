@@ -0,0 +1,240 @@
+"""Resumable chunked uploads for large proposal and contract documents.
+
+A client opens an upload with the file's name, type and total size and gets
+back the fixed part size (``UPLOAD_PART_SIZE``) and the number of parts. Each
+part is PUT as the raw request body with its SHA-256 in ``X-Part-SHA256``.
+The body is streamed straight into a staged blob and hashed on the way, so the
+server holds one network chunk and at most one blob chunk per upload whatever
+the file size. A part with the wrong size or hash is discarded; sending a
+part again replaces it. The upload lists the parts received so far, so an
+interrupted client resumes by sending only the missing ones.
+
+Completion streams the parts in order into the final blob, checks the
+whole-file SHA-256 if the client sent one, deletes the staged parts and keeps
+the blob reference on the upload. ``claim_upload`` hands that reference to the
+endpoint attaching the file (``submit_proposal`` takes ``*_upload_id`` form
+fields in place of files) and ``release_upload`` gives it back if the file
+ends up not attached. Uploads not completed within ``UPLOAD_TTL_HOURS`` are
+purged at startup, as are expired uploads whose completion started more than
+``UPLOAD_COMPLETE_TIMEOUT_MINUTES`` ago and never finished (the process
+assembling them stopped).
+"""
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+import blob_storage
+
+logger = logging.getLogger(__name__)
+
+PART_SIZE = int(os.environ.get('UPLOAD_PART_SIZE', str(8 * 1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(2 * 1024 ** 3)))
+UPLOAD_TTL_HOURS = float(os.environ.get('UPLOAD_TTL_HOURS', '24'))
+COMPLETE_TIMEOUT_MINUTES = float(os.environ.get('UPLOAD_COMPLETE_TIMEOUT_MINUTES', '60'))
+
+UPLOAD_PROJECTION = {"_id": 0}
+
+
+def _part_length(upload: Dict[str, Any], number: int) -> int:
+    if number < upload["part_count"]:
+        return upload["part_size"]
+    return upload["size"] - upload["part_size"] * (upload["part_count"] - 1)
+
+
+def upload_status(upload: Dict[str, Any]) -> Dict[str, Any]:
+    received = sorted(int(n) for n in upload.get("parts", {}))
+    return {
+        "upload_id": upload["id"],
+        "filename": upload["filename"],
+        "size": upload["size"],
+        "part_size": upload["part_size"],
+        "part_count": upload["part_count"],
+        "status": upload["status"],
+        "received_parts": received,
+        "missing_parts": [n for n in range(1, upload["part_count"] + 1) if n not in set(received)],
+        "expires_at": upload["expires_at"],
+        "blob": upload.get("blob"),
+    }
+
+
+async def ensure_indexes(db):
+    await db.uploads.create_index("id", unique=True)
+    await db.uploads.create_index([("status", 1), ("expires_at", 1)])
+
+
+async def create_upload(db, owner_id: str, filename: str, content_type: Optional[str], size: int) -> Dict[str, Any]:
+    if size < 0 or size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes")
+    now = datetime.utcnow()
+    upload = {
+        "id": str(uuid.uuid4()),
+        "owner_id": owner_id,
+        "filename": filename,
+        "content_type": content_type,
+        "size": size,
+        "part_size": PART_SIZE,
+        # An empty file still uploads as one (empty) part
+        "part_count": max(1, -(-size // PART_SIZE)),
+        "parts": {},
+        "status": "open",
+        "created_at": now,
+        "expires_at": now + timedelta(hours=UPLOAD_TTL_HOURS),
+    }
+    await db.uploads.insert_one(dict(upload))
+    return upload
+
+
+async def get_upload(db, upload_id: str, owner_id: str) -> Dict[str, Any]:
+    upload = await db.uploads.find_one({"id": upload_id}, UPLOAD_PROJECTION)
+    if not upload or upload["owner_id"] != owner_id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+def _require_open(upload: Dict[str, Any]):
+    if upload["status"] != "open":
+        raise HTTPException(status_code=409, detail=f"Upload is {upload['status']}")
+    if upload["expires_at"] < datetime.utcnow():
+        raise HTTPException(status_code=410, detail="Upload expired")
+
+
+async def put_part(db, store: blob_storage.BlobStore, upload: Dict[str, Any], number: int,
+                   body: AsyncIterator[bytes], sha256: str) -> Dict[str, Any]:
+    _require_open(upload)
+    if not 1 <= number <= upload["part_count"]:
+        raise HTTPException(status_code=400, detail=f"Part number must be between 1 and {upload['part_count']}")
+    expected = _part_length(upload, number)
+
+    writer = store.writer(f"{upload['id']}.part{number}", staged=True)
+    try:
+        async for chunk in body:
+            if writer.size + len(chunk) > expected:
+                raise HTTPException(status_code=400, detail=f"Part {number} must be {expected} bytes")
+            await writer.write(chunk)
+        if writer.size != expected:
+            raise HTTPException(status_code=400, detail=f"Part {number} must be {expected} bytes, got {writer.size}")
+        if writer.sha256 != sha256.lower():
+            raise HTTPException(status_code=400, detail=f"Part {number} checksum mismatch")
+    except BaseException:
+        await writer.abort()
+        raise
+    ref = await writer.close()
+    part = {"blob_id": ref["blob_id"], "size": ref["size"], "sha256": ref["sha256"], "uploaded_at": ref["uploaded_at"]}
+
+    previous = await db.uploads.find_one_and_update(
+        {"id": upload["id"], "status": "open"},
+        {"$set": {f"parts.{number}": part}},
+        projection={"_id": 0, f"parts.{number}": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if previous is None:
+        # Completed or aborted while this part was in flight
+        await store.delete(part["blob_id"])
+        raise HTTPException(status_code=409, detail="Upload is no longer open")
+    replaced = previous.get("parts", {}).get(str(number))
+    if replaced:
+        await _delete_quietly(store, replaced["blob_id"])
+    return {"part_number": number, "size": part["size"], "sha256": part["sha256"]}
+
+
+async def complete_upload(db, store: blob_storage.BlobStore, upload: Dict[str, Any],
+                          sha256: Optional[str] = None) -> Dict[str, Any]:
+    _require_open(upload)
+    parts = upload.get("parts", {})
+    missing = [n for n in range(1, upload["part_count"] + 1) if str(n) not in parts]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing parts: {missing[:20]}")
+
+    # Claim the upload so parts can't change while they are assembled
+    claimed = await db.uploads.find_one_and_update(
+        {"id": upload["id"], "status": "open"}, {"$set": {"status": "completing", "completing_at": datetime.utcnow()}},
+        projection=UPLOAD_PROJECTION,
+    )
+    if claimed is None:
+        raise HTTPException(status_code=409, detail="Upload is no longer open")
+    parts = claimed["parts"]
+
+    writer = store.writer(upload["filename"], upload.get("content_type"))
+    try:
+        for number in range(1, upload["part_count"] + 1):
+            async for chunk in store.stream(parts[str(number)]["blob_id"]):
+                await writer.write(chunk)
+        if writer.size != upload["size"]:
+            raise HTTPException(status_code=400, detail="Assembled size does not match the declared size")
+        if sha256 and writer.sha256 != sha256.lower():
+            raise HTTPException(status_code=400, detail="File checksum mismatch")
+    except BaseException:
+        await writer.abort()
+        # Parts are kept, so the client can fix and resend them
+        await db.uploads.update_one({"id": upload["id"]}, {"$set": {"status": "open"}})
+        raise
+    ref = await writer.close()
+
+    for part in parts.values():
+        await _delete_quietly(store, part["blob_id"])
+    await db.uploads.update_one({"id": upload["id"]}, {"$set": {"status": "completed", "blob": ref, "parts": {}}})
+    return {**claimed, "status": "completed", "blob": ref, "parts": {}}
+
+
+async def abort_upload(db, store: blob_storage.BlobStore, upload: Dict[str, Any]):
+    if upload["status"] in ("completing", "attached"):
+        raise HTTPException(status_code=409, detail=f"Upload is {upload['status']}")
+    await _discard(db, store, upload)
+
+
+async def _discard(db, store: blob_storage.BlobStore, upload: Dict[str, Any]):
+    await db.uploads.update_one({"id": upload["id"]}, {"$set": {"status": "aborted", "parts": {}}})
+    for part in upload.get("parts", {}).values():
+        await _delete_quietly(store, part["blob_id"])
+    if upload.get("blob") and not store.content_addressed:
+        # Completed but never attached; a content-addressed file may be shared, so it stays
+        await _delete_quietly(store, upload["blob"]["blob_id"])
+
+
+async def claim_upload(db, upload_id: str, owner_id: str) -> Dict[str, Any]:
+    """The blob reference of a completed upload, marking it attached so it is used once"""
+    upload = await db.uploads.find_one_and_update(
+        {"id": upload_id, "owner_id": owner_id, "status": "completed"},
+        {"$set": {"status": "attached"}},
+        projection=UPLOAD_PROJECTION,
+    )
+    if upload is None:
+        raise HTTPException(status_code=400, detail=f"Upload {upload_id} is not a completed upload of yours")
+    return upload["blob"]
+
+
+async def release_upload(db, upload_id: str, owner_id: str):
+    """Undo ``claim_upload`` for a file that was not attached after all"""
+    await db.uploads.update_one(
+        {"id": upload_id, "owner_id": owner_id, "status": "attached"}, {"$set": {"status": "completed"}}
+    )
+
+
+async def purge_expired(db, store: blob_storage.BlobStore) -> int:
+    now = datetime.utcnow()
+    expired = await db.uploads.find(
+        {"expires_at": {"$lt": now}, "$or": [
+            {"status": {"$in": ["open", "completed"]}},
+            # Uploads from before completing_at was recorded match too
+            {"status": "completing",
+             "completing_at": {"$not": {"$gt": now - timedelta(minutes=COMPLETE_TIMEOUT_MINUTES)}}},
+        ]},
+        UPLOAD_PROJECTION,
+    ).to_list(None)
+    for upload in expired:
+        await _discard(db, store, upload)
+    if expired:
+        logger.info(f"Purged {len(expired)} expired upload(s)")
+    return len(expired)
+
+
+async def _delete_quietly(store: blob_storage.BlobStore, blob_id: str):
+    try:
+        await store.delete(blob_id)
+    except blob_storage.BlobNotFound:
+        pass
@@ -0,0 +1,289 @@
+"""Text extraction from proposal documents, for the AI evaluator.
+
+When a proposal is submitted, ``schedule`` extracts the text of each of its
+documents in the background. Parsing runs on a pool of
+``EXTRACTION_WORKERS`` processes, so it never holds the event loop or the
+GIL. Supported formats are PDF (``pypdf``), DOCX (``python-docx``), XLSX
+(``openpyxl``) and plain text. Each parser is optional: without it, that
+format is recorded as unsupported, and extracted once the parser is installed.
+
+Results are stored once per file content in ``db.document_texts``, keyed by
+the blob's SHA-256. Text is stored as chunks of at most
+``EXTRACTION_CHUNK_CHARS``, each tagged with its page. PDFs have real pages,
+XLSX sheets count as pages, and DOCX and text are split into pages of about
+``PAGE_CHARS``. Files over ``EXTRACTION_MAX_BYTES`` are skipped, and text
+beyond ``EXTRACTION_MAX_CHARS`` is dropped (``truncated``).
+
+``excerpt`` picks the chunks that share the most terms with a query (the RFP
+terms), best first, until a token budget is spent. It returns them in
+document order for the evaluation prompt. A document whose upload-time
+extraction has not finished is extracted on demand.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import pypdf
+except ImportError:  # optional, PDFs are recorded as unsupported
+    pypdf = None
+try:
+    import docx
+except ImportError:  # optional (python-docx)
+    docx = None
+try:
+    import openpyxl
+except ImportError:  # optional
+    openpyxl = None
+
+import blob_storage
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get('EXTRACTION_WORKERS', '0')) or os.cpu_count() or 1
+MAX_BYTES = int(os.environ.get('EXTRACTION_MAX_BYTES', str(50 * 1024 * 1024)))
+MAX_CHARS = int(os.environ.get('EXTRACTION_MAX_CHARS', str(2 * 1024 * 1024)))
+CHUNK_CHARS = int(os.environ.get('EXTRACTION_CHUNK_CHARS', '2000'))
+# Page length for formats without pages (DOCX, plain text)
+PAGE_CHARS = 3000
+CHARS_PER_TOKEN = 4
+
+TEXT_EXTENSIONS = (".txt", ".csv", ".md", ".json", ".xml", ".html", ".htm")
+KINDS = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+}
+STOPWORDS = {"with", "that", "this", "from", "will", "shall", "have", "been", "their", "which", "should",
+             "must", "including", "within", "such", "other", "than", "more", "also", "into", "only"}
+WORD_RE = re.compile(r"[^\W\d_]{4,}")
+
+
+def document_kind(content_type: Optional[str], filename: Optional[str]) -> Optional[str]:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    name = (filename or "").lower()
+    if content_type in KINDS:
+        return KINDS[content_type]
+    for extension in (".pdf", ".docx", ".xlsx"):
+        if name.endswith(extension):
+            return extension[1:]
+    if content_type.startswith("text/") or name.endswith(TEXT_EXTENSIONS):
+        return "text"
+    return None
+
+
+def _split(text: str, size: int) -> List[str]:
+    """``text`` in pieces of at most ``size`` characters, broken at paragraph or line ends where possible"""
+    pieces = []
+    text = text.strip()
+    while len(text) > size:
+        cut = max(text.rfind("\n\n", 0, size), text.rfind("\n", 0, size))
+        if cut < size // 2:
+            cut = text.rfind(" ", 0, size)
+        if cut < size // 2:
+            cut = size
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def extract_pages(data: bytes, kind: str) -> List[str]:
+    """The text of each page of a document. Runs in the extraction worker processes."""
+    if kind == "pdf":
+        reader = pypdf.PdfReader(io.BytesIO(data))
+        return [page.extract_text() or "" for page in reader.pages]
+    if kind == "docx":
+        document = docx.Document(io.BytesIO(data))
+        paragraphs = [p.text for p in document.paragraphs]
+        for table in document.tables:
+            paragraphs.extend("\t".join(cell.text for cell in row.cells) for row in table.rows)
+        return _split("\n".join(paragraphs), PAGE_CHARS)
+    if kind == "xlsx":
+        workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        try:
+            return [
+                f"Sheet: {sheet.title}\n" + "\n".join(
+                    "\t".join("" if value is None else str(value) for value in row)
+                    for row in sheet.iter_rows(values_only=True) if any(value is not None for value in row)
+                )
+                for sheet in workbook.worksheets
+            ]
+        finally:
+            workbook.close()
+    if kind == "text":
+        return _split(data.decode("utf-8", errors="replace"), PAGE_CHARS)
+    raise ValueError(f"Unsupported document kind: {kind}")
+
+
+def _parser_available(kind: str) -> bool:
+    return {"pdf": pypdf, "docx": docx, "xlsx": openpyxl}.get(kind, True) is not None
+
+
+def chunk_pages(pages: List[str]) -> Dict[str, Any]:
+    chunks = []
+    chars = 0
+    truncated = False
+    for number, page in enumerate(pages, start=1):
+        for text in _split(page, CHUNK_CHARS):
+            if chars + len(text) > MAX_CHARS:
+                truncated = True
+                break
+            chunks.append({"page": number, "text": text})
+            chars += len(text)
+        if truncated:
+            break
+    return {"pages": len(pages), "chars": chars, "truncated": truncated, "chunks": chunks}
+
+
+class ExtractionMetrics:
+    def __init__(self):
+        self.documents = 0
+        self.failed = 0
+        self.unsupported = 0
+        self.bytes = 0
+        self.pages = 0
+        self.seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": WORKERS,
+            "documents": self.documents,
+            "failed": self.failed,
+            "unsupported": self.unsupported,
+            "bytes": self.bytes,
+            "pages": self.pages,
+            "averageMs": round(self.seconds * 1000 / self.documents, 1) if self.documents else None,
+        }
+
+
+metrics = ExtractionMetrics()
+_executor: Optional[Executor] = None
+# sha256 -> extraction in progress in this process
+_inflight: Dict[str, asyncio.Future] = {}
+# Upload-time tasks, referenced so they are not garbage collected mid-run
+_tasks = set()
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that runs the Mongo client's threads is not safe
+        _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Document extraction pool: {WORKERS} process(es)")
+    return _executor
+
+
+async def ensure_indexes(db):
+    await db.document_texts.create_index("sha256", unique=True)
+
+
+async def _extract(db, store: blob_storage.BlobStore, ref: Dict[str, Any]) -> Dict[str, Any]:
+    result = {"sha256": ref["sha256"], "filename": ref.get("filename"), "extracted_at": datetime.utcnow()}
+    kind = document_kind(ref.get("content_type"), ref.get("filename"))
+    if kind is None or not _parser_available(kind):
+        metrics.unsupported += 1
+        result.update(status="unsupported", kind=kind, chunks=[])
+    elif ref["size"] > MAX_BYTES:
+        metrics.unsupported += 1
+        result.update(status="unsupported", kind=kind, chunks=[], error=f"Larger than {MAX_BYTES} bytes")
+    else:
+        started = time.perf_counter()
+        try:
+            data = await store.read_all(ref["blob_id"])
+            pages = await asyncio.get_running_loop().run_in_executor(_get_executor(), extract_pages, data, kind)
+            result.update(status="extracted", kind=kind, **chunk_pages(pages))
+            metrics.documents += 1
+            metrics.bytes += len(data)
+            metrics.pages += result["pages"]
+        except Exception as e:
+            logger.warning(f"Text extraction failed for {ref.get('filename')} ({ref['sha256']}): {e}")
+            metrics.failed += 1
+            result.update(status="failed", kind=kind, chunks=[], error=str(e))
+        metrics.seconds += time.perf_counter() - started
+    await db.document_texts.update_one({"sha256": ref["sha256"]}, {"$set": result}, upsert=True)
+    return result
+
+
+def _needs_extraction(stored: Optional[Dict[str, Any]], ref: Dict[str, Any]) -> bool:
+    if stored is None or stored["status"] == "failed":
+        return True
+    # Recorded while the format's optional parser was missing; it may be installed now
+    return (stored["status"] == "unsupported" and stored.get("kind") is not None
+            and _parser_available(stored["kind"]) and ref["size"] <= MAX_BYTES)
+
+
+async def ensure_extracted(db, store: blob_storage.BlobStore, ref: Dict[str, Any]) -> Dict[str, Any]:
+    """The stored extraction for a blob, extracting it first if needed"""
+    stored = await db.document_texts.find_one({"sha256": ref["sha256"]}, {"_id": 0})
+    if not _needs_extraction(stored, ref):
+        return stored
+    pending = _inflight.get(ref["sha256"])
+    if pending is None:
+        pending = asyncio.ensure_future(_extract(db, store, ref))
+        _inflight[ref["sha256"]] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(ref["sha256"], None))
+    return await asyncio.shield(pending)
+
+
+def schedule(db, store: blob_storage.BlobStore, ref: Optional[Dict[str, Any]]):
+    """Extract a newly uploaded document in the background"""
+    if not blob_storage.is_blob_ref(ref):
+        return
+    task = asyncio.create_task(ensure_extracted(db, store, ref))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def _terms(text: str) -> Counter:
+    return Counter(word for word in WORD_RE.findall(text.lower()) if word not in STOPWORDS)
+
+
+def select_chunks(chunks: List[Dict[str, Any]], query: str, token_budget: int) -> List[Dict[str, Any]]:
+    """The chunks most relevant to ``query`` that fit in ``token_budget``, in document order"""
+    query_terms = set(_terms(query))
+
+    def score(position: int) -> float:
+        terms = _terms(chunks[position]["text"])
+        shared = query_terms & set(terms)
+        # Distinct shared terms first, then how often they occur; earlier chunks win ties
+        return len(shared) + 0.1 * sum(terms[term] for term in shared) - position * 1e-6
+
+    budget = token_budget * CHARS_PER_TOKEN
+    selected = []
+    for position in sorted(range(len(chunks)), key=score, reverse=True):
+        text = chunks[position]["text"]
+        if len(text) > budget:
+            if budget < 200:
+                break
+            text = text[:budget].rsplit(" ", 1)[0] + " …"
+        selected.append((position, {"page": chunks[position]["page"], "text": text}))
+        budget -= len(text)
+    return [chunk for _, chunk in sorted(selected, key=lambda item: item[0])]
+
+
+async def excerpt(db, store: blob_storage.BlobStore, ref: Any, query: str, token_budget: int) -> Optional[str]:
+    """Relevant text of a document for the evaluation prompt; None when there is none to give"""
+    if not blob_storage.is_blob_ref(ref):
+        return None
+    extracted = await ensure_extracted(db, store, ref)
+    chunks = select_chunks(extracted.get("chunks", []), query, token_budget)
+    if not chunks:
+        return None
+    return "\n\n".join(f"[page {chunk['page']}] {chunk['text']}" for chunk in chunks)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,129 @@
+"""Stored AI evaluations, reused while their inputs are unchanged.
+
+An evaluation depends only on the RFP terms the prompt quotes (title, budget,
+description, scope), the proposal's vendor and documents, the prompt, how much
+document text it carries and the model. ``cache_key`` hashes exactly those. Documents contribute their SHA-256
+(from the blob reference), so a cache hit never re-reads a file. An edit to
+another RFP field, or clicking evaluate again, reuses the stored result in
+``db.evaluation_cache`` instead of paying for a new model call. Changing the
+prompt means bumping its version, which changes every key; so does a new
+per-document token budget.
+
+Only parsed model results are stored; fallback evaluations are not. Callers
+pass ``force_refresh`` to skip the lookup; the fresh result replaces the
+stored one.
+
+Token counts are estimated at ~4 characters per token (the chat client does
+not report usage). ``metrics`` turns them into tokens and dollars saved using
+``EVALUATION_INPUT_COST_PER_1K``/``EVALUATION_OUTPUT_COST_PER_1K``, which
+default to GPT-4.1 list prices.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+INPUT_COST_PER_1K = float(os.environ.get('EVALUATION_INPUT_COST_PER_1K', '0.002'))
+OUTPUT_COST_PER_1K = float(os.environ.get('EVALUATION_OUTPUT_COST_PER_1K', '0.008'))
+
+CHARS_PER_TOKEN = 4
+
+
+class EvaluationCacheMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.stored = 0
+        self.input_tokens_saved = 0
+        self.output_tokens_saved = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        cost_saved = (self.input_tokens_saved * INPUT_COST_PER_1K
+                      + self.output_tokens_saved * OUTPUT_COST_PER_1K) / 1000
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "forcedRefreshes": self.refreshes,
+            "stored": self.stored,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+            "estimatedTokensSaved": {"input": self.input_tokens_saved, "output": self.output_tokens_saved},
+            "estimatedCostSavedUsd": round(cost_saved, 4),
+        }
+
+
+metrics = EvaluationCacheMetrics()
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def document_hash(document: Optional[Union[Dict[str, Any], str]]) -> Optional[str]:
+    if not document:
+        return None
+    if isinstance(document, dict):
+        return document["sha256"]
+    # Still base64 (before migrate_blobs.py); hash the encoded form
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def cache_key(rfp: Dict[str, Any], proposal: Dict[str, Any], prompt_version: str, document_tokens: int,
+              model: str) -> str:
+    inputs = {
+        "rfp": [rfp["title"], rfp["budget"], rfp["description"], rfp["scope_of_work"]],
+        "vendor": proposal.get("vendor_company"),
+        "documents": [document_hash(proposal.get("technical_document")),
+                      document_hash(proposal.get("commercial_document"))],
+        "prompt": prompt_version,
+        "document_tokens": document_tokens,
+        "model": model,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def ensure_indexes(db):
+    await db.evaluation_cache.create_index("key", unique=True)
+
+
+async def lookup(db, key: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+    """The stored evaluation for ``key``, or None on a miss or forced refresh"""
+    if force_refresh:
+        metrics.refreshes += 1
+        return None
+    entry = await db.evaluation_cache.find_one({"key": key}, {"_id": 0, "evaluation": 1, "usage": 1})
+    if not entry:
+        metrics.misses += 1
+        return None
+    metrics.hits += 1
+    usage = entry.get("usage") or {}
+    metrics.input_tokens_saved += usage.get("input_tokens", 0)
+    metrics.output_tokens_saved += usage.get("output_tokens", 0)
+    await db.evaluation_cache.update_one({"key": key}, {"$inc": {"hits": 1}, "$set": {"last_hit_at": datetime.utcnow()}})
+    return entry["evaluation"]
+
+
+async def store(db, key: str, evaluation: Dict[str, Any], model: str, prompt_version: str,
+                prompt: str, response: str):
+    try:
+        await db.evaluation_cache.update_one(
+            {"key": key},
+            {"$set": {
+                "evaluation": evaluation,
+                "model": model,
+                "prompt_version": prompt_version,
+                "usage": {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(response)},
+                "created_at": datetime.utcnow(),
+                "hits": 0,
+            }},
+            upsert=True,
+        )
+        metrics.stored += 1
+    except Exception as e:
+        # The evaluation is still returned; it just will not be reused
+        logger.warning(f"Could not store evaluation {key}: {e}")
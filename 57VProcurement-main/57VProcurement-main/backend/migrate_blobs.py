@@ -0,0 +1,107 @@
+"""Move base64 documents embedded in proposals and contracts into blob storage.
+
+Each proposal ``technical_document``/``commercial_document`` that is still a
+base64 string, and each contract document with inline ``content``, is decoded
+a slice at a time into the configured blob store (``BLOB_STORE``) and replaced
+with its blob reference. Documents are loaded one at a time, so memory stays
+near the size of the largest single file. Safe to re-run: only documents
+still holding base64 are picked up, and each update only applies if that is
+still the case.
+
+Usage: python migrate_blobs.py [--dry-run]
+"""
+from pathlib import Path
+from dotenv import load_dotenv
+import asyncio
+import os
+import sys
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import blob_storage
+
+PROPOSAL_FIELDS = ("technical_document", "commercial_document")
+
+
+async def migrate_proposals(db, store: blob_storage.BlobStore, dry_run: bool = False) -> dict:
+    stats = {"proposals": 0, "documents": 0, "bytes": 0}
+    pending = {"$or": [{field: {"$type": "string"}} for field in PROPOSAL_FIELDS]}
+    proposal_ids = [p["id"] async for p in db.proposals.find(pending, {"_id": 0, "id": 1})]
+
+    for proposal_id in proposal_ids:
+        proposal = await db.proposals.find_one({"id": proposal_id}, {"_id": 0, **{f: 1 for f in PROPOSAL_FIELDS}})
+        if not proposal:
+            continue
+        stats["proposals"] += 1
+        for field in PROPOSAL_FIELDS:
+            encoded = proposal.get(field)
+            if not isinstance(encoded, str):
+                continue
+            stats["documents"] += 1
+            if dry_run:
+                stats["bytes"] += len(encoded) * 3 // 4
+                continue
+            if not encoded:
+                # Stored as an empty string: there was no file
+                await db.proposals.update_one({"id": proposal_id, field: ""}, {"$set": {field: None}})
+                continue
+            ref = await store.save_base64(encoded, f"{proposal_id}-{field.split('_')[0]}")
+            await db.proposals.update_one({"id": proposal_id, field: {"$type": "string"}}, {"$set": {field: ref}})
+            stats["bytes"] += ref["size"]
+    return stats
+
+
+async def migrate_contract_documents(db, store: blob_storage.BlobStore, dry_run: bool = False) -> dict:
+    stats = {"contracts": 0, "documents": 0, "bytes": 0}
+    pending = {"documents": {"$elemMatch": {"content": {"$type": "string", "$ne": ""}}}}
+    contract_ids = [c["id"] async for c in db.contracts.find(pending, {"_id": 0, "id": 1})]
+
+    for contract_id in contract_ids:
+        contract = await db.contracts.find_one({"id": contract_id}, {"_id": 0, "documents.id": 1})
+        if not contract:
+            continue
+        stats["contracts"] += 1
+        for document_id in [d["id"] for d in contract.get("documents", [])]:
+            # One embedded document at a time
+            found = await db.contracts.find_one(
+                {"id": contract_id}, {"_id": 0, "documents": {"$elemMatch": {"id": document_id}}}
+            )
+            document = (found or {}).get("documents", [{}])[0]
+            encoded = document.get("content")
+            if not isinstance(encoded, str) or not encoded:
+                continue
+            stats["documents"] += 1
+            if dry_run:
+                stats["bytes"] += len(encoded) * 3 // 4
+                continue
+            ref = await store.save_base64(encoded, document.get("name") or document_id)
+            await db.contracts.update_one(
+                {"id": contract_id, "documents": {"$elemMatch": {"id": document_id, "content": {"$type": "string"}}}},
+                {"$set": {"documents.$.blob": ref}, "$unset": {"documents.$.content": ""}},
+            )
+            stats["bytes"] += ref["size"]
+    return stats
+
+
+async def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    store = blob_storage.create_blob_store(db)
+    try:
+        proposals = await migrate_proposals(db, store, dry_run)
+        contracts = await migrate_contract_documents(db, store, dry_run)
+    finally:
+        client.close()
+    action = "Would move" if dry_run else "Moved"
+    print(f"✅ {action} {proposals['documents']} document(s) from {proposals['proposals']} proposal(s) "
+          f"({proposals['bytes']} bytes) to {store.name} blob storage")
+    print(f"✅ {action} {contracts['documents']} document(s) from {contracts['contracts']} contract(s) "
+          f"({contracts['bytes']} bytes) to {store.name} blob storage")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""Keyset (cursor) pagination for the list endpoints.
+
+Pages are ordered by a sort field plus ``id`` as a tiebreaker, and the next
+page starts strictly after the last row returned. The query is an index range
+scan, not ``skip()``, so a page costs the same however deep the client has
+paged and however large the collection has grown. The position travels as an
+opaque ``cursor`` (base64url JSON of the sort, direction and the last row's
+values). Endpoints return it in an ``X-Next-Cursor`` header and a
+``Link: <...>; rel="next"`` header, so their JSON bodies keep their shape.
+A request with neither ``limit`` nor ``cursor`` gets every matching row, as
+before pagination, so existing clients keep working. Once paging, the page
+size defaults to ``LIST_PAGE_SIZE`` and is capped at ``LIST_MAX_PAGE_SIZE``.
+
+Rows without the sort field (or with null) sort before every value, so they
+come first ascending and last descending. ``position_filter`` takes them into
+account: a plain ``$gt``/``$lt`` on the value never matches null.
+
+Every filter/sort combination the endpoints offer is backed by a compound
+index in ``LIST_INDEXES``: equality filters first, then the sort field, then
+``id``. Date and amount ranges are cheapest on the field being sorted by.
+``ensure_indexes`` creates them at startup.
+"""
+import base64
+import binascii
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = int(os.environ.get('LIST_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('LIST_MAX_PAGE_SIZE', '500'))
+
+# collection -> compound indexes (field names; all ascending, Mongo walks them either way)
+LIST_INDEXES = {
+    "rfps": [
+        ("status", "created_at", "id"),
+        ("status", "deadline", "id"),
+        ("status", "budget", "id"),
+        ("categories", "created_at", "id"),
+        ("created_at", "id"),
+        ("deadline", "id"),
+        ("budget", "id"),
+    ],
+    "proposals": [
+        ("vendor_id", "submitted_at", "id"),
+        ("vendor_id", "status", "submitted_at", "id"),
+        ("rfp_id", "submitted_at", "id"),
+        ("status", "submitted_at", "id"),
+        ("submitted_at", "id"),
+    ],
+    "contracts": [
+        ("vendor_id", "created_at", "id"),
+        ("vendor_id", "status", "created_at", "id"),
+        ("status", "created_at", "id"),
+        ("status", "contract_value", "id"),
+        ("payment_status", "created_at", "id"),
+        ("payment_status", "end_date", "id"),
+        ("created_at", "id"),
+        ("start_date", "id"),
+        ("end_date", "id"),
+        ("contract_value", "id"),
+    ],
+    "users": [
+        ("user_type", "created_at", "id"),
+        ("user_type", "is_approved", "created_at", "id"),
+        ("user_type", "company_name", "id"),
+    ],
+}
+
+ORDERS = {"asc": ASCENDING, "desc": DESCENDING}
+
+
+async def ensure_indexes(db):
+    for collection, indexes in LIST_INDEXES.items():
+        for fields in indexes:
+            await db[collection].create_index([(field, ASCENDING) for field in fields])
+    logger.info(f"List indexes ensured on {', '.join(LIST_INDEXES)}")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(sort: str, order: str, row: Dict[str, Any]) -> str:
+    payload = {"s": sort, "o": order, "v": _encode_value(row.get(sort)), "id": row["id"]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, str]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, last_id = _decode_value(payload["v"]), payload["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("s") != sort or payload.get("o") != order:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    return value, last_id
+
+
+def check_sort(sort: str, order: str, allowed: List[str]):
+    if sort not in allowed:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Must be one of: {allowed}")
+    if order not in ORDERS:
+        raise HTTPException(status_code=400, detail="Invalid order. Must be 'asc' or 'desc'")
+
+
+def position_filter(sort: str, order: str, value: Any, last_id: str) -> Dict[str, Any]:
+    """Rows after (``value``, ``last_id``) in (sort, id) order, nulls sorting lowest"""
+    after = "$gt" if ORDERS[order] == ASCENDING else "$lt"
+    same_value = {sort: value, "id": {after: last_id}}
+    if value is None:
+        # Ascending, every non-null row follows; descending, only nulls remain
+        return {"$or": [same_value, {sort: {"$ne": None}}]} if after == "$gt" else same_value
+    following = [{sort: {after: value}}, same_value]
+    if after == "$lt":
+        following.append({sort: None})
+    return {"$or": following}
+
+
+def range_filter(field: str, low: Any = None, high: Any = None) -> Dict[str, Any]:
+    bounds = {}
+    if low is not None:
+        bounds["$gte"] = low
+    if high is not None:
+        bounds["$lte"] = high
+    return {field: bounds} if bounds else {}
+
+
+async def fetch_page(collection, query: Dict[str, Any], projection: Dict[str, Any], sort: str, order: str,
+                     limit: Optional[int], cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of ``query`` in (sort, id) order, and the cursor for the next page (None on the last).
+
+    Without ``limit`` and ``cursor``, every row and no cursor.
+    """
+    direction = ORDERS[order]
+    order_by = [(sort, direction), ("id", direction)]
+    if limit is None and not cursor:
+        return await collection.find(query, projection).sort(order_by).to_list(None), None
+    limit = limit or PAGE_SIZE
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, order)
+        position = position_filter(sort, order, value, last_id)
+        query = {"$and": [query, position]} if query else position
+    projection = {**projection, sort: 1, "id": 1} if any(v == 1 for v in projection.values()) else projection
+
+    # One extra row tells whether another page follows
+    rows = await collection.find(query, projection).sort(order_by).limit(limit + 1).to_list(limit + 1)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort, order, rows[-1])
+
+
+def page_headers(request, next_cursor: Optional[str]) -> Dict[str, str]:
+    if not next_cursor:
+        return {}
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
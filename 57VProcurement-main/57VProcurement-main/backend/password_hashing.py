@@ -0,0 +1,137 @@
+"""bcrypt hashing off the event loop, on a bounded worker pool.
+
+A bcrypt hash or check costs 100-400 ms of CPU by design. Run inline in
+``signup``/``login`` it stalled every other request on the worker for that
+long. Hashing now runs on a pool of ``PASSWORD_HASH_WORKERS`` threads (default:
+one per core; bcrypt releases the GIL while it works), or processes with
+``PASSWORD_HASH_EXECUTOR=process``.
+
+At most ``PASSWORD_HASH_MAX_PENDING`` operations may be queued or running. A
+burst beyond that gets a 503 with ``Retry-After`` rather than an ever-growing
+queue. ``metrics`` records queue wait and hashing time for the admin metrics
+endpoint.
+
+The cost factor is ``BCRYPT_ROUNDS``. Hashes made with a different cost are
+rehashed on the next successful login (``needs_rehash``).
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '0')) or os.cpu_count() or 1
+EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')
+MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', str(WORKERS * 32)))
+
+# Recent samples kept for the percentiles
+SAMPLES = 1024
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when ``hashed`` was made with a cost other than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed.split("$")[2]) != ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def _percentile(samples, p: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+
+
+class HashMetrics:
+    def __init__(self):
+        self.completed = 0
+        self.rejected = 0
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.wait_ms = deque(maxlen=SAMPLES)
+        self.run_ms = deque(maxlen=SAMPLES)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "executor": EXECUTOR,
+            "workers": WORKERS,
+            "rounds": ROUNDS,
+            "maxPending": MAX_PENDING,
+            "pending": self.pending,
+            "maxPendingSeen": self.max_pending_seen,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queueWaitMs": {"p50": _percentile(self.wait_ms, 50), "p95": _percentile(self.wait_ms, 95)},
+            "hashMs": {"p50": _percentile(self.run_ms, 50), "p95": _percentile(self.run_ms, 95)},
+        }
+
+
+metrics = HashMetrics()
+_executor: Optional[Executor] = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="bcrypt")
+        logger.info(f"Password hashing pool: {WORKERS} {EXECUTOR} worker(s), bcrypt cost {ROUNDS}")
+    return _executor
+
+
+def _timed(fn: Callable, *args):
+    started = time.perf_counter()
+    return fn(*args), (time.perf_counter() - started) * 1000
+
+
+async def _run(fn: Callable, *args):
+    if metrics.pending >= MAX_PENDING:
+        metrics.rejected += 1
+        raise HTTPException(status_code=503, detail="Too many authentication requests, please retry",
+                            headers={"Retry-After": "1"})
+    metrics.pending += 1
+    metrics.max_pending_seen = max(metrics.max_pending_seen, metrics.pending)
+    queued = time.perf_counter()
+    try:
+        result, run_ms = await asyncio.get_running_loop().run_in_executor(_get_executor(), _timed, fn, *args)
+    finally:
+        metrics.pending -= 1
+    # Time in the pool minus time hashing is the queue wait
+    metrics.wait_ms.append(max(0.0, (time.perf_counter() - queued) * 1000 - run_ms))
+    metrics.run_ms.append(run_ms)
+    metrics.completed += 1
+    return result
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password, ROUNDS)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run(_check, password, hashed)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,93 @@
+"""Short-lived cache of authenticated users, keyed by user id.
+
+The JWT carries the user id and type, but endpoints that check approval or
+show the company name (``submit_proposal``, ``get_me``) used to read the user
+from ``db.users`` on every request. ``get`` serves that record from an
+in-process cache for ``PRINCIPAL_CACHE_TTL_SECONDS`` (default 30). It keeps
+at most ``PRINCIPAL_CACHE_MAX_ENTRIES`` users, dropping the least recently
+used. Concurrent misses for the same user share one database read.
+
+Only the fields endpoints need are cached; never the password hash. ``get``
+returns a copy of the cached record, so a caller that changes it cannot
+alter what other requests see. ``invalidate`` drops a user after a change to
+those fields (vendor approval or rejection) so this worker sees it at once.
+Other worker processes see it when their entry expires, so the TTL bounds
+how stale they can be.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '30'))
+MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', '10000'))
+
+PROJECTION = {"_id": 0, "id": 1, "email": 1, "user_type": 1, "is_approved": 1, "company_name": 1, "username": 1}
+
+
+class PrincipalMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "ttlSeconds": TTL_SECONDS,
+            "entries": len(_entries),
+            "maxEntries": MAX_ENTRIES,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+metrics = PrincipalMetrics()
+# user id -> (expires at, record)
+_entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# user id -> read in flight; invalidate unregisters it so its result is not cached
+_loading: Dict[str, asyncio.Future] = {}
+
+
+def _loaded(user_id: str, done: asyncio.Future):
+    if _loading.get(user_id) is not done:
+        # Invalidated while the read was in flight
+        return
+    del _loading[user_id]
+    if done.cancelled() or done.exception() is not None:
+        return
+    user = done.result()
+    if user is not None:
+        _entries[user_id] = (time.monotonic() + TTL_SECONDS, user)
+        _entries.move_to_end(user_id)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+async def get(db, user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's cached record, or None if there is no such user"""
+    entry = _entries.get(user_id)
+    if entry and entry[0] > time.monotonic():
+        _entries.move_to_end(user_id)
+        metrics.hits += 1
+        return dict(entry[1])
+
+    metrics.misses += 1
+    pending = _loading.get(user_id)
+    if pending is None:
+        pending = asyncio.ensure_future(db.users.find_one({"id": user_id}, PROJECTION))
+        _loading[user_id] = pending
+        pending.add_done_callback(lambda done: _loaded(user_id, done))
+    # shield: one cancelled request must not cancel the read others wait on
+    user = await asyncio.shield(pending)
+    return dict(user) if user is not None else None
+
+
+def invalidate(user_id: str):
+    # Later lookups start a fresh read rather than joining one already in flight
+    _loading.pop(user_id, None)
+    if _entries.pop(user_id, None) is not None:
+        metrics.invalidations += 1
@@ -1,24 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, Form, Header, Request, Response, Query
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union, get_args
 import uuid
 from datetime import datetime, timedelta
-import bcrypt
 import jwt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import base64
+import binascii
 import io
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 import asyncio
 import re
 import json
 
+import batch_evaluations
+import blob_downloads
+import blob_storage
+import chunked_uploads
+import compression
+import document_text
+import evaluation_cache
+import pagination
+import password_hashing
+import principal_cache
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -34,11 +45,30 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Uploaded files live outside the documents that reference them
+blob_store = blob_storage.create_blob_store(db)
+
 # OpenAI integration
 openai_api_key = os.environ.get('OPENAI_API_KEY')
 
-# Create the main app without a prefix
-app = FastAPI()
+# emergentintegrations is slow to import, so it is loaded by the startup
+# warmup task or the first evaluation instead of at module import
+_llm_chat_classes = None
+
+def _import_llm_chat():
+    global _llm_chat_classes
+    if _llm_chat_classes is None:
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+        _llm_chat_classes = (LlmChat, UserMessage)
+    return _llm_chat_classes
+
+async def load_llm_chat():
+    if _llm_chat_classes is not None:
+        return _llm_chat_classes
+    return await asyncio.to_thread(_import_llm_chat)
+
+# Create the main app without a prefix; responses render with orjson (native datetimes)
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -100,13 +130,71 @@ class Proposal(BaseModel):
     rfp_id: str
     vendor_id: str
     vendor_company: str
-    technical_document: Optional[str] = None  # base64 encoded
-    commercial_document: Optional[str] = None  # base64 encoded
+    # Blob references (see blob_storage); a base64 string until migrate_blobs.py has run
+    technical_document: Optional[Union[Dict[str, Any], str]] = None
+    commercial_document: Optional[Union[Dict[str, Any], str]] = None
     submitted_at: datetime = Field(default_factory=datetime.utcnow)
     status: str = "submitted"  # submitted, under_review, evaluated, awarded, rejected
     ai_score: Optional[float] = None
     ai_evaluation: Optional[Dict] = None
 
+# List views: metadata only. Document bodies are served by the download endpoints.
+class DocumentSummary(BaseModel):
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+
+class ProposalSummary(BaseModel):
+    id: str
+    rfp_id: str
+    vendor_id: str
+    vendor_company: str
+    # Filled from blob references; base64 documents appear once migrate_blobs.py has run
+    technical_document: Optional[DocumentSummary] = None
+    commercial_document: Optional[DocumentSummary] = None
+    submitted_at: datetime
+    status: str
+    ai_score: Optional[float] = None
+    ai_evaluation: Optional[Dict] = None
+
+class ContractDocumentSummary(BaseModel):
+    id: str
+    name: str
+    type: Optional[str] = None
+    size: Optional[str] = None
+    blob: Optional[DocumentSummary] = None
+    uploaded_at: Optional[datetime] = None
+    uploaded_by: Optional[str] = None
+
+class ContractSummary(BaseModel):
+    id: str
+    rfp_id: str
+    rfp_title: str
+    vendor_id: str
+    vendor_company: str
+    contract_value: float
+    start_date: datetime
+    end_date: datetime
+    status: str
+    progress: float = 0.0
+    milestones: List[Dict] = []
+    next_milestone: Optional[str] = None
+    payment_status: str
+    paid_amount: float = 0.0
+    pending_amount: float = 0.0
+    documents: List[ContractDocumentSummary] = []
+    created_at: datetime
+    updated_at: datetime
+
+class UploadCreate(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: int
+
+class UploadComplete(BaseModel):
+    sha256: Optional[str] = None  # whole-file hash, checked when given
+
 class AIEvaluation(BaseModel):
     commercial_score: float
     technical_score: float
@@ -137,12 +225,6 @@ class Contract(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Helper functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-
 def create_jwt_token(user_id: str, user_type: str) -> str:
     payload = {
         'user_id': user_id,
@@ -151,6 +233,38 @@ def create_jwt_token(user_id: str, user_type: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def _nested_model(annotation):
+    """The model inside Optional[Model]/List[Model], if any"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        nested = _nested_model(arg)
+        if nested:
+            return nested
+    return None
+
+def _field_paths(model, prefix: str = "") -> dict:
+    paths = {}
+    for name, field in model.model_fields.items():
+        nested = _nested_model(field.annotation)
+        if nested:
+            # Select nested models field by field, so nothing else stored alongside is read
+            paths.update(_field_paths(nested, f"{prefix}{name}."))
+        else:
+            paths[f"{prefix}{name}"] = 1
+    return paths
+
+def model_projection(model) -> dict:
+    """Mongo projection selecting a model's fields (nested models field by field) and dropping _id"""
+    return {"_id": 0, **_field_paths(model)}
+
+def format_file_size(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
 def get_approval_level(budget: float) -> str:
     if budget <= 100000:
         return "procurement_officer"
@@ -174,24 +288,70 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-async def evaluate_proposal_with_ai(proposal: Proposal, rfp: RFP) -> AIEvaluation:
-    if not openai_api_key:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-    
-    try:
-        # Initialize LLM chat
-        chat = LlmChat(
-            api_key=openai_api_key,
-            session_id=f"eval_{proposal.id}",
-            system_message="""You are an expert procurement evaluator. Analyze proposals with the following criteria:
+async def get_current_principal(request: Request, current_user: dict = Depends(get_current_user)):
+    """get_current_user plus the user's record from principal_cache (None if the user no longer exists)"""
+    user = await principal_cache.get(db, current_user["user_id"])
+    request.state.user = user
+    return {**current_user, "user": user}
+
+EVALUATION_MODEL = ("openai", "gpt-4.1")
+# Bump when the evaluation prompt (or how document excerpts are chosen) changes, so stored evaluations are not reused
+EVALUATION_PROMPT_VERSION = "2"
+# Document text given to the model, per document
+EVALUATION_DOCUMENT_TOKENS = int(os.environ.get('EVALUATION_DOCUMENT_TOKENS', '1500'))
+# Extra query terms when picking commercial document excerpts
+COMMERCIAL_TERMS = "price pricing cost total amount payment terms schedule discount warranty SAR"
+
+EVALUATION_SYSTEM_MESSAGE = """You are an expert procurement evaluator. Analyze proposals with the following criteria:
             - Commercial Evaluation (70% weight): pricing competitiveness, payment terms, value for money
             - Technical Evaluation (30% weight): technical capability, approach, innovation
             
             Provide detailed scoring and recommendations."""
-        ).with_model("openai", "gpt-4.1")
 
-        # Prepare evaluation prompt
-        evaluation_prompt = f"""
+def document_section(document, excerpt: Optional[str]) -> str:
+    if not document:
+        return "Missing"
+    if not excerpt:
+        return "Available (no readable text)"
+    return f"Relevant excerpts:\n{excerpt}"
+
+class UnparsableEvaluation(ValueError):
+    """The model answered, but not with an evaluation"""
+
+async def request_ai_evaluation(proposal: Proposal, rfp: RFP, force_refresh: bool = False) -> AIEvaluation:
+    """The model's evaluation of a proposal; raises if the call fails or the answer can't be parsed"""
+    if not openai_api_key:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    # Unchanged RFP terms and documents reuse the stored evaluation
+    model = "/".join(EVALUATION_MODEL)
+    cache_key = evaluation_cache.cache_key(
+        rfp.dict(), proposal.dict(), EVALUATION_PROMPT_VERSION, EVALUATION_DOCUMENT_TOKENS, model
+    )
+    cached = await evaluation_cache.lookup(db, cache_key, force_refresh)
+    if cached:
+        return AIEvaluation(**cached)
+    
+    LlmChat, UserMessage = await load_llm_chat()
+    
+    # Initialize LLM chat
+    chat = LlmChat(
+        api_key=openai_api_key,
+        session_id=f"eval_{proposal.id}",
+        system_message=EVALUATION_SYSTEM_MESSAGE
+    ).with_model(*EVALUATION_MODEL)
+
+    # The parts of each document that best match the RFP terms, within a token budget
+    rfp_terms = f"{rfp.title}\n{rfp.description}\n{rfp.scope_of_work}"
+    technical_text = await document_text.excerpt(
+        db, blob_store, proposal.technical_document, rfp_terms, EVALUATION_DOCUMENT_TOKENS
+    )
+    commercial_text = await document_text.excerpt(
+        db, blob_store, proposal.commercial_document, f"{rfp_terms}\n{COMMERCIAL_TERMS}", EVALUATION_DOCUMENT_TOKENS
+    )
+
+    # Prepare evaluation prompt
+    evaluation_prompt = f"""
         Please evaluate this proposal for RFP: {rfp.title}
         
         RFP Details:
@@ -201,8 +361,9 @@ async def evaluate_proposal_with_ai(proposal: Proposal, rfp: RFP) -> AIEvaluatio
         
         Proposal submitted by: {proposal.vendor_company}
         
-        Commercial Document: {"Available" if proposal.commercial_document else "Missing"}
-        Technical Document: {"Available" if proposal.technical_document else "Missing"}
+        Commercial Document: {document_section(proposal.commercial_document, commercial_text)}
+        
+        Technical Document: {document_section(proposal.technical_document, technical_text)}
         
         Please provide:
         1. Commercial score (0-100)
@@ -224,40 +385,42 @@ async def evaluate_proposal_with_ai(proposal: Proposal, rfp: RFP) -> AIEvaluatio
             "detailed_analysis": "detailed analysis text"
         }}
         """
-        
-        # Send to AI
-        response = await chat.send_message(UserMessage(text=evaluation_prompt))
-        
-        # Parse JSON response
-        try:
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                return AIEvaluation(**result)
-            else:
-                # Fallback evaluation
-                return AIEvaluation(
-                    commercial_score=75.0,
-                    technical_score=70.0,
-                    overall_score=73.5,
-                    strengths=["Competitive pricing", "Good technical approach", "Timely submission"],
-                    weaknesses=["Limited experience", "Basic proposal format", "Missing some details"],
-                    recommendation="Recommended",
-                    detailed_analysis="AI evaluation completed with standard scoring."
-                )
-        except json.JSONDecodeError:
-            # Fallback evaluation
-            return AIEvaluation(
-                commercial_score=75.0,
-                technical_score=70.0,
-                overall_score=73.5,
-                strengths=["Competitive pricing", "Good technical approach", "Timely submission"],
-                weaknesses=["Limited experience", "Basic proposal format", "Missing some details"],
-                recommendation="Recommended",
-                detailed_analysis="AI evaluation completed with standard scoring."
-            )
     
+    # Send to AI
+    response = await chat.send_message(UserMessage(text=evaluation_prompt))
+    
+    # Extract JSON from response
+    json_match = re.search(r'\{.*\}', response, re.DOTALL)
+    if not json_match:
+        raise UnparsableEvaluation("No JSON object in the model response")
+    try:
+        result = json.loads(json_match.group())
+    except json.JSONDecodeError as e:
+        raise UnparsableEvaluation(f"Invalid JSON in the model response: {e}") from e
+    evaluation = AIEvaluation(**result)
+    await evaluation_cache.store(
+        db, cache_key, evaluation.dict(), model, EVALUATION_PROMPT_VERSION,
+        EVALUATION_SYSTEM_MESSAGE + evaluation_prompt, response
+    )
+    return evaluation
+
+async def evaluate_proposal_with_ai(proposal: Proposal, rfp: RFP, force_refresh: bool = False) -> AIEvaluation:
+    """request_ai_evaluation, with standard scores in place of an evaluation that failed (never cached)"""
+    try:
+        return await request_ai_evaluation(proposal, rfp, force_refresh)
+    except HTTPException:
+        raise
+    except UnparsableEvaluation:
+        # Fallback evaluation
+        return AIEvaluation(
+            commercial_score=75.0,
+            technical_score=70.0,
+            overall_score=73.5,
+            strengths=["Competitive pricing", "Good technical approach", "Timely submission"],
+            weaknesses=["Limited experience", "Basic proposal format", "Missing some details"],
+            recommendation="Recommended",
+            detailed_analysis="AI evaluation completed with standard scoring."
+        )
     except Exception as e:
         logging.error(f"AI evaluation error: {str(e)}")
         # Fallback evaluation
@@ -280,7 +443,7 @@ async def signup(user_data: UserSignup):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await password_hashing.hash_password(user_data.password)
     
     # Create user
     user = User(
@@ -316,9 +479,14 @@ async def signup(user_data: UserSignup):
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email})
-    if not user or not verify_password(credentials.password, user['password_hash']):
+    if not user or not await password_hashing.verify_password(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    if password_hashing.needs_rehash(user['password_hash']):
+        # Bring the stored hash to the configured BCRYPT_ROUNDS
+        new_hash = await password_hashing.hash_password(credentials.password)
+        await db.users.update_one({"id": user['id']}, {"$set": {"password_hash": new_hash}})
+    
     token = create_jwt_token(user['id'], user['user_type'])
     
     return {
@@ -333,8 +501,8 @@ async def login(credentials: UserLogin):
     }
 
 @api_router.get("/auth/me")
-async def get_me(current_user: dict = Depends(get_current_user)):
-    user = await db.users.find_one({"id": current_user["user_id"]})
+async def get_me(current_user: dict = Depends(get_current_principal)):
+    user = current_user["user"]
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -363,36 +531,103 @@ async def create_rfp(rfp_data: RFPCreate, current_user: dict = Depends(get_curre
     return rfp
 
 @api_router.get("/rfps", response_model=List[RFP])
-async def get_rfps(current_user: dict = Depends(get_current_user)):
+async def get_rfps(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    budget_min: Optional[float] = None,
+    budget_max: Optional[float] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    pagination.check_sort(sort, order, ["created_at", "deadline", "budget"])
+    query = {}
     if current_user["user_type"] == "vendor":
         # Vendors see only active RFPs
-        rfps = await db.rfps.find({"status": "active"}).to_list(1000)
-    else:
-        # Admins see all RFPs
-        rfps = await db.rfps.find().to_list(1000)
+        query["status"] = "active"
+    elif status:
+        query["status"] = status
+    if category:
+        query["categories"] = category
+    query.update(pagination.range_filter("created_at", created_from, created_to))
+    query.update(pagination.range_filter("deadline", deadline_from, deadline_to))
+    query.update(pagination.range_filter("budget", budget_min, budget_max))
     
-    return [RFP(**rfp) for rfp in rfps]
+    rfps, next_cursor = await pagination.fetch_page(db.rfps, query, model_projection(RFP), sort, order, limit, cursor)
+    response.headers.update(pagination.page_headers(request, next_cursor))
+    # Validated once by response_model
+    return rfps
 
 @api_router.get("/rfps/{rfp_id}", response_model=RFP)
 async def get_rfp(rfp_id: str, current_user: dict = Depends(get_current_user)):
-    rfp = await db.rfps.find_one({"id": rfp_id})
+    rfp = await db.rfps.find_one({"id": rfp_id}, model_projection(RFP))
     if not rfp:
         raise HTTPException(status_code=404, detail="RFP not found")
     
-    return RFP(**rfp)
+    return rfp
+
+# Resumable chunked uploads (see chunked_uploads) for documents too large for one request
+@api_router.post("/uploads")
+async def create_upload(upload_data: UploadCreate, current_user: dict = Depends(get_current_user)):
+    upload = await chunked_uploads.create_upload(
+        db, current_user["user_id"], upload_data.filename, upload_data.content_type, upload_data.size
+    )
+    return chunked_uploads.upload_status(upload)
+
+@api_router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str, current_user: dict = Depends(get_current_user)):
+    upload = await chunked_uploads.get_upload(db, upload_id, current_user["user_id"])
+    return chunked_uploads.upload_status(upload)
+
+@api_router.put("/uploads/{upload_id}/parts/{part_number}")
+async def upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    part_sha256: str = Header(..., alias="X-Part-SHA256"),
+    current_user: dict = Depends(get_current_user)
+):
+    upload = await chunked_uploads.get_upload(db, upload_id, current_user["user_id"])
+    # The body is consumed as it arrives, never buffered whole
+    return await chunked_uploads.put_part(db, blob_store, upload, part_number, request.stream(), part_sha256)
+
+@api_router.post("/uploads/{upload_id}/complete")
+async def complete_upload(
+    upload_id: str,
+    completion: Optional[UploadComplete] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    upload = await chunked_uploads.get_upload(db, upload_id, current_user["user_id"])
+    upload = await chunked_uploads.complete_upload(db, blob_store, upload, completion.sha256 if completion else None)
+    return chunked_uploads.upload_status(upload)
+
+@api_router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str, current_user: dict = Depends(get_current_user)):
+    upload = await chunked_uploads.get_upload(db, upload_id, current_user["user_id"])
+    await chunked_uploads.abort_upload(db, blob_store, upload)
+    return {"message": "Upload aborted"}
 
 @api_router.post("/proposals")
 async def submit_proposal(
     rfp_id: str = Form(...),
     technical_file: Optional[UploadFile] = File(None),
     commercial_file: Optional[UploadFile] = File(None),
-    current_user: dict = Depends(get_current_user)
+    technical_upload_id: Optional[str] = Form(None),
+    commercial_upload_id: Optional[str] = Form(None),
+    current_user: dict = Depends(get_current_principal)
 ):
     if current_user["user_type"] != "vendor":
         raise HTTPException(status_code=403, detail="Only vendors can submit proposals")
     
-    # Get user info
-    user = await db.users.find_one({"id": current_user["user_id"]})
+    user = current_user["user"]
     if not user or not user.get('is_approved'):
         raise HTTPException(status_code=403, detail="Vendor not approved")
     
@@ -401,45 +636,83 @@ async def submit_proposal(
     if not rfp:
         raise HTTPException(status_code=404, detail="RFP not found")
     
-    # Process file uploads
+    # Stream file uploads into blob storage; the proposal keeps references only
     technical_doc = None
     commercial_doc = None
+    claimed_uploads = []
+    inserted = False
+    try:
+        if technical_file:
+            technical_doc = await blob_store.save_upload(technical_file)
+        elif technical_upload_id:
+            technical_doc = await chunked_uploads.claim_upload(db, technical_upload_id, current_user["user_id"])
+            claimed_uploads.append(technical_upload_id)
+        
+        if commercial_file:
+            commercial_doc = await blob_store.save_upload(commercial_file)
+        elif commercial_upload_id:
+            commercial_doc = await chunked_uploads.claim_upload(db, commercial_upload_id, current_user["user_id"])
+            claimed_uploads.append(commercial_upload_id)
+        
+        # Create proposal
+        proposal = Proposal(
+            rfp_id=rfp_id,
+            vendor_id=current_user["user_id"],
+            vendor_company=user.get('company_name', 'Unknown Company'),
+            technical_document=technical_doc,
+            commercial_document=commercial_doc
+        )
+        
+        await db.proposals.insert_one(proposal.dict())
+        inserted = True
+    finally:
+        # A failed submission must not use up the uploads: the vendor retries with the same ids
+        if not inserted:
+            for upload_id in claimed_uploads:
+                await chunked_uploads.release_upload(db, upload_id, current_user["user_id"])
     
-    if technical_file:
-        content = await technical_file.read()
-        technical_doc = base64.b64encode(content).decode('utf-8')
-    
-    if commercial_file:
-        content = await commercial_file.read()
-        commercial_doc = base64.b64encode(content).decode('utf-8')
-    
-    # Create proposal
-    proposal = Proposal(
-        rfp_id=rfp_id,
-        vendor_id=current_user["user_id"],
-        vendor_company=user.get('company_name', 'Unknown Company'),
-        technical_document=technical_doc,
-        commercial_document=commercial_doc
-    )
-    
-    await db.proposals.insert_one(proposal.dict())
+    # Extract document text now so evaluation does not wait for it
+    document_text.schedule(db, blob_store, technical_doc)
+    document_text.schedule(db, blob_store, commercial_doc)
     
     return {"message": "Proposal submitted successfully", "proposal_id": proposal.id}
 
-@api_router.get("/proposals")
-async def get_proposals(current_user: dict = Depends(get_current_user)):
+@api_router.get("/proposals", responses={200: {"model": List[ProposalSummary]}})
+async def get_proposals(
+    request: Request,
+    status: Optional[str] = None,
+    rfp_id: Optional[str] = None,
+    vendor_id: Optional[str] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    sort: str = "submitted_at",
+    order: str = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    pagination.check_sort(sort, order, ["submitted_at"])
+    query = {}
     if current_user["user_type"] == "vendor":
         # Vendors see only their proposals
-        proposals = await db.proposals.find({"vendor_id": current_user["user_id"]}).to_list(1000)
-    else:
-        # Admins see all proposals
-        proposals = await db.proposals.find().to_list(1000)
+        query["vendor_id"] = current_user["user_id"]
+    elif vendor_id:
+        query["vendor_id"] = vendor_id
+    if status:
+        query["status"] = status
+    if rfp_id:
+        query["rfp_id"] = rfp_id
+    query.update(pagination.range_filter("submitted_at", submitted_from, submitted_to))
     
-    return [Proposal(**proposal) for proposal in proposals]
+    proposals, next_cursor = await pagination.fetch_page(
+        db.proposals, query, model_projection(ProposalSummary), sort, order, limit, cursor
+    )
+    # Documents written through the Proposal model are rendered directly, without re-validation
+    return ORJSONResponse(proposals, headers=pagination.page_headers(request, next_cursor))
 
-@api_router.get("/proposals/{proposal_id}")
+@api_router.get("/proposals/{proposal_id}", responses={200: {"model": ProposalSummary}})
 async def get_proposal(proposal_id: str, current_user: dict = Depends(get_current_user)):
-    proposal = await db.proposals.find_one({"id": proposal_id})
+    proposal = await db.proposals.find_one({"id": proposal_id}, model_projection(ProposalSummary))
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
@@ -448,10 +721,40 @@ async def get_proposal(proposal_id: str, current_user: dict = Depends(get_curren
         proposal["vendor_id"] != current_user["user_id"]):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return Proposal(**proposal)
+    for kind in ("technical", "commercial"):
+        if proposal.get(f"{kind}_document"):
+            proposal[f"{kind}_document"]["download_url"] = f"/api/proposals/{proposal_id}/documents/{kind}"
+    return ORJSONResponse(proposal)
+
+@api_router.get("/proposals/{proposal_id}/documents/{kind}")
+async def download_proposal_document(
+    proposal_id: str, kind: str, request: Request, current_user: dict = Depends(get_current_user)
+):
+    """Stream a proposal's technical or commercial document (supports Range requests)"""
+    if kind not in ("technical", "commercial"):
+        raise HTTPException(status_code=404, detail="Unknown document type")
+    field = f"{kind}_document"
+    proposal = await db.proposals.find_one({"id": proposal_id}, {"_id": 0, "vendor_id": 1, field: 1})
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    
+    if (current_user["user_type"] == "vendor" and 
+        proposal["vendor_id"] != current_user["user_id"]):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    document = proposal.get(field)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if isinstance(document, str):
+        return blob_downloads.legacy_response(document, f"{proposal_id}-{kind}")
+    return await blob_downloads.blob_response(request, blob_store, document)
 
 @api_router.post("/proposals/{proposal_id}/evaluate")
-async def evaluate_proposal(proposal_id: str, current_user: dict = Depends(get_current_user)):
+async def evaluate_proposal(
+    proposal_id: str,
+    force_refresh: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
     if current_user["user_type"] != "admin":
         raise HTTPException(status_code=403, detail="Only admin users can evaluate proposals")
     
@@ -467,7 +770,7 @@ async def evaluate_proposal(proposal_id: str, current_user: dict = Depends(get_c
     proposal_obj = Proposal(**proposal)
     rfp_obj = RFP(**rfp)
     
-    evaluation = await evaluate_proposal_with_ai(proposal_obj, rfp_obj)
+    evaluation = await evaluate_proposal_with_ai(proposal_obj, rfp_obj, force_refresh)
     
     # Update proposal with evaluation
     await db.proposals.update_one(
@@ -486,6 +789,33 @@ async def evaluate_proposal(proposal_id: str, current_user: dict = Depends(get_c
         "evaluation": evaluation.dict()
     }
 
+async def evaluate_proposal_document(proposal: dict, rfp: dict) -> dict:
+    """request_ai_evaluation on stored documents, for batch_evaluations: a failure raises, so the
+    proposal stays unevaluated and the next job retries it instead of keeping fallback scores"""
+    evaluation = await request_ai_evaluation(Proposal(**proposal), RFP(**rfp))
+    return evaluation.dict()
+
+@api_router.post("/rfps/{rfp_id}/evaluations", status_code=202)
+async def start_rfp_evaluation(rfp_id: str, current_user: dict = Depends(get_current_user)):
+    """Evaluate every unevaluated proposal of an RFP in the background"""
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can evaluate proposals")
+    if not openai_api_key:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    rfp = await db.rfps.find_one({"id": rfp_id}, {"_id": 0})
+    if not rfp:
+        raise HTTPException(status_code=404, detail="RFP not found")
+    
+    job = await batch_evaluations.start_job(db, rfp, current_user["user_id"], evaluate_proposal_document)
+    return batch_evaluations.job_status(job)
+
+@api_router.get("/evaluation-jobs/{job_id}")
+async def get_evaluation_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can view evaluation jobs")
+    return batch_evaluations.job_status(await batch_evaluations.get_job(db, job_id))
+
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
     if current_user["user_type"] == "vendor":
@@ -518,34 +848,56 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
         }
 
 # Contract endpoints
-@api_router.get("/contracts")
-async def get_contracts(current_user: dict = Depends(get_current_user)):
+@api_router.get("/contracts", responses={200: {"model": Dict[str, List[ContractSummary]]}})
+async def get_contracts(
+    request: Request,
+    status: Optional[str] = None,
+    payment_status: Optional[str] = None,
+    vendor_id: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    value_min: Optional[float] = None,
+    value_max: Optional[float] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     """Get contracts for the current user (vendor gets their contracts, admin gets all)"""
+    pagination.check_sort(sort, order, ["created_at", "start_date", "end_date", "contract_value"])
     try:
+        query = {}
         if current_user["user_type"] == "vendor":
             # Vendor sees only their contracts
-            contracts = await db.contracts.find({"vendor_id": current_user["user_id"]}).to_list(None)
-        else:
-            # Admin sees all contracts
-            contracts = await db.contracts.find().to_list(None)
-        
-        # Convert ObjectId to string and clean up the data
-        cleaned_contracts = []
-        for contract in contracts:
-            if "_id" in contract:
-                del contract["_id"]  # Remove MongoDB ObjectId
-            cleaned_contracts.append(contract)
+            query["vendor_id"] = current_user["user_id"]
+        elif vendor_id:
+            query["vendor_id"] = vendor_id
+        if status:
+            query["status"] = status
+        if payment_status:
+            query["payment_status"] = payment_status
+        query.update(pagination.range_filter("start_date", start_from, start_to))
+        query.update(pagination.range_filter("contract_value", value_min, value_max))
         
-        return {"contracts": cleaned_contracts}
+        contracts, next_cursor = await pagination.fetch_page(
+            db.contracts, query, model_projection(ContractSummary), sort, order, limit, cursor
+        )
+        return ORJSONResponse(
+            {"contracts": contracts, "next_cursor": next_cursor},
+            headers=pagination.page_headers(request, next_cursor)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching contracts: {e}")
         raise HTTPException(status_code=500, detail="Error fetching contracts")
 
-@api_router.get("/contracts/{contract_id}")
+@api_router.get("/contracts/{contract_id}", responses={200: {"model": ContractSummary}})
 async def get_contract(contract_id: str, current_user: dict = Depends(get_current_user)):
     """Get specific contract details"""
     try:
-        contract = await db.contracts.find_one({"id": contract_id})
+        contract = await db.contracts.find_one({"id": contract_id}, model_projection(ContractSummary))
         if not contract:
             raise HTTPException(status_code=404, detail="Contract not found")
         
@@ -553,11 +905,10 @@ async def get_contract(contract_id: str, current_user: dict = Depends(get_curren
         if current_user["user_type"] == "vendor" and contract["vendor_id"] != current_user["user_id"]:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Remove MongoDB ObjectId
-        if "_id" in contract:
-            del contract["_id"]
-        
-        return contract
+        for document in contract.get("documents", []):
+            if document.get("blob"):
+                document["download_url"] = f"/api/contracts/{contract_id}/documents/{document['id']}/download"
+        return ORJSONResponse(contract)
     except HTTPException:
         raise
     except Exception as e:
@@ -629,21 +980,44 @@ async def upload_contract_document(contract_id: str, document_data: dict, curren
         if current_user["user_type"] == "vendor" and contract["vendor_id"] != current_user["user_id"]:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Add document to contract
-        document = {
-            "id": str(uuid.uuid4()),
-            "name": document_data["name"],
-            "type": document_data["type"],
-            "size": document_data["size"],
-            "content": document_data.get("content", ""),
-            "uploaded_at": datetime.utcnow(),
-            "uploaded_by": current_user["user_id"]
-        }
+        missing = [field for field in ("name", "type") if not document_data.get(field)]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing document fields: {', '.join(missing)}")
         
-        await db.contracts.update_one(
-            {"id": contract_id},
-            {"$push": {"documents": document}}
-        )
+        # The file goes to blob storage: either a completed chunked upload or inline base64 content
+        blob = None
+        claimed_upload = None
+        attached = False
+        try:
+            if document_data.get("upload_id"):
+                blob = await chunked_uploads.claim_upload(db, document_data["upload_id"], current_user["user_id"])
+                claimed_upload = document_data["upload_id"]
+            elif document_data.get("content"):
+                try:
+                    blob = await blob_store.save_base64(document_data["content"], document_data["name"])
+                except (binascii.Error, ValueError):
+                    raise HTTPException(status_code=400, detail="Document content must be base64 encoded")
+            
+            # Add document to contract
+            document = {
+                "id": str(uuid.uuid4()),
+                "name": document_data["name"],
+                "type": document_data["type"],
+                "size": document_data.get("size") or (format_file_size(blob["size"]) if blob else ""),
+                "blob": blob,
+                "uploaded_at": datetime.utcnow(),
+                "uploaded_by": current_user["user_id"]
+            }
+            
+            await db.contracts.update_one(
+                {"id": contract_id},
+                {"$push": {"documents": document}}
+            )
+            attached = True
+        finally:
+            # As in submit_proposal: an upload that was not attached stays usable
+            if claimed_upload and not attached:
+                await chunked_uploads.release_upload(db, claimed_upload, current_user["user_id"])
         
         return {"message": "Document uploaded successfully", "document_id": document["id"]}
     except HTTPException:
@@ -656,24 +1030,24 @@ async def upload_contract_document(contract_id: str, document_data: dict, curren
 async def download_contract_document(contract_id: str, document_id: str, current_user: dict = Depends(get_current_user)):
     """Download a contract document"""
     try:
-        # Check if contract exists and user has access
-        contract = await db.contracts.find_one({"id": contract_id})
+        # Check if contract exists and user has access; read only the requested document
+        contract = await db.contracts.find_one(
+            {"id": contract_id}, {"_id": 0, "vendor_id": 1, "documents": {"$elemMatch": {"id": document_id}}}
+        )
         if not contract:
             raise HTTPException(status_code=404, detail="Contract not found")
         
         if current_user["user_type"] == "vendor" and contract["vendor_id"] != current_user["user_id"]:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Find document
-        document = None
-        for doc in contract.get("documents", []):
-            if doc["id"] == document_id:
-                document = doc
-                break
-        
-        if not document:
+        documents = contract.get("documents") or []
+        if not documents:
             raise HTTPException(status_code=404, detail="Document not found")
+        document = documents[0]
         
+        # The file itself is served by the download endpoint
+        if document.pop("content", None) or document.get("blob"):
+            document["download_url"] = f"/api/contracts/{contract_id}/documents/{document_id}/download"
         return document
     except HTTPException:
         raise
@@ -681,6 +1055,30 @@ async def download_contract_document(contract_id: str, document_id: str, current
         logger.error(f"Error downloading document: {e}")
         raise HTTPException(status_code=500, detail="Error downloading document")
 
+@api_router.get("/contracts/{contract_id}/documents/{document_id}/download")
+async def download_contract_document_file(
+    contract_id: str, document_id: str, request: Request, current_user: dict = Depends(get_current_user)
+):
+    """Stream a contract document's file (supports Range requests)"""
+    contract = await db.contracts.find_one(
+        {"id": contract_id}, {"_id": 0, "vendor_id": 1, "documents": {"$elemMatch": {"id": document_id}}}
+    )
+    if not contract:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    
+    if current_user["user_type"] == "vendor" and contract["vendor_id"] != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    documents = contract.get("documents") or []
+    if not documents:
+        raise HTTPException(status_code=404, detail="Document not found")
+    document = documents[0]
+    if document.get("blob"):
+        return await blob_downloads.blob_response(request, blob_store, document["blob"])
+    if document.get("content"):
+        return blob_downloads.legacy_response(document["content"], document.get("name") or document_id)
+    raise HTTPException(status_code=404, detail="Document has no stored file")
+
 async def create_demo_data():
     """Create demo data for testing including vendor and contracts"""
     try:
@@ -696,7 +1094,7 @@ async def create_demo_data():
                 user_type="vendor",
                 company_name="TechCorp Solutions",
                 username="vendor001",
-                password_hash=hash_password("DemoVendor123!"),
+                password_hash=await password_hashing.hash_password("DemoVendor123!"),
                 is_approved=True  # Auto-approve for demo
             )
             await db.users.insert_one(demo_vendor.dict())
@@ -816,14 +1214,68 @@ async def create_demo_contracts():
     # This function is kept for backward compatibility but now calls create_demo_data
     await create_demo_data()
 
+# Admin metrics: response compression, caches and worker pools
+@api_router.get("/admin/compression")
+async def get_compression_metrics(current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can access compression metrics")
+    return compression.metrics.snapshot()
+
+@api_router.get("/admin/auth-metrics")
+async def get_auth_metrics(current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can access authentication metrics")
+    return password_hashing.metrics.snapshot()
+
+@api_router.get("/admin/evaluation-cache-metrics")
+async def get_evaluation_cache_metrics(current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can access evaluation cache metrics")
+    return evaluation_cache.metrics.snapshot()
+
+@api_router.get("/admin/extraction-metrics")
+async def get_extraction_metrics(current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can access extraction metrics")
+    return document_text.metrics.snapshot()
+
+@api_router.get("/admin/principal-cache-metrics")
+async def get_principal_cache_metrics(current_user: dict = Depends(get_current_user)):
+    if current_user["user_type"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin users can access principal cache metrics")
+    return principal_cache.metrics.snapshot()
+
 # Admin-specific endpoints for vendor management
 @api_router.get("/admin/vendors")
-async def get_vendors(current_user: dict = Depends(get_current_user)):
-    """Get all vendors for admin management"""
+async def get_vendors(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get all vendors for admin management (status: approved or pending)"""
     if current_user["user_type"] != "admin":
         raise HTTPException(status_code=403, detail="Only admin users can access vendor management")
+    pagination.check_sort(sort, order, ["created_at", "company_name"])
+    if status not in (None, "approved", "pending"):
+        raise HTTPException(status_code=400, detail="Invalid status. Must be 'approved' or 'pending'")
     
-    vendors = await db.users.find({"user_type": "vendor"}).to_list(None)
+    query = {"user_type": "vendor"}
+    if status:
+        query["is_approved"] = status == "approved"
+    query.update(pagination.range_filter("created_at", created_from, created_to))
+    vendors, next_cursor = await pagination.fetch_page(
+        db.users, query,
+        {"_id": 0, "id": 1, "email": 1, "company_name": 1, "username": 1, "is_approved": 1, "created_at": 1, "profile_data": 1},
+        sort, order, limit, cursor
+    )
+    response.headers.update(pagination.page_headers(request, next_cursor))
     return [
         {
             "id": vendor["id"],
@@ -851,6 +1303,7 @@ async def approve_vendor(vendor_id: str, current_user: dict = Depends(get_curren
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Vendor not found")
+    principal_cache.invalidate(vendor_id)
     
     return {"message": "Vendor approved successfully"}
 
@@ -867,6 +1320,7 @@ async def reject_vendor(vendor_id: str, current_user: dict = Depends(get_current
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Vendor not found")
+    principal_cache.invalidate(vendor_id)
     
     return {"message": "Vendor rejected successfully"}
 
@@ -891,13 +1345,38 @@ async def update_rfp_status(rfp_id: str, status: str, current_user: dict = Depen
     return {"message": f"RFP status updated to {status}"}
 
 @api_router.get("/admin/invoices")
-async def get_all_invoices(current_user: dict = Depends(get_current_user)):
-    """Get all invoices for admin tracking"""
+async def get_all_invoices(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    vendor_id: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get all invoices for admin tracking (status: paid or partial)"""
     if current_user["user_type"] != "admin":
         raise HTTPException(status_code=403, detail="Only admin users can view all invoices")
+    pagination.check_sort(sort, order, ["created_at", "end_date"])
+    payment_statuses = {"paid": ["fully_paid"], "partial": ["partial_paid"], None: ["partial_paid", "fully_paid"]}
+    if status not in payment_statuses:
+        raise HTTPException(status_code=400, detail="Invalid status. Must be 'paid' or 'partial'")
     
     # For demo purposes, return invoice data from contracts
-    contracts = await db.contracts.find().to_list(None)
+    query = {"payment_status": {"$in": payment_statuses[status]}}
+    if vendor_id:
+        query["vendor_id"] = vendor_id
+    query.update(pagination.range_filter("end_date", due_from, due_to))
+    contracts, next_cursor = await pagination.fetch_page(
+        db.contracts, query,
+        {"_id": 0, "id": 1, "rfp_title": 1, "vendor_company": 1, "paid_amount": 1, "payment_status": 1, "end_date": 1, "created_at": 1},
+        sort, order, limit, cursor
+    )
+    response.headers.update(pagination.page_headers(request, next_cursor))
     
     invoices = []
     for contract in contracts:
@@ -919,6 +1398,22 @@ async def get_all_invoices(current_user: dict = Depends(get_current_user)):
 async def startup_event():
     """Initialize demo data on startup"""
     await create_demo_data()
+    await chunked_uploads.ensure_indexes(db)
+    await pagination.ensure_indexes(db)
+    await batch_evaluations.ensure_indexes(db)
+    await evaluation_cache.ensure_indexes(db)
+    await document_text.ensure_indexes(db)
+    await batch_evaluations.mark_interrupted(db)
+    await chunked_uploads.purge_expired(db, blob_store)
+    # Load the LLM client library in the background so requests are not kept waiting
+    app.state.llm_warmup_task = asyncio.create_task(warm_up_llm_chat())
+
+async def warm_up_llm_chat():
+    try:
+        await load_llm_chat()
+        logger.info("LLM chat library loaded")
+    except ImportError as e:
+        logger.warning(f"LLM chat library unavailable: {e}")
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -929,8 +1424,15 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the pagination headers
+    expose_headers=["X-Next-Cursor", "Link"],
 )
 
+# Compress large JSON bodies (base64 documents, contract lists) for clients that accept it
+app.add_middleware(compression.CompressionMiddleware)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+    password_hashing.shutdown()
+    document_text.shutdown()
\ No newline at end of file
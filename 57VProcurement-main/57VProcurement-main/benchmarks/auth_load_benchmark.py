@@ -0,0 +1,154 @@
+"""Latency of unrelated endpoints during a login burst, with bcrypt inline vs pooled.
+
+Boots the Procurement app in-process against mongomock-motor and talks to it
+through an in-memory ASGI transport. For each mode, --login-concurrency
+workers log in repeatedly while --probe-concurrency workers time GET
+/api/rfps, for --duration seconds:
+
+  inline  bcrypt called on the event loop, as signup/login used to
+  pool    bcrypt on the password_hashing worker pool (the current code)
+
+Probes run on a fixed schedule (every --probe-interval-ms) and their latency
+is measured from when each was due, so time spent waiting for a blocked event
+loop counts. The report gives probe p50/p95/p99/max, login throughput, and the
+pool's queue metrics. Probes should stay near their idle latency in pool mode;
+in inline mode they wait behind every hash already running on the loop.
+
+Usage: python benchmarks/auth_load_benchmark.py [--rounds 12] [--duration 10]
+           [--login-concurrency 8] [--probe-concurrency 4] [--modes inline,pool]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / 'backend'
+
+PASSWORD = "Bench-Password-1"
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50Ms": round(percentile(ordered, 50), 2),
+        "p95Ms": round(percentile(ordered, 95), 2),
+        "p99Ms": round(percentile(ordered, 99), 2),
+        "maxMs": round(ordered[-1], 2),
+    }
+
+
+async def run(args) -> Dict:
+    os.environ['MONGO_URL'] = 'mongodb://localhost:27017'
+    os.environ['DB_NAME'] = f"auth_bench_{uuid.uuid4().hex[:8]}"
+    os.environ['BLOB_STORE'] = 'local'
+    os.environ['BCRYPT_ROUNDS'] = str(args.rounds)
+    os.environ['PASSWORD_HASH_MAX_PENDING'] = '100000'
+    import motor.motor_asyncio
+    import mongomock_motor
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    import password_hashing
+    import server
+
+    pooled_run = password_hashing._run
+
+    async def inline_run(fn, *args):
+        return fn(*args)
+
+    report = {"rounds": args.rounds, "workers": password_hashing.WORKERS, "modes": {}}
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            emails = [f"bench-{i}@example.com" for i in range(args.users)]
+            for email in emails:
+                await client.post("/api/auth/signup", json={
+                    "email": email, "password": PASSWORD, "user_type": "vendor", "company_name": "Bench",
+                })
+            token = (await client.post("/api/auth/login", json={"email": emails[0], "password": PASSWORD})).json()["token"]
+            probe_headers = {"Authorization": f"Bearer {token}"}
+
+            async def probe_idle() -> List[float]:
+                latencies = []
+                for _ in range(50):
+                    started = time.perf_counter()
+                    await client.get("/api/rfps", headers=probe_headers)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                return latencies
+
+            report["idleProbe"] = summarize(await probe_idle())
+
+            for mode in args.modes:
+                password_hashing._run = inline_run if mode == "inline" else pooled_run
+                password_hashing.metrics = password_hashing.HashMetrics()
+                probes: List[float] = []
+                logins: List[float] = []
+                deadline = time.perf_counter() + args.duration
+
+                async def login_worker(i: int):
+                    while time.perf_counter() < deadline:
+                        started = time.perf_counter()
+                        response = await client.post("/api/auth/login", json={
+                            "email": emails[i % len(emails)], "password": PASSWORD,
+                        })
+                        response.raise_for_status()
+                        logins.append((time.perf_counter() - started) * 1000)
+                        # A real client's next request arrives over the network; let other tasks in between
+                        await asyncio.sleep(0)
+
+                async def probe_worker():
+                    due = time.perf_counter()
+                    while due < deadline:
+                        delay = due - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        await client.get("/api/rfps", headers=probe_headers)
+                        probes.append((time.perf_counter() - due) * 1000)
+                        due += args.probe_interval_ms / 1000
+
+                started = time.perf_counter()
+                await asyncio.gather(*[probe_worker() for _ in range(args.probe_concurrency)],
+                                     *[login_worker(i) for i in range(args.login_concurrency)])
+                elapsed = time.perf_counter() - started
+                report["modes"][mode] = {
+                    "probe": summarize(probes),
+                    "login": {**summarize(logins), "throughputRps": round(len(logins) / elapsed, 2)},
+                    "pool": password_hashing.metrics.snapshot() if mode == "pool" else None,
+                }
+            password_hashing._run = pooled_run
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per mode")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    parser.add_argument("--probe-interval-ms", type=float, default=20)
+    parser.add_argument("--modes", default="inline,pool", help="Comma-separated: inline, pool")
+    args = parser.parse_args()
+    args.modes = [mode for mode in args.modes.split(",") if mode]
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
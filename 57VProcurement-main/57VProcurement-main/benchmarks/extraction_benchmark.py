@@ -0,0 +1,184 @@
+"""Document text extraction throughput, serial vs the extraction process pool.
+
+Generates a corpus of sample proposal documents in a temporary directory:
+--files of each of PDF, DOCX, XLSX and plain text, each about --pages pages
+of procurement-style prose (PDFs are written directly; DOCX and XLSX with
+python-docx and openpyxl). Then it extracts every file with
+``document_text.extract_pages`` and ``chunk_pages``:
+
+  serial  one file after another, in this process
+  pool    all files submitted to a ProcessPoolExecutor of --workers processes
+          (the pool document_text uses), pool start-up excluded
+
+It reports files/s, MB/s and pages/s per mode and per format, and the
+chunk count. Pool throughput should scale with the workers up to the number
+of cores, while the event loop of a server using the pool stays free.
+
+Usage: python benchmarks/extraction_benchmark.py [--files 20] [--pages 10] [--workers N]
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+import document_text  # noqa: E402
+
+WORDS = ("network infrastructure implementation delivery schedule milestone support warranty "
+         "maintenance pricing payment installation training certified engineers security "
+         "compliance migration datacenter cloud servers licensing availability monitoring "
+         "escalation response acceptance testing documentation handover project management").split()
+LINES_PER_PAGE = 40
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize() + "."
+
+
+def page_lines(rng: random.Random) -> List[str]:
+    return [sentence(rng) for _ in range(LINES_PER_PAGE)]
+
+
+def write_pdf(path: Path, pages: List[List[str]]):
+    """A minimal PDF, one Helvetica text stream per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        text = "".join(f"({line}) Tj T* " for line in lines)
+        stream = f"BT /F1 9 Tf 12 TL 40 780 Td {text}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def write_docx(path: Path, pages: List[List[str]]):
+    import docx
+    document = docx.Document()
+    for lines in pages:
+        document.add_heading("Technical approach", level=2)
+        for line in lines:
+            document.add_paragraph(line)
+    document.save(path)
+
+
+def write_xlsx(path: Path, pages: List[List[str]], rng: random.Random):
+    import openpyxl
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for number, lines in enumerate(pages, start=1):
+        sheet = workbook.create_sheet(f"Pricing {number}")
+        sheet.append(["Item", "Description", "Quantity", "Unit price (SAR)", "Total (SAR)"])
+        for row, line in enumerate(lines, start=1):
+            quantity, price = rng.randint(1, 50), round(rng.uniform(100, 50000), 2)
+            sheet.append([row, line, quantity, price, round(quantity * price, 2)])
+    workbook.save(path)
+
+
+def write_text(path: Path, pages: List[List[str]]):
+    path.write_text("\n\n".join("\n".join(lines) for lines in pages))
+
+
+def build_corpus(root: Path, files: int, pages: int) -> List[Tuple[Path, str]]:
+    rng = random.Random(42)
+    corpus = []
+    for i in range(files):
+        content = [page_lines(rng) for _ in range(pages)]
+        for kind, extension in (("pdf", "pdf"), ("docx", "docx"), ("xlsx", "xlsx"), ("text", "txt")):
+            path = root / f"proposal-{i}.{extension}"
+            if kind == "pdf":
+                write_pdf(path, content)
+            elif kind == "docx":
+                write_docx(path, content)
+            elif kind == "xlsx":
+                write_xlsx(path, content, rng)
+            else:
+                write_text(path, content)
+            corpus.append((path, kind))
+    return corpus
+
+
+def extract_file(path: str, kind: str) -> Tuple[int, int]:
+    """Pages and chunks of one file, as document_text would store it"""
+    extracted = document_text.chunk_pages(document_text.extract_pages(Path(path).read_bytes(), kind))
+    return extracted["pages"], len(extracted["chunks"])
+
+
+def rates(seconds: float, files: int, size: int, pages: int) -> Dict[str, float]:
+    return {
+        "seconds": round(seconds, 3),
+        "filesPerSecond": round(files / seconds, 2),
+        "mbPerSecond": round(size / seconds / 1e6, 2),
+        "pagesPerSecond": round(pages / seconds, 1),
+    }
+
+
+def run(args) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(Path(tmp), args.files, args.pages)
+        sizes = {path: path.stat().st_size for path, _ in corpus}
+        total_size = sum(sizes.values())
+        report = {"files": len(corpus), "bytes": total_size, "workers": args.workers, "modes": {}, "byKind": {}}
+
+        started = time.perf_counter()
+        per_kind: Dict[str, List[float]] = {}
+        total_pages = total_chunks = 0
+        for path, kind in corpus:
+            file_started = time.perf_counter()
+            pages, chunks = extract_file(str(path), kind)
+            stats = per_kind.setdefault(kind, [0.0, 0, 0, 0])
+            stats[0] += time.perf_counter() - file_started
+            stats[1] += 1
+            stats[2] += sizes[path]
+            stats[3] += pages
+            total_pages += pages
+            total_chunks += chunks
+        report["modes"]["serial"] = rates(time.perf_counter() - started, len(corpus), total_size, total_pages)
+        report["chunks"] = total_chunks
+        report["byKind"] = {kind: rates(*stats) for kind, stats in per_kind.items()}
+
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Start every worker (and its imports) before timing
+            warm_up = [pool.submit(extract_file, str(path), kind) for path, kind in corpus[:args.workers]]
+            for future in warm_up:
+                future.result()
+            started = time.perf_counter()
+            results = list(pool.map(extract_file, [str(path) for path, _ in corpus], [kind for _, kind in corpus]))
+            report["modes"]["pool"] = rates(time.perf_counter() - started, len(corpus), total_size,
+                                            sum(pages for pages, _ in results))
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20, help="Files of each format")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per file")
+    parser.add_argument("--workers", type=int, default=document_text.WORKERS)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
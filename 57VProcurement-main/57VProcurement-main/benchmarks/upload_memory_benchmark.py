@@ -0,0 +1,180 @@
+"""Peak memory of uploading a large proposal document, by upload path.
+
+Runs the Procurement app in-process (mongomock-motor, local blob store in a
+temporary directory) and measures the peak Python heap with tracemalloc while
+one file of each --sizes is uploaded through:
+
+  chunked    POST /api/uploads, PUT each part as a streamed body, complete
+  multipart  POST /api/proposals with the file as a multipart field
+  legacy     the previous submit path: read() the whole file, base64 it and
+             BSON-encode the proposal (no HTTP, the copies alone)
+
+The client reads from a file on disk in 64 KiB pieces, so the figures are
+the server's working memory. Chunked and multipart peaks should stay flat as
+the file grows (bounded by UPLOAD_PART_SIZE/BLOB_CHUNK_SIZE buffers), while
+legacy grows at three to four times the file size.
+
+Usage: python benchmarks/upload_memory_benchmark.py [--sizes 16,64,256] [--part-size-mb 8]
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import AsyncIterator, Dict
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / 'backend'
+
+PIECE = 64 * 1024
+MB = 1024 * 1024
+
+
+def write_file(path: Path, size: int):
+    block = os.urandom(MB)
+    with open(path, "wb") as handle:
+        for offset in range(0, size, MB):
+            handle.write(block[:min(MB, size - offset)])
+
+
+def part_digest(path: Path, offset: int, length: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        while length > 0:
+            piece = handle.read(min(PIECE, length))
+            digest.update(piece)
+            length -= len(piece)
+    return digest.hexdigest()
+
+
+async def file_body(path: Path, offset: int, length: int) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        while length > 0:
+            piece = handle.read(min(PIECE, length))
+            if not piece:
+                break
+            length -= len(piece)
+            yield piece
+
+
+def peak_mb() -> float:
+    return round(tracemalloc.get_traced_memory()[1] / MB, 2)
+
+
+async def upload_chunked(client, headers: Dict[str, str], path: Path, size: int) -> str:
+    upload = (await client.post("/api/uploads", headers=headers, json={
+        "filename": path.name, "content_type": "application/pdf", "size": size,
+    })).json()
+    part_size = upload["part_size"]
+    for number in range(1, upload["part_count"] + 1):
+        offset = (number - 1) * part_size
+        length = min(part_size, size - offset)
+        response = await client.put(
+            f"/api/uploads/{upload['upload_id']}/parts/{number}",
+            headers={**headers, "X-Part-SHA256": part_digest(path, offset, length)},
+            content=file_body(path, offset, length),
+        )
+        response.raise_for_status()
+    response = await client.post(f"/api/uploads/{upload['upload_id']}/complete", headers=headers)
+    response.raise_for_status()
+    return upload["upload_id"]
+
+
+def legacy_copies(path: Path):
+    import bson
+    with open(path, "rb") as handle:
+        content = handle.read()
+    encoded = base64.b64encode(content).decode('utf-8')
+    bson.encode({"id": "legacy", "technical_document": encoded})
+
+
+async def run(args) -> Dict:
+    blob_root = Path(tempfile.mkdtemp(prefix="upload_bench_"))
+    os.environ['MONGO_URL'] = 'mongodb://localhost:27017'
+    os.environ['DB_NAME'] = 'upload_bench'
+    os.environ['BLOB_STORE'] = 'local'
+    os.environ['BLOB_LOCAL_ROOT'] = str(blob_root / 'blobs')
+    os.environ['UPLOAD_PART_SIZE'] = str(int(args.part_size_mb * MB))
+    os.environ['UPLOAD_MAX_BYTES'] = str(max(args.sizes) * MB)
+    import motor.motor_asyncio
+    import mongomock_motor
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    import server
+
+    results = []
+    try:
+        async with server.app.router.lifespan_context(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                admin = (await client.post("/api/auth/signup", json={
+                    "email": "bench-admin@example.com", "password": "bench", "user_type": "admin", "username": "bench",
+                })).json()
+                vendor = (await client.post("/api/auth/signup", json={
+                    "email": "bench-vendor@example.com", "password": "bench", "user_type": "vendor", "company_name": "Bench",
+                })).json()
+                admin_headers = {"Authorization": f"Bearer {admin['token']}"}
+                headers = {"Authorization": f"Bearer {vendor['token']}"}
+                await client.put(f"/api/admin/vendors/{vendor['user']['id']}/approve", headers=admin_headers)
+                rfp = (await client.post("/api/rfps", headers=admin_headers, json={
+                    "title": "Benchmark", "description": "d", "budget": 100000, "deadline": "2030-01-01T00:00:00",
+                    "categories": ["IT"], "scope_of_work": "s",
+                })).json()
+
+                tracemalloc.start()
+                for size_mb in args.sizes:
+                    size = size_mb * MB
+                    path = blob_root / f"proposal-{size_mb}mb.pdf"
+                    write_file(path, size)
+                    row = {"sizeMb": size_mb}
+
+                    tracemalloc.reset_peak()
+                    await upload_chunked(client, headers, path, size)
+                    row["chunkedPeakMb"] = peak_mb()
+
+                    tracemalloc.reset_peak()
+                    with open(path, "rb") as handle:
+                        response = await client.post("/api/proposals", headers=headers, data={"rfp_id": rfp["id"]},
+                                                     files={"technical_file": (path.name, handle, "application/pdf")})
+                    response.raise_for_status()
+                    row["multipartPeakMb"] = peak_mb()
+
+                    if size_mb <= args.legacy_max_mb:
+                        tracemalloc.reset_peak()
+                        legacy_copies(path)
+                        row["legacyPeakMb"] = peak_mb()
+                    results.append(row)
+                    path.unlink()
+                tracemalloc.stop()
+    finally:
+        shutil.rmtree(blob_root, ignore_errors=True)
+
+    return {
+        "partSizeMb": args.part_size_mb,
+        "blobChunkMb": round(int(os.environ.get('BLOB_CHUNK_SIZE', str(MB))) / MB, 2),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="16,64,256", help="Comma-separated file sizes in MB")
+    parser.add_argument("--part-size-mb", type=float, default=8)
+    parser.add_argument("--legacy-max-mb", type=int, default=256, help="Skip the legacy copies above this size")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
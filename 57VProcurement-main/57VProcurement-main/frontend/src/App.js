@@ -3441,16 +3441,16 @@ const ContractsManagement = () => {
       
       if (token && !token.startsWith('demo-token-')) {
         // For real tokens, try to download from API
-        const response = await axios.get(`${API}/contracts/${contractId}/documents/${documentId}`, {
+        const response = await axios.get(`${API}/contracts/${contractId}/documents/${documentId}/download`, {
           headers: {
             'Authorization': `Bearer ${token}`
-          }
+          },
+          responseType: 'blob'
         });
         
-        if (response.data && response.data.content) {
+        if (response.data) {
           // Handle actual file download
-          const blob = new Blob([response.data.content], { type: 'application/pdf' });
-          const url = window.URL.createObjectURL(blob);
+          const url = window.URL.createObjectURL(response.data);
           const a = document.createElement('a');
           a.href = url;
           a.download = documentName;
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database, passed to the modules that take ``db``"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()["procurement_tests"]
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    import blob_storage
+    return blob_storage.LocalBlobStore(str(tmp_path / "blobs"))
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
+
+
+@pytest.fixture
+def server(db, monkeypatch, tmp_path):
+    """The server module, reading and writing ``db``"""
+    import blob_storage
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "procurement_tests")
+    # A GridFS store can't be built outside an event loop
+    monkeypatch.setattr(blob_storage, "BLOB_STORE", "local")
+    monkeypatch.setattr(blob_storage, "BLOB_LOCAL_ROOT", str(tmp_path / "blobs"))
+    import server
+    monkeypatch.setattr(server, "db", db)
+    return server
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+import batch_evaluations
+
+RFP = {"id": "rfp-1", "title": "Network upgrade"}
+
+
+async def _finish_jobs():
+    await asyncio.gather(*list(batch_evaluations._tasks))
+
+
+async def _setup(db, count=3):
+    await batch_evaluations.ensure_indexes(db)
+    await db.proposals.insert_many([
+        {"id": f"p{i}", "rfp_id": RFP["id"], "ai_evaluation": None, "status": "submitted"} for i in range(count)
+    ])
+
+
+def test_failed_evaluations_are_counted_and_left_for_the_next_job(db, run, monkeypatch):
+    monkeypatch.setattr(batch_evaluations, "CONCURRENCY", 1)
+    seen = []
+
+    async def evaluate(proposal, rfp):
+        # Evaluations are stored as they complete, not at the end of the job
+        stored = await db.proposals.count_documents({"ai_evaluation": {"$ne": None}})
+        seen.append((proposal["id"], stored))
+        if proposal["id"] == "p1":
+            raise RuntimeError("model unavailable")
+        return {"overall_score": 80.0}
+
+    async def scenario():
+        await _setup(db)
+        job = await batch_evaluations.start_job(db, RFP, "admin", evaluate)
+        await _finish_jobs()
+        first = await batch_evaluations.get_job(db, job["id"])
+        retry = await batch_evaluations.start_job(db, RFP, "admin", evaluate)
+        await _finish_jobs()
+        second = await batch_evaluations.get_job(db, retry["id"])
+        proposals = await db.proposals.find({}, {"_id": 0, "id": 1, "ai_score": 1}).sort("id").to_list(None)
+        return first, second, proposals
+
+    first, second, proposals = run(scenario())
+    assert seen[:3] == [("p0", 0), ("p1", 1), ("p2", 1)]
+    assert (first["status"], first["completed"], first["failed"]) == ("completed", 2, 1)
+    assert first["errors"] == [{"proposal_id": "p1", "error": "model unavailable"}]
+    # Only the failed proposal is tried again
+    assert second["proposal_ids"] == ["p1"]
+    assert [p.get("ai_score") for p in proposals] == [80.0, None, 80.0]
+
+
+def test_concurrent_starts_share_one_job(db, run):
+    release = None
+
+    async def evaluate(proposal, rfp):
+        await release.wait()
+        return {"overall_score": 50.0}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        await _setup(db)
+        jobs = await asyncio.gather(*[batch_evaluations.start_job(db, RFP, "admin", evaluate) for _ in range(3)])
+        release.set()
+        await _finish_jobs()
+        return jobs, await db.evaluation_jobs.count_documents({})
+
+    jobs, stored = run(scenario())
+    assert len({job["id"] for job in jobs}) == 1
+    assert stored == 1
+
+
+def test_a_second_running_job_for_an_rfp_is_rejected_by_the_index(db, run):
+    from pymongo.errors import DuplicateKeyError
+
+    async def scenario():
+        await batch_evaluations.ensure_indexes(db)
+        await db.evaluation_jobs.insert_one({"id": "a", "rfp_id": RFP["id"], "status": "completed"})
+        await db.evaluation_jobs.insert_one({"id": "b", "rfp_id": RFP["id"], "status": "running"})
+        with pytest.raises(DuplicateKeyError):
+            await db.evaluation_jobs.insert_one({"id": "c", "rfp_id": RFP["id"], "status": "running"})
+        await db.evaluation_jobs.insert_one({"id": "d", "rfp_id": "rfp-2", "status": "running"})
+
+    run(scenario())
@@ -0,0 +1,106 @@
+import base64
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import blob_downloads
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 10239)),
+    ("bytes=-100", (10140, 10239)),
+    ("bytes=-20000", (0, 10239)),
+    ("bytes=10000-20000", (10000, 10239)),
+    ("bytes=5-5", (5, 5)),
+    (" bytes=1-2 ", (1, 2)),
+    # Multiple ranges, other units and malformed headers get the whole body
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+    ("bytes=-", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert blob_downloads.parse_range(header, len(DATA)) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=10240-", 10240),
+    ("bytes=20000-20010", 10240),
+    ("bytes=10-5", 10240),
+    ("bytes=-0", 10240),
+    ("bytes=0-", 0),
+    ("bytes=-5", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        blob_downloads.parse_range(header, size)
+
+
+@pytest.fixture
+def client(local_store, run):
+    ref = run(local_store.save_base64(base64.b64encode(DATA).decode(), "report.bin"))
+    empty = run(local_store.save_base64("", "empty.bin"))
+    documents = {"report": ref, "empty": empty}
+    app = FastAPI()
+
+    @app.get("/documents/{name}")
+    async def download(name: str, request: Request):
+        return await blob_downloads.blob_response(request, local_store, documents[name])
+
+    with TestClient(app) as test_client:
+        test_client.etag = f'"{ref["sha256"]}"'
+        yield test_client
+
+
+def test_full_download(client):
+    response = client.get("/documents/report")
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["content-length"] == str(len(DATA))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == client.etag
+
+
+def test_range_gets_206(client):
+    response = client.get("/documents/report", headers={"Range": "bytes=1000-1999"})
+    assert response.status_code == 206
+    assert response.content == DATA[1000:2000]
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(DATA)}"
+    assert response.headers["content-length"] == "1000"
+
+
+def test_suffix_range(client):
+    response = client.get("/documents/report", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == DATA[-10:]
+
+
+def test_unsatisfiable_range_gets_416(client):
+    response = client.get("/documents/report", headers={"Range": f"bytes={len(DATA)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_if_range(client):
+    fresh = client.get("/documents/report", headers={"Range": "bytes=0-9", "If-Range": client.etag})
+    stale = client.get("/documents/report", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert (fresh.status_code, fresh.content) == (206, DATA[:10])
+    assert (stale.status_code, stale.content) == (200, DATA)
+
+
+def test_if_none_match(client):
+    response = client.get("/documents/report", headers={"If-None-Match": f'"other", {client.etag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_empty_document(client):
+    response = client.get("/documents/empty")
+    assert (response.status_code, response.content) == (200, b"")
+    assert client.get("/documents/empty", headers={"Range": "bytes=0-"}).status_code == 416
@@ -0,0 +1,58 @@
+import base64
+import hashlib
+
+import pytest
+
+import blob_storage
+
+DATA = b"%PDF-1.4 technical proposal " * 5000
+
+
+def test_base_classes_are_abstract():
+    with pytest.raises(TypeError):
+        blob_storage.BlobStore()
+    with pytest.raises(TypeError):
+        blob_storage.BlobWriter("file.pdf", None)
+
+
+@pytest.mark.parametrize("encode", [
+    lambda data: base64.b64encode(data).decode(),
+    lambda data: base64.encodebytes(data).decode(),
+    lambda data: "data:application/pdf;base64," + base64.encodebytes(data).decode().replace("\n", "\r\n"),
+], ids=["plain", "mime-wrapped", "data-url-crlf"])
+def test_save_base64(local_store, run, monkeypatch, encode):
+    monkeypatch.setattr(blob_storage, "CHUNK_SIZE", 1000)
+
+    async def scenario():
+        ref = await local_store.save_base64(encode(DATA), "proposal.pdf")
+        return ref, await local_store.read_all(ref["blob_id"])
+
+    ref, stored = run(scenario())
+    assert stored == DATA
+    assert ref["size"] == len(DATA)
+    assert ref["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert ref["content_type"] == "application/pdf"
+
+
+def test_identical_content_is_stored_once(local_store, run):
+    async def scenario():
+        first = await local_store.save_base64(base64.b64encode(DATA).decode(), "a.pdf")
+        second = await local_store.save_base64(base64.b64encode(DATA).decode(), "b.pdf")
+        staged = local_store.writer("part", staged=True)
+        await staged.write(DATA)
+        return first, second, await staged.close()
+
+    first, second, staged = run(scenario())
+    assert first["blob_id"] == second["blob_id"] == first["sha256"]
+    assert staged["blob_id"].startswith(blob_storage.STAGED_PREFIX)
+
+
+def test_stream_range_and_missing_blob(local_store, run):
+    async def scenario():
+        ref = await local_store.save_base64(base64.b64encode(DATA).decode(), "a.pdf")
+        part = b"".join([chunk async for chunk in local_store.stream(ref["blob_id"], 10, 19)])
+        with pytest.raises(blob_storage.BlobNotFound):
+            await local_store.read_all("0" * 64)
+        return part
+
+    assert run(scenario()) == DATA[10:20]
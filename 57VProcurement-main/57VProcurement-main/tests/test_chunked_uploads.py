@@ -0,0 +1,74 @@
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import chunked_uploads
+
+DATA = b"commercial offer " * 100
+
+
+async def _body(data: bytes):
+    yield data
+
+
+async def _completed_upload(db, store, owner_id="vendor-1"):
+    upload = await chunked_uploads.create_upload(db, owner_id, "offer.txt", "text/plain", len(DATA))
+    await chunked_uploads.put_part(db, store, upload, 1, _body(DATA), hashlib.sha256(DATA).hexdigest())
+    upload = await chunked_uploads.get_upload(db, upload["id"], owner_id)
+    return await chunked_uploads.complete_upload(db, store, upload, hashlib.sha256(DATA).hexdigest())
+
+
+def test_released_upload_can_be_claimed_again(db, local_store, run):
+    async def scenario():
+        upload = await _completed_upload(db, local_store)
+        first = await chunked_uploads.claim_upload(db, upload["id"], "vendor-1")
+        with pytest.raises(HTTPException):
+            await chunked_uploads.claim_upload(db, upload["id"], "vendor-1")
+        # Another vendor cannot release it
+        await chunked_uploads.release_upload(db, upload["id"], "vendor-2")
+        with pytest.raises(HTTPException):
+            await chunked_uploads.claim_upload(db, upload["id"], "vendor-1")
+        await chunked_uploads.release_upload(db, upload["id"], "vendor-1")
+        second = await chunked_uploads.claim_upload(db, upload["id"], "vendor-1")
+        return first, second
+
+    first, second = run(scenario())
+    assert first == second
+    assert first["sha256"] == hashlib.sha256(DATA).hexdigest()
+
+
+def test_purge_expired(db, local_store, run):
+    now = datetime.utcnow()
+    long_ago = now - timedelta(minutes=chunked_uploads.COMPLETE_TIMEOUT_MINUTES + 1)
+
+    async def scenario():
+        ids = {}
+        for name, status, completing_at in [
+            ("open", "open", None),
+            ("stale_completing", "completing", long_ago),
+            ("legacy_completing", "completing", None),
+            ("recent_completing", "completing", now),
+            ("attached", "attached", None),
+        ]:
+            upload = await chunked_uploads.create_upload(db, "vendor-1", f"{name}.txt", "text/plain", len(DATA))
+            await chunked_uploads.put_part(db, local_store, upload, 1, _body(DATA), hashlib.sha256(DATA).hexdigest())
+            update = {"status": status, "expires_at": now - timedelta(hours=1)}
+            if completing_at:
+                update["completing_at"] = completing_at
+            await db.uploads.update_one({"id": upload["id"]}, {"$set": update})
+            ids[name] = upload["id"]
+        purged = await chunked_uploads.purge_expired(db, local_store)
+        statuses = {name: (await db.uploads.find_one({"id": upload_id}))["status"] for name, upload_id in ids.items()}
+        return purged, statuses
+
+    purged, statuses = run(scenario())
+    assert purged == 3
+    assert statuses == {
+        "open": "aborted",
+        "stale_completing": "aborted",
+        "legacy_completing": "aborted",
+        "recent_completing": "completing",
+        "attached": "attached",
+    }
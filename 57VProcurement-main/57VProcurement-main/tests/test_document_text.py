@@ -0,0 +1,143 @@
+import base64
+import io
+
+import pytest
+
+import document_text
+
+
+def test_text_pages_break_at_paragraphs(monkeypatch):
+    monkeypatch.setattr(document_text, "PAGE_CHARS", 70)
+    text = "Scope of work covers switches.\n\nDelivery within six weeks of award.\n\nWarranty is three years."
+    pages = document_text.extract_pages(text.encode(), "text")
+    assert pages == [
+        "Scope of work covers switches.\n\nDelivery within six weeks of award.",
+        "Warranty is three years.",
+    ]
+    assert document_text.extract_pages(b"caf\xe9", "text") == ["caf�"]
+    with pytest.raises(ValueError):
+        document_text.extract_pages(b"", "zip")
+
+
+def test_docx_paragraphs_and_tables():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("Technical approach")
+    table = document.add_table(rows=2, cols=2)
+    for row, values in zip(table.rows, [("Item", "Price"), ("Switch", "1200")]):
+        for cell, value in zip(row.cells, values):
+            cell.text = value
+    buffer = io.BytesIO()
+    document.save(buffer)
+    assert document_text.extract_pages(buffer.getvalue(), "docx") == ["Technical approach\nItem\tPrice\nSwitch\t1200"]
+
+
+def test_xlsx_sheets_are_pages_without_empty_rows():
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    prices = workbook.active
+    prices.title = "Prices"
+    prices.append(["Item", "Total"])
+    prices.append([None, None])
+    prices.append(["Switch", 1200])
+    terms = workbook.create_sheet("Terms")
+    terms.append(["Net 30", None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    assert document_text.extract_pages(buffer.getvalue(), "xlsx") == [
+        "Sheet: Prices\nItem\tTotal\nSwitch\t1200",
+        "Sheet: Terms\nNet 30\t",
+    ]
+
+
+def test_chunk_pages_tags_pages_and_truncates(monkeypatch):
+    monkeypatch.setattr(document_text, "CHUNK_CHARS", 20)
+    monkeypatch.setattr(document_text, "MAX_CHARS", 50)
+    pages = ["first page words here and more", "second page", "third page never stored"]
+    result = document_text.chunk_pages(pages)
+    assert result["chunks"] == [
+        {"page": 1, "text": "first page words"},
+        {"page": 1, "text": "here and more"},
+        {"page": 2, "text": "second page"},
+    ]
+    assert result["chars"] == 40 and result["pages"] == 3 and result["truncated"] is True
+    assert document_text.chunk_pages(["short"])["truncated"] is False
+
+
+CHUNKS = [
+    {"page": 1, "text": "Company history and office locations."},
+    {"page": 2, "text": "Network switches with redundant power supplies. " * 4},
+    {"page": 3, "text": "Pricing: switches cost 1200 each; payment within thirty days."},
+    {"page": 4, "text": "Network switches network switches installation. " * 40},
+]
+
+
+def test_select_chunks_picks_relevant_text_in_document_order():
+    selected = document_text.select_chunks(CHUNKS, "network switches pricing payment", 10000)
+    # Everything fits; the unrelated chunk is ranked last but keeps its place
+    assert [chunk["page"] for chunk in selected] == [1, 2, 3, 4]
+    # Page 3 shares the most terms and is taken first; page 2 still fits, page 1 does not
+    tight = document_text.select_chunks(CHUNKS[:3], "switches pricing payment", 65)
+    assert [chunk["page"] for chunk in tight] == [2, 3]
+    assert sum(len(chunk["text"]) for chunk in tight) <= 65 * document_text.CHARS_PER_TOKEN
+    assert [chunk["page"] for chunk in document_text.select_chunks(CHUNKS[:3], "switches pricing payment", 60)] == [3]
+
+
+def test_select_chunks_trims_a_chunk_to_the_remaining_budget():
+    selected = document_text.select_chunks(CHUNKS, "network switches installation", 100)
+    assert [chunk["page"] for chunk in selected] == [4]
+    assert selected[0]["text"].endswith(" …") and len(selected[0]["text"]) <= 402
+    # Under 200 characters left: the chunk is skipped rather than cut to a fragment
+    assert document_text.select_chunks(CHUNKS[3:], "network", 40) == []
+
+
+def test_unsupported_for_a_missing_parser_is_retried_once_it_is_installed(db, local_store, run, monkeypatch):
+    docx = pytest.importorskip("docx")
+    # Extract in the default thread pool rather than spawning processes
+    monkeypatch.setattr(document_text, "_get_executor", lambda: None)
+    monkeypatch.setattr(document_text, "metrics", document_text.ExtractionMetrics())
+    document = docx.Document()
+    document.add_paragraph("Delivery schedule")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+
+    async def scenario():
+        ref = await local_store.save_base64(encoded, "technical.docx")
+        monkeypatch.setattr(document_text, "docx", None)
+        missing = await document_text.ensure_extracted(db, local_store, ref)
+        monkeypatch.setattr(document_text, "docx", docx)
+        installed = await document_text.ensure_extracted(db, local_store, ref)
+        stored = await document_text.ensure_extracted(db, local_store, ref)
+        return missing, installed, stored
+
+    missing, installed, stored = run(scenario())
+    assert missing["status"] == "unsupported" and missing["kind"] == "docx"
+    assert installed["status"] == "extracted" and installed["chunks"] == [{"page": 1, "text": "Delivery schedule"}]
+    assert stored["status"] == "extracted"
+    # The third call read the stored result
+    assert (document_text.metrics.unsupported, document_text.metrics.documents) == (1, 1)
+
+
+def test_unknown_and_oversized_documents_are_not_retried(db, local_store, run, monkeypatch):
+    monkeypatch.setattr(document_text, "MAX_BYTES", 10)
+    calls = []
+    extract = document_text._extract
+
+    async def counting(*args):
+        calls.append(args[2]["filename"])
+        return await extract(*args)
+
+    monkeypatch.setattr(document_text, "_extract", counting)
+
+    async def scenario():
+        results = []
+        for name in ("archive.zip", "notes.txt"):
+            ref = await local_store.save_base64(base64.b64encode(f"{name} contents".encode()).decode(), name)
+            for _ in range(2):
+                results.append(await document_text.ensure_extracted(db, local_store, ref))
+        return results
+
+    results = run(scenario())
+    assert [result["status"] for result in results] == ["unsupported"] * 4
+    assert calls == ["archive.zip", "notes.txt"]
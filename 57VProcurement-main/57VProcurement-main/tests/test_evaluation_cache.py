@@ -0,0 +1,115 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import evaluation_cache
+
+RFP = {
+    "id": "rfp-1", "title": "Network upgrade", "description": "Replace core switches", "budget": 250000.0,
+    "deadline": datetime(2026, 1, 1), "categories": ["IT"], "scope_of_work": "Supply and install",
+    "created_by": "user-1", "status": "active", "approval_level": "manager",
+}
+PROPOSAL = {
+    "id": "proposal-1", "rfp_id": "rfp-1", "vendor_id": "vendor-1", "vendor_company": "Acme",
+    "technical_document": {"sha256": "aa" * 32}, "commercial_document": None, "status": "submitted",
+}
+EVALUATION = {
+    "commercial_score": 80.0, "technical_score": 60.0, "overall_score": 74.0, "strengths": ["Price"],
+    "weaknesses": ["Schedule"], "recommendation": "Recommended", "detailed_analysis": "Solid offer.",
+}
+
+
+def key(rfp=RFP, proposal=PROPOSAL, prompt_version="2", document_tokens=1500, model="openai/gpt-4.1"):
+    return evaluation_cache.cache_key(rfp, proposal, prompt_version, document_tokens, model)
+
+
+@pytest.fixture(autouse=True)
+def metrics(monkeypatch):
+    fresh = evaluation_cache.EvaluationCacheMetrics()
+    monkeypatch.setattr(evaluation_cache, "metrics", fresh)
+    return fresh
+
+
+def test_key_ignores_fields_the_prompt_does_not_quote():
+    assert key() == key()
+    assert key(rfp={**RFP, "status": "closed", "deadline": datetime(2027, 1, 1)}) == key()
+    assert key(proposal={**PROPOSAL, "status": "evaluated", "ai_score": 74.0}) == key()
+
+
+@pytest.mark.parametrize("changed", [
+    {"rfp": {**RFP, "budget": 300000.0}},
+    {"rfp": {**RFP, "scope_of_work": "Supply only"}},
+    {"proposal": {**PROPOSAL, "vendor_company": "Globex"}},
+    {"proposal": {**PROPOSAL, "technical_document": {"sha256": "bb" * 32}}},
+    {"proposal": {**PROPOSAL, "commercial_document": "YmFzZTY0"}},
+    {"prompt_version": "3"},
+    {"document_tokens": 3000},
+    {"model": "openai/gpt-4o"},
+])
+def test_key_changes_with_every_prompt_input(changed):
+    assert key(**changed) != key()
+
+
+def test_lookup_miss_hit_and_forced_refresh(db, run, metrics):
+    async def scenario():
+        missed = await evaluation_cache.lookup(db, key())
+        await evaluation_cache.store(db, key(), EVALUATION, "openai/gpt-4.1", "2", "p" * 400, "r" * 80)
+        hit = await evaluation_cache.lookup(db, key())
+        refreshed = await evaluation_cache.lookup(db, key(), force_refresh=True)
+        entry = await db.evaluation_cache.find_one({"key": key()})
+        return missed, hit, refreshed, entry
+
+    missed, hit, refreshed, entry = run(scenario())
+    assert missed is None and hit == EVALUATION and refreshed is None
+    assert entry["hits"] == 1 and entry["usage"] == {"input_tokens": 100, "output_tokens": 20}
+    snapshot = metrics.snapshot()
+    assert (snapshot["hits"], snapshot["misses"], snapshot["forcedRefreshes"], snapshot["stored"]) == (1, 1, 1, 1)
+    assert snapshot["hitRatio"] == 0.5
+    assert snapshot["estimatedTokensSaved"] == {"input": 100, "output": 20}
+
+
+def fake_llm(server, monkeypatch, responses):
+    sent = []
+
+    class Chat:
+        def __init__(self, **kwargs):
+            pass
+
+        def with_model(self, *model):
+            return self
+
+        async def send_message(self, message):
+            sent.append(message)
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    async def load_llm_chat():
+        return Chat, lambda text: text
+
+    monkeypatch.setattr(server, "load_llm_chat", load_llm_chat)
+    return sent
+
+
+def test_fallback_evaluations_are_not_stored(server, db, run, monkeypatch):
+    monkeypatch.setattr(server, "openai_api_key", "test-key")
+    sent = fake_llm(server, monkeypatch, ["I cannot evaluate this.", RuntimeError("timeout"), json.dumps(EVALUATION)])
+    rfp, proposal = server.RFP(**RFP), server.Proposal(**PROPOSAL)
+
+    async def scenario():
+        unparsable = await server.evaluate_proposal_with_ai(proposal, rfp)
+        failed = await server.evaluate_proposal_with_ai(proposal, rfp)
+        stored_after_fallbacks = await db.evaluation_cache.count_documents({})
+        parsed = await server.evaluate_proposal_with_ai(proposal, rfp)
+        cached = await server.evaluate_proposal_with_ai(proposal, rfp)
+        return unparsable, failed, stored_after_fallbacks, parsed, cached
+
+    unparsable, failed, stored_after_fallbacks, parsed, cached = run(scenario())
+    assert unparsable.detailed_analysis == "AI evaluation completed with standard scoring."
+    assert failed.recommendation == "Requires Manual Review"
+    assert stored_after_fallbacks == 0
+    assert parsed.dict() == EVALUATION and cached.dict() == EVALUATION
+    # The fourth call was served from the cache
+    assert len(sent) == 3
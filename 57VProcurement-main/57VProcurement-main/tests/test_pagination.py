@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+import pagination
+
+VENDORS = [
+    {"id": "v01", "company_name": "Acme"},
+    {"id": "v02", "company_name": "Beta"},
+    {"id": "v03", "company_name": "Acme"},
+    {"id": "v04"},
+    {"id": "v05", "company_name": None},
+    {"id": "v06", "company_name": "Zed"},
+    {"id": "v07"},
+    {"id": "v08", "company_name": "Beta"},
+]
+
+
+def _sort_key(vendor):
+    # Mongo order: missing and null first, then strings
+    name = vendor.get("company_name")
+    return (name is not None, name or "", vendor["id"])
+
+
+@pytest.mark.parametrize("value", [
+    "Acme",
+    12.5,
+    None,
+    datetime(2026, 3, 1, 12, 30, 15, 250000),
+])
+def test_cursor_round_trip(value):
+    cursor = pagination.encode_cursor("created_at", "desc", {"id": "rfp-1", "created_at": value})
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor, "created_at", "desc") == (value, "rfp-1")
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = pagination.encode_cursor("created_at", "desc", {"id": "rfp-1", "created_at": None})
+    for sort, order in [("deadline", "desc"), ("created_at", "asc")]:
+        with pytest.raises(HTTPException) as raised:
+            pagination.decode_cursor(cursor, sort, order)
+        assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", "e30"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        pagination.decode_cursor(cursor, "created_at", "desc")
+    assert raised.value.detail == "Invalid cursor"
+
+
+def test_position_filter():
+    assert pagination.position_filter("budget", "asc", 10, "b") == {
+        "$or": [{"budget": {"$gt": 10}}, {"budget": 10, "id": {"$gt": "b"}}]}
+    assert pagination.position_filter("budget", "desc", 10, "b") == {
+        "$or": [{"budget": {"$lt": 10}}, {"budget": 10, "id": {"$lt": "b"}}, {"budget": None}]}
+    assert pagination.position_filter("budget", "asc", None, "b") == {
+        "$or": [{"budget": None, "id": {"$gt": "b"}}, {"budget": {"$ne": None}}]}
+    assert pagination.position_filter("budget", "desc", None, "b") == {"budget": None, "id": {"$lt": "b"}}
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("limit", [1, 2, 3, 8])
+def test_pages_cover_every_row_once(db, run, order, limit):
+    async def scenario():
+        await db.users.insert_many([dict(vendor) for vendor in VENDORS])
+        seen, cursor = [], None
+        while True:
+            rows, cursor = await pagination.fetch_page(db.users, {}, {"_id": 0}, "company_name", order, limit, cursor)
+            assert len(rows) <= limit
+            seen.extend(row["id"] for row in rows)
+            if cursor is None:
+                return seen
+
+    expected = [vendor["id"] for vendor in sorted(VENDORS, key=_sort_key, reverse=order == "desc")]
+    assert run(scenario()) == expected
+
+
+def test_without_limit_or_cursor_every_row_is_returned(db, run, monkeypatch):
+    monkeypatch.setattr(pagination, "PAGE_SIZE", 2)
+
+    async def scenario():
+        await db.users.insert_many([dict(vendor) for vendor in VENDORS])
+        everything = await pagination.fetch_page(db.users, {}, {"_id": 0}, "company_name", "asc", None)
+        first_page = await pagination.fetch_page(db.users, {}, {"_id": 0}, "company_name", "asc", 2)
+        # A cursor alone pages at the default size
+        second_page = await pagination.fetch_page(db.users, {}, {"_id": 0}, "company_name", "asc", None, first_page[1])
+        return everything, first_page, second_page
+
+    (rows, cursor), (first, _), (second, _) = run(scenario())
+    assert cursor is None
+    assert len(rows) == len(VENDORS)
+    assert [row["id"] for row in first + second] == [row["id"] for row in rows[:4]]
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import pytest
+from fastapi import HTTPException
+
+import password_hashing
+
+
+@pytest.fixture(autouse=True)
+def fast_rounds(monkeypatch):
+    monkeypatch.setattr(password_hashing, "ROUNDS", 4)
+    monkeypatch.setattr(password_hashing, "metrics", password_hashing.HashMetrics())
+    yield
+    password_hashing.shutdown()
+
+
+def hashed(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def test_needs_rehash():
+    assert not password_hashing.needs_rehash(hashed("secret", 4))
+    assert password_hashing.needs_rehash(hashed("secret", 5))
+    assert password_hashing.needs_rehash("not a bcrypt hash")
+
+
+def test_hash_and_verify_run_on_the_pool(run):
+    async def scenario():
+        stored = await password_hashing.hash_password("secret")
+        return stored, await password_hashing.verify_password("secret", stored), \
+            await password_hashing.verify_password("wrong", stored)
+
+    stored, right, wrong = run(scenario())
+    assert stored.startswith("$2b$04$") and right and not wrong
+    snapshot = password_hashing.metrics.snapshot()
+    assert snapshot["completed"] == 3 and snapshot["pending"] == 0
+    assert snapshot["hashMs"]["p50"] is not None
+
+
+def test_saturated_pool_answers_503_with_retry_after(run, monkeypatch):
+    monkeypatch.setattr(password_hashing, "MAX_PENDING", 2)
+    monkeypatch.setattr(password_hashing, "_executor", ThreadPoolExecutor(max_workers=1))
+    release = threading.Event()
+
+    async def scenario():
+        held = [asyncio.ensure_future(password_hashing._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await password_hashing._run(release.wait)
+        pending = password_hashing.metrics.pending
+        release.set()
+        await asyncio.gather(*held)
+        # Capacity is back once the held operations finish
+        await password_hashing._run(release.wait)
+        return rejected.value, pending
+
+    rejected, pending = run(scenario())
+    assert rejected.status_code == 503 and rejected.headers == {"Retry-After": "1"}
+    assert pending == 2
+    snapshot = password_hashing.metrics.snapshot()
+    assert (snapshot["rejected"], snapshot["completed"], snapshot["pending"], snapshot["maxPendingSeen"]) == (1, 3, 0, 2)
+
+
+def test_login_rehashes_a_hash_with_another_cost(server, db, run):
+    async def scenario():
+        await db.users.insert_many([
+            {"id": "old", "email": "old@example.com", "password_hash": hashed("secret", 5),
+             "user_type": "vendor", "is_approved": True},
+            {"id": "current", "email": "current@example.com", "password_hash": hashed("secret", 4),
+             "user_type": "vendor", "is_approved": True},
+        ])
+        before = {user["id"]: user["password_hash"] async for user in db.users.find()}
+        for email in ("old@example.com", "current@example.com"):
+            await server.login(server.UserLogin(email=email, password="secret"))
+        after = {user["id"]: user["password_hash"] async for user in db.users.find()}
+        return before, after
+
+    before, after = run(scenario())
+    assert after["old"] != before["old"] and after["old"].startswith("$2b$04$")
+    assert bcrypt.checkpw(b"secret", after["old"].encode())
+    assert after["current"] == before["current"]
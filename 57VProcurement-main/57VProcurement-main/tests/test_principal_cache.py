@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import principal_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    principal_cache._entries.clear()
+    principal_cache._loading.clear()
+    yield
+    principal_cache._entries.clear()
+
+
+def test_callers_get_their_own_copy(db, run):
+    async def scenario():
+        await db.users.insert_one({"id": "u1", "email": "v@x.com", "user_type": "vendor", "is_approved": True,
+                                   "company_name": "Acme", "password_hash": "secret"})
+        first, second = await asyncio.gather(principal_cache.get(db, "u1"), principal_cache.get(db, "u1"))
+        first["is_approved"] = False
+        second["company_name"] = "Changed"
+        return first, second, await principal_cache.get(db, "u1")
+
+    first, second, cached = run(scenario())
+    assert first is not second
+    assert cached["is_approved"] is True and cached["company_name"] == "Acme"
+    assert "password_hash" not in cached
+
+
+def test_invalidate_drops_the_entry(db, run):
+    async def scenario():
+        await db.users.insert_one({"id": "u1", "user_type": "vendor", "is_approved": False})
+        before = await principal_cache.get(db, "u1")
+        await db.users.update_one({"id": "u1"}, {"$set": {"is_approved": True}})
+        stale = await principal_cache.get(db, "u1")
+        principal_cache.invalidate("u1")
+        return before, stale, await principal_cache.get(db, "u1"), await principal_cache.get(db, "missing")
+
+    before, stale, fresh, missing = run(scenario())
+    assert (before["is_approved"], stale["is_approved"], fresh["is_approved"]) == (False, False, True)
+    assert missing is None
+
+
+class GatedUsers:
+    """db.users whose reads wait for ``gate``"""
+
+    def __init__(self, users, gate):
+        self.users = users
+        self.gate = gate
+        self.started = 0
+
+    async def find_one(self, *args, **kwargs):
+        self.started += 1
+        await self.gate.wait()
+        return await self.users.find_one(*args, **kwargs)
+
+
+def test_read_raced_by_invalidate_is_not_cached_and_leaves_no_state(db, run):
+    async def scenario():
+        await db.users.insert_one({"id": "u1", "user_type": "vendor", "is_approved": False})
+        gate = asyncio.Event()
+        gated = SimpleNamespace(users=GatedUsers(db.users, gate))
+        in_flight = asyncio.ensure_future(principal_cache.get(gated, "u1"))
+        while not gated.users.started:
+            await asyncio.sleep(0)
+        await db.users.update_one({"id": "u1"}, {"$set": {"is_approved": True}})
+        principal_cache.invalidate("u1")
+        gate.set()
+        raced = await in_flight
+        cached_after_race = "u1" in principal_cache._entries
+        fresh = await principal_cache.get(db, "u1")
+        return raced, cached_after_race, fresh
+
+    raced, cached_after_race, fresh = run(scenario())
+    # The raced read may see either value, but it is not kept
+    assert raced is not None and not cached_after_race
+    assert fresh["is_approved"] is True and "u1" in principal_cache._entries
+    for n in range(100):
+        principal_cache.invalidate(f"former-{n}")
+    # Invalidating users that are not loading keeps no state for them
+    assert principal_cache._loading == {} and list(principal_cache._entries) == ["u1"]
+
+
+def test_failed_read_is_shared_and_not_cached(run):
+    async def failing(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    broken = SimpleNamespace(users=SimpleNamespace(find_one=failing))
+
+    async def scenario():
+        return await asyncio.gather(principal_cache.get(broken, "u1"), principal_cache.get(broken, "u1"),
+                                    return_exceptions=True)
+
+    results = run(scenario())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert principal_cache._entries == {} and principal_cache._loading == {}